@@ -0,0 +1,64 @@
+"""
+Microbenchmark of the per-call overhead of building a request, from the client attribute chain to the resource URL.
+
+Run it with `python -m benchmarks.builder`.
+"""
+import asyncio
+import time
+import typing
+from unittest.mock import Mock
+
+import httpx
+
+from sequoia.request import RequestBuilder
+from sequoia.types import Resource, ResourcesRegistry, Service, ServicesRegistry
+
+ITERATIONS = 100000
+
+
+def registry() -> ServicesRegistry:
+    service = Service(name="metadata", url="https://metadata.sequoia.piksel.com")
+    service._resources = ResourcesRegistry({"offers": Resource(name="offers", path="/data/offers")})
+    return ServicesRegistry({"metadata": service})
+
+
+async def uncached(services: ServicesRegistry, iterations: int) -> float:
+    """
+    Build a new chain of builders for each call, as every call did before builders were cached.
+    """
+    httpx_client = Mock(spec=httpx.AsyncClient)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        root = RequestBuilder(httpx_client=httpx_client, available_services=services, max_retries=3)
+        await root.metadata.offers._build_url(pk="1")
+
+    return time.perf_counter() - start
+
+
+async def cached(services: ServicesRegistry, iterations: int) -> float:
+    """
+    Reuse the cached chain of builders, with the resource and its URL already resolved.
+    """
+    root = RequestBuilder(httpx_client=Mock(spec=httpx.AsyncClient), available_services=services, max_retries=3)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await root.metadata.offers._build_url(pk="1")
+
+    return time.perf_counter() - start
+
+
+async def main(iterations: int = ITERATIONS) -> typing.Dict[str, float]:
+    services = registry()
+    results = {
+        "uncached": await uncached(services, iterations),
+        "cached": await cached(services, iterations),
+    }
+    for name, elapsed in results.items():
+        print(f"{name:>10}: {elapsed / iterations * 1e6:.2f} us/call")
+
+    print(f"{'speedup':>10}: {results['uncached'] / results['cached']:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
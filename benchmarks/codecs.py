@@ -0,0 +1,54 @@
+"""
+Benchmark of encoding and decoding realistic 500-item list pages with each installed JSON codec, and with "auto".
+
+Converting datetimes and durations dominates decoding, so every codec decodes at about the same speed, while backends
+make a difference when encoding.
+
+Run it with `python -m benchmarks.codecs`.
+"""
+
+import time
+import typing
+
+from benchmarks.decode import ITEMS, page
+from sequoia.codecs import CODECS, AutoCodec, JSONCodec
+
+ITERATIONS = 20
+
+
+def run(function: typing.Callable[[typing.Any], typing.Any], argument: typing.Any, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function(argument)
+
+    return time.perf_counter() - start
+
+
+def main(items: int = ITEMS, iterations: int = ITERATIONS) -> typing.Dict[str, typing.Tuple[float, float, float]]:
+    content = page(items).encode("utf-8")
+    document = JSONCodec().loads(content)
+    size = len(content) / 2 ** 20
+
+    results = {}
+    for name, codec_cls in [*CODECS.items(), (AutoCodec.name, AutoCodec)]:
+        if not codec_cls.available():
+            print(f"{name:>10}: not installed")
+            continue
+
+        codec = codec_cls()
+        assert codec.loads(content) == document
+        assert codec.loads(codec.dumps(document)) == document
+
+        results[name] = (
+            run(codec.dumps, document, iterations),
+            run(codec.loads, content, iterations),
+            run(codec.loads_raw, content, iterations),
+        )
+        encode, decode, decode_raw = (size * iterations / i for i in results[name])
+        print(f"{name:>10}: encode {encode:.1f} MB/s, decode {decode:.1f} MB/s, decode raw {decode_raw:.1f} MB/s")
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
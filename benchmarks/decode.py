@@ -0,0 +1,139 @@
+"""
+Benchmark of decoding realistic 500-item list pages, comparing the previous recursive decoder with the current one and
+with a decoding plan compiled from the declared field types of the resource, and with lazy decoding when only `ref`
+and `name` of each item are read.
+
+Run it with `python -m benchmarks.decode`.
+"""
+import json
+import time
+import typing
+
+import isodate
+
+from sequoia.codecs import DecodePlan, JSONDecoder
+
+ITEMS = 500
+ITERATIONS = 20
+FIELDS = {
+    "ref": "string",
+    "owner": "string",
+    "name": "string",
+    "title": "string",
+    "type": "string",
+    "active": "boolean",
+    "price": "object",
+    "availabilityStartAt": "dateTime",
+    "availabilityEndAt": "dateTime",
+    "createdAt": "dateTime",
+    "updatedAt": "dateTime",
+    "duration": "duration",
+    "tags": "array",
+    "contentRefs": "array",
+    "custom": "object",
+}
+
+
+class LegacyJSONDecoder(json.JSONDecoder):
+    """
+    Previous decoder: it serializes every object recursively from its hook, trying every parser on every value.
+    """
+
+    serialize_functions = (isodate.parse_datetime, isodate.parse_duration)
+
+    def __init__(self, *, strict=True):
+        super().__init__(object_hook=self.serialize, strict=strict)
+
+    def serialize(self, o):
+        if isinstance(o, dict):
+            return {k: self.serialize(v) for k, v in o.items()}
+        elif isinstance(o, list):
+            return [self.serialize(i) for i in o]
+
+        for f in self.serialize_functions:
+            try:
+                return f(o)
+            except Exception:
+                pass
+
+        return o
+
+
+def item(i: int) -> typing.Dict[str, typing.Any]:
+    return {
+        "ref": f"demo:offer-{i}",
+        "owner": "demo",
+        "name": f"offer-{i}",
+        "title": f"Premium offer {i}",
+        "type": "subscription",
+        "active": i % 2 == 0,
+        "price": {"amount": 9.99, "currency": "GBP", "taxIncluded": True},
+        "availabilityStartAt": "2020-01-01T00:00:00.000Z",
+        "availabilityEndAt": "2030-01-01T00:00:00.000Z",
+        "createdAt": "2019-12-01T10:30:00.000Z",
+        "updatedAt": "2019-12-02T11:45:00.000Z",
+        "duration": "P30D",
+        "tags": ["sport", "premium", "uk", f"tag-{i}"],
+        "contentRefs": [f"demo:content-{i}-{j}" for j in range(5)],
+        "custom": {"legacyId": str(i), "window": {"start": "2020-01-01T00:00:00.000Z", "length": "PT2H"}},
+    }
+
+
+def page(items: int = ITEMS) -> str:
+    return json.dumps(
+        {
+            "offers": [item(i) for i in range(items)],
+            "meta": {"page": 1, "perPage": items, "continue": "/data/offers?continue=abc"},
+            "linked": {},
+        }
+    )
+
+
+def run(decoder: typing.Type[json.JSONDecoder], content: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        json.loads(content, cls=decoder)
+
+    return time.perf_counter() - start
+
+
+def run_plan(decode_plan: DecodePlan, content: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode_plan.decode(json.loads(content))
+
+    return time.perf_counter() - start
+
+
+def run_lazy(decoder: JSONDecoder, content: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for i in decoder.lazy(json.loads(content))["offers"]:
+            i["ref"], i["name"]
+
+    return time.perf_counter() - start
+
+
+def main(items: int = ITEMS, iterations: int = ITERATIONS) -> typing.Dict[str, float]:
+    content = page(items)
+    decode_plan = DecodePlan("offers", FIELDS)
+    assert json.loads(content, cls=JSONDecoder) == json.loads(content, cls=LegacyJSONDecoder)
+    assert decode_plan.decode(json.loads(content)) == json.loads(content, cls=JSONDecoder)
+
+    results = {
+        "legacy": run(LegacyJSONDecoder, content, iterations),
+        "current": run(JSONDecoder, content, iterations),
+        "plan": run_plan(decode_plan, content, iterations),
+        "lazy": run_lazy(JSONDecoder(), content, iterations),
+    }
+    for name, elapsed in results.items():
+        print(f"{name:>12}: {elapsed / iterations * 1e3:.2f} ms/page")
+
+    print(f"{'speedup':>12}: {results['legacy'] / results['current']:.1f}x")
+    print(f"{'plan speedup':>12}: {results['legacy'] / results['plan']:.1f}x")
+    print(f"{'lazy speedup':>12}: {results['legacy'] / results['lazy']:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    main()
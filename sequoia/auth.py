@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+import typing
+
+from sequoia.exceptions import UpdateTokenError
+from sequoia.flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["TokenManager"]
+
+
+class TokenManager:
+    """
+    Keep an authentication token up to date.
+
+    The token is refreshed in background shortly before it expires, and it can be refreshed on demand when a service
+    rejects it. Concurrent refreshes share a single request to Identity.
+    """
+
+    DEFAULT_REFRESH_MARGIN = 60.0
+    DEFAULT_RETRY_DELAY = 5.0
+    DEFAULT_MIN_REFRESH_DELAY = 1.0
+
+    def __init__(
+        self,
+        fetch: typing.Callable[[], typing.Awaitable[typing.Tuple[str, typing.Optional[float]]]],
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        min_refresh_delay: float = DEFAULT_MIN_REFRESH_DELAY,
+    ):
+        """
+        Keep an authentication token up to date.
+
+        :param fetch: Function that requests a new token, returning it along with its lifetime in seconds if known.
+        :param refresh_margin: Num of seconds before expiration when the token is refreshed. Tokens living less than
+        twice this margin are refreshed once half of their lifetime has passed.
+        :param retry_delay: Num of seconds to wait before retrying a failed background refresh.
+        :param min_refresh_delay: Min num of seconds between background refreshes.
+        """
+        self._fetch = fetch
+        self._refresh_margin = refresh_margin
+        self._retry_delay = retry_delay
+        self._min_refresh_delay = min_refresh_delay
+        self._token: typing.Optional[str] = None
+        self._expires_at: typing.Optional[float] = None
+        self._flight = SingleFlight()
+        self._refresh_task: typing.Optional[asyncio.Task] = None
+        # Bumped on close, so refreshes still in flight don't store their token nor schedule the next one
+        self._generation = 0
+
+    @property
+    def token(self) -> typing.Optional[str]:
+        """
+        Current token.
+
+        :return: Token.
+        """
+        return self._token
+
+    @property
+    def expires_in(self) -> typing.Optional[float]:
+        """
+        Num of seconds until the current token expires.
+
+        :return: Num of seconds if known.
+        """
+        if self._expires_at is None:
+            return None
+
+        return self._expires_at - time.monotonic()
+
+    async def refresh(self, stale: typing.Optional[str] = None) -> str:
+        """
+        Request a new token, sharing the request with concurrent refreshes.
+
+        :param stale: Token rejected by a service. If the current token is already a different one, it's returned
+        without requesting a new one.
+        :return: New token.
+        :raise UpdateTokenError: Error requesting the token.
+        """
+        if stale is not None and self._token is not None and self._token != stale:
+            return self._token
+
+        return await self._flight.do("token", self._update)
+
+    async def close(self):
+        """
+        Stop background refreshes and discard the current token, along with the ones still being requested.
+        """
+        self._generation += 1
+        self._cancel()
+        self._token = None
+        self._expires_at = None
+
+    async def _update(self) -> str:
+        """
+        Request a new token and schedule its refresh, unless the manager is closed meanwhile.
+
+        :return: New token.
+        """
+        generation = self._generation
+        token, expires_in = await self._fetch()
+        if generation != self._generation:
+            return token
+
+        self._token = token
+        self._expires_at = time.monotonic() + expires_in if expires_in else None
+        if expires_in:
+            self._schedule(max(expires_in - self._refresh_margin, expires_in / 2, self._min_refresh_delay))
+
+        return token
+
+    def _schedule(self, delay: float):
+        """
+        Schedule a background refresh, replacing any scheduled one.
+
+        :param delay: Num of seconds to wait.
+        """
+        self._cancel()
+        self._refresh_task = asyncio.ensure_future(self._refresh_later(delay))
+
+    def _cancel(self):
+        """
+        Cancel scheduled background refresh, unless it's the one running.
+        """
+        if self._refresh_task is not None and self._refresh_task is not asyncio.current_task():
+            self._refresh_task.cancel()
+
+        self._refresh_task = None
+
+    async def _refresh_later(self, delay: float):
+        """
+        Refresh the token after a delay, retrying later if it fails.
+
+        :param delay: Num of seconds to wait.
+        """
+        await asyncio.sleep(delay)
+        try:
+            await self.refresh()
+        except UpdateTokenError:
+            logger.exception("Error refreshing token, retrying in %.1f seconds", self._retry_delay)
+            self._schedule(self._retry_delay)
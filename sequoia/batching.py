@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import typing
+
+import httpx
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from sequoia.request import RequestBuilder
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["WriteCoalescer"]
+
+
+class _Batch:
+    """
+    Resources waiting to be created in a single request.
+    """
+
+    def __init__(self, builder: "RequestBuilder", timer: asyncio.TimerHandle):
+        self.builder = builder
+        self.timer = timer
+        self.documents: typing.List[typing.Any] = []
+        self.futures: typing.List[asyncio.Future] = []
+
+
+class WriteCoalescer:
+    """
+    Gather concurrent creations of single resources targeting the same service, resource and owner, sending them in
+    a single request once the batch is full or its max delay expires.
+    """
+
+    DEFAULT_MAX_SIZE = 100
+    DEFAULT_MAX_DELAY = 0.005
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, max_delay: float = DEFAULT_MAX_DELAY):
+        """
+        Gather concurrent creations of single resources, sending them in a single request.
+
+        :param max_size: Max num of resources sent in a single request.
+        :param max_delay: Max num of seconds a resource waits for others to be gathered with it.
+        """
+        self._max_size = max_size
+        self._max_delay = max_delay
+        self._batches: typing.Dict[typing.Tuple, _Batch] = {}
+        self._tasks: typing.Set[asyncio.Future] = set()
+
+    async def create(self, builder: "RequestBuilder", json: typing.Any) -> typing.Dict[typing.Any, typing.Any]:
+        """
+        Add a resource to the current batch of its builder and wait until it's created.
+
+        :param builder: Request builder of the resource.
+        :param json: JSON body to send.
+        :return: Resource created.
+        """
+        key = (builder._service_name, builder._resource_name, builder._owner)
+        batch = self._batches.get(key)
+        if batch is None:
+            timer = asyncio.get_event_loop().call_later(self._max_delay, self._flush, key)
+            batch = self._batches[key] = _Batch(builder=builder, timer=timer)
+
+        future = asyncio.get_event_loop().create_future()
+        batch.documents.append(json)
+        batch.futures.append(future)
+
+        if len(batch.documents) >= self._max_size:
+            self._flush(key)
+
+        return await future
+
+    async def close(self):
+        """
+        Send all pending batches and wait until they are finished.
+        """
+        for key in list(self._batches):
+            self._flush(key)
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush(self, key: typing.Tuple):
+        """
+        Close the batch of given key and send it in background.
+
+        :param key: Batch key.
+        """
+        batch = self._batches.pop(key, None)
+        if batch is not None:
+            batch.timer.cancel()
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: _Batch):
+        """
+        Create all resources of a batch in a single request, resolving the future of each one. If the request is
+        rejected, resources are created one by one so each caller receives its own result or error.
+
+        :param batch: Batch to send.
+        """
+        try:
+            created = await batch.builder._create_chunk(batch.documents)
+        except httpx.exceptions.HTTPError as e:
+            if len(batch.documents) == 1 or e.response is None or not 400 <= e.response.status_code < 500:
+                self._resolve(batch.futures, exception=e)
+                return
+
+            logger.debug("Batch of %d resources rejected, creating them one by one", len(batch.documents))
+            await asyncio.gather(*[self._send_one(batch.builder, d, f) for d, f in zip(batch.documents, batch.futures)])
+        except Exception as e:
+            self._resolve(batch.futures, exception=e)
+        else:
+            if len(created) != len(batch.futures):
+                self._resolve(batch.futures, exception=ValueError("Wrong num of resources created"))
+                return
+
+            for future, result in zip(batch.futures, created):
+                self._resolve([future], result=result)
+
+    async def _send_one(self, builder: "RequestBuilder", document: typing.Any, future: asyncio.Future):
+        """
+        Create a single resource, resolving its future.
+
+        :param builder: Request builder of the resource.
+        :param document: JSON body to send.
+        :param future: Future to resolve.
+        """
+        try:
+            self._resolve([future], result=(await builder._create_chunk([document]))[0])
+        except Exception as e:
+            self._resolve([future], exception=e)
+
+    @staticmethod
+    def _resolve(
+        futures: typing.List[asyncio.Future], result: typing.Any = None, exception: typing.Optional[Exception] = None
+    ):
+        """
+        Set the result or exception of those futures that aren't done yet (e.g. cancelled by its caller).
+
+        :param futures: Futures to resolve.
+        :param result: Result.
+        :param exception: Exception.
+        """
+        for future in futures:
+            if future.done():
+                continue
+
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
@@ -0,0 +1,138 @@
+import collections
+import dataclasses
+import time
+import typing
+
+__all__ = ["CacheEntry", "ResponseCache"]
+
+
+@dataclasses.dataclass
+class CacheEntry:
+    """
+    Representation of a cached value along with its expiration time and validators.
+    """
+
+    value: typing.Any
+    expires_at: float
+    etag: typing.Optional[str] = None
+    last_modified: typing.Optional[str] = None
+
+    @property
+    def fresh(self) -> bool:
+        """
+        Check if the entry can be used without revalidating it.
+
+        :return: True if the entry hasn't expired yet.
+        """
+        return time.monotonic() < self.expires_at
+
+    @property
+    def validators(self) -> typing.Dict[str, str]:
+        """
+        Headers that make a request conditional to the cached value being outdated.
+
+        :return: Conditional request headers.
+        """
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class ResponseCache:
+    """
+    In-memory cache of resources with a TTL per resource and a bounded size, evicting least recently used entries.
+    """
+
+    DEFAULT_TTL = 60.0
+    DEFAULT_MAX_SIZE = 1024
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_size: int = DEFAULT_MAX_SIZE,
+        ttls: typing.Optional[typing.Dict[str, float]] = None,
+    ):
+        """
+        In-memory cache of resources.
+
+        :param ttl: Default num of seconds an entry is fresh.
+        :param max_size: Max num of entries.
+        :param ttls: Num of seconds an entry is fresh for specific resources, identified by 'service.resource'.
+        """
+        self._ttl = ttl
+        self._ttls = ttls or {}
+        self._max_size = max_size
+        self._entries: typing.Dict[typing.Hashable, CacheEntry] = collections.OrderedDict()
+
+    def get(self, key: typing.Hashable) -> typing.Optional[CacheEntry]:
+        """
+        Get an entry, fresh or not, marking it as recently used.
+
+        :param key: Entry key.
+        :return: Entry if it exists.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+
+        return entry
+
+    def set(
+        self,
+        key: typing.Hashable,
+        value: typing.Any,
+        resource: str,
+        etag: typing.Optional[str] = None,
+        last_modified: typing.Optional[str] = None,
+    ):
+        """
+        Add or replace an entry, evicting the least recently used one if cache is full.
+
+        :param key: Entry key.
+        :param value: Value to cache.
+        :param resource: Resource identified by 'service.resource', used to choose its TTL.
+        :param etag: ETag validator.
+        :param last_modified: Last-Modified validator.
+        """
+        self._entries[key] = CacheEntry(
+            value=value, expires_at=self._expiration(resource), etag=etag, last_modified=last_modified
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def refresh(self, key: typing.Hashable, resource: str):
+        """
+        Mark an entry as fresh again, after revalidating it.
+
+        :param key: Entry key.
+        :param resource: Resource identified by 'service.resource', used to choose its TTL.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.expires_at = self._expiration(resource)
+
+    def invalidate(self, key: typing.Hashable):
+        """
+        Remove an entry.
+
+        :param key: Entry key.
+        """
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expiration(self, resource: str) -> float:
+        return time.monotonic() + self._ttls.get(resource, self._ttl)
@@ -0,0 +1,184 @@
+import collections
+import enum
+import logging
+import time
+import typing
+
+import httpx
+
+from sequoia.exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["CircuitBreaker", "CircuitBreakers", "CircuitState"]
+
+
+class CircuitState(enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker that stops sending requests to a service when too many of the recent ones failed or were slow.
+
+    While open, requests fail fast raising CircuitOpenError. Once the reset timeout expires the circuit is half open,
+    allowing a few probe requests: if all of them succeed the circuit is closed, otherwise it's opened again.
+    """
+
+    DEFAULT_FAILURE_RATE = 0.5
+    DEFAULT_SLOW_CALL_RATE = 1.0
+    DEFAULT_SLOW_CALL_DURATION = 10.0
+    DEFAULT_WINDOW_SIZE = 20
+    DEFAULT_MIN_CALLS = 10
+    DEFAULT_RESET_TIMEOUT = 30.0
+    DEFAULT_HALF_OPEN_CALLS = 1
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = DEFAULT_FAILURE_RATE,
+        slow_call_rate: float = DEFAULT_SLOW_CALL_RATE,
+        slow_call_duration: float = DEFAULT_SLOW_CALL_DURATION,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        min_calls: int = DEFAULT_MIN_CALLS,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        half_open_calls: int = DEFAULT_HALF_OPEN_CALLS,
+    ):
+        """
+        Circuit breaker that stops sending requests to a service when too many of the recent ones failed or were slow.
+
+        :param name: Service name.
+        :param failure_rate: Ratio of failed calls that opens the circuit.
+        :param slow_call_rate: Ratio of slow calls that opens the circuit.
+        :param slow_call_duration: Num of seconds a call lasts to be considered slow.
+        :param window_size: Num of recent calls considered.
+        :param min_calls: Min num of calls recorded before the circuit can be opened.
+        :param reset_timeout: Num of seconds the circuit stays open before allowing probe calls.
+        :param half_open_calls: Num of successful probe calls needed to close the circuit.
+        """
+        self.name = name
+        self._failure_rate = failure_rate
+        self._slow_call_rate = slow_call_rate
+        self._slow_call_duration = slow_call_duration
+        self._min_calls = min_calls
+        self._reset_timeout = reset_timeout
+        self._half_open_calls = half_open_calls
+        self._calls: typing.Deque[typing.Tuple[bool, bool]] = collections.deque(maxlen=window_size)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probes_succeeded = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """
+        Current state of the circuit.
+
+        :return: Circuit state.
+        """
+        if self._state == CircuitState.OPEN and time.monotonic() >= self._opened_at + self._reset_timeout:
+            self._transition(CircuitState.HALF_OPEN)
+
+        return self._state
+
+    async def call(self, send: typing.Callable[[], typing.Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Send a request through the circuit, recording its outcome.
+
+        :param send: Function that sends the request.
+        :return: Response.
+        :raise CircuitOpenError: If the circuit is open.
+        """
+        probe = self._acquire()
+
+        start = time.monotonic()
+        try:
+            response = await send()
+        except (httpx.exceptions.HTTPError, OSError):
+            self._record(failed=True, duration=time.monotonic() - start)
+            raise
+        except BaseException:
+            # Cancelled or unexpected errors say nothing about the service, but the probe slot must be given back
+            if probe:
+                self._release()
+            raise
+
+        self._record(failed=response.status_code >= 500, duration=time.monotonic() - start)
+        return response
+
+    def _acquire(self) -> bool:
+        """
+        Check the circuit allows a new call.
+
+        :return: If the call takes a probe slot of the half-open circuit.
+        :raise CircuitOpenError: If the circuit is open or all probe calls are already in flight.
+        """
+        state = self.state
+        if state == CircuitState.OPEN or (state == CircuitState.HALF_OPEN and self._probes >= self._half_open_calls):
+            raise CircuitOpenError(service=self.name)
+
+        if state == CircuitState.HALF_OPEN:
+            self._probes += 1
+            return True
+
+        return False
+
+    def _release(self):
+        """
+        Give back a probe slot without recording any outcome, if the circuit is still half open.
+        """
+        if self._state == CircuitState.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def _record(self, failed: bool, duration: float):
+        """
+        Record the outcome of a call, changing circuit state if needed.
+
+        :param failed: If the call failed.
+        :param duration: Num of seconds the call lasted.
+        """
+        slow = duration >= self._slow_call_duration
+        if self._state == CircuitState.HALF_OPEN:
+            if failed or slow:
+                self._transition(CircuitState.OPEN)
+            else:
+                self._probes_succeeded += 1
+                if self._probes_succeeded >= self._half_open_calls:
+                    self._transition(CircuitState.CLOSED)
+        elif self._state == CircuitState.CLOSED:
+            self._calls.append((failed, slow))
+            if len(self._calls) >= self._min_calls and (
+                sum(i[0] for i in self._calls) >= self._failure_rate * len(self._calls)
+                or sum(i[1] for i in self._calls) >= self._slow_call_rate * len(self._calls)
+            ):
+                self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState):
+        logger.warning("Circuit of service '%s' changed from %s to %s", self.name, self._state.value, state.value)
+        self._state = state
+        self._probes = 0
+        self._probes_succeeded = 0
+        self._calls.clear()
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+
+
+class CircuitBreakers(dict):
+    """
+    Mapping of circuit breakers by service name, created on demand using the same configuration.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Mapping of circuit breakers by service name.
+
+        :param kwargs: CircuitBreaker keyword arguments.
+        """
+        super().__init__()
+        self._kwargs = kwargs
+
+    def __missing__(self, key: str) -> CircuitBreaker:
+        breaker = self[key] = CircuitBreaker(name=key, **self._kwargs)
+        return breaker
@@ -1,12 +1,22 @@
+import asyncio
 import base64
 import logging
 import typing
 
 import httpx
 
-from sequoia.exceptions import ClientNotInitialized, UpdateTokenError
+from sequoia.auth import TokenManager
+from sequoia.batching import WriteCoalescer
+from sequoia.cache import ResponseCache
+from sequoia.circuit import CircuitBreakers, CircuitState
+from sequoia.codecs import DecodeMode, JSONCodec, get_codec
+from sequoia.exceptions import ClientNotInitialized, DiscoveryServicesError, UpdateTokenError
+from sequoia.flight import SingleFlight
+from sequoia.limiter import RateLimiters
 from sequoia.request import RequestBuilder
-from sequoia.types import Resource, Service, ServicesRegistry
+from sequoia.retry import RetryBudget, RetryPolicy
+from sequoia.snapshot import DiscoverySnapshot
+from sequoia.types import DiscoveryOptions, LazyServicesRegistry, RegistryDiff, Resource, Service, ServicesRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +30,11 @@ class Client:
 
     request_builder = RequestBuilder
     DEFAULT_MAX_RETRIES = 3
+    DEFAULT_WARM_UP_CONCURRENCY = 8
+    DEFAULT_MAX_CONNECTIONS = 100
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+    DEFAULT_CONNECT_TIMEOUT = 5.0
+    DEFAULT_READ_TIMEOUT = 5.0
 
     def __init__(
         self,
@@ -29,6 +44,24 @@ class Client:
         owner: typing.Optional[str] = None,
         httpx_client: typing.Optional[httpx.AsyncClient] = None,
         max_retries: int = DEFAULT_MAX_RETRIES,
+        write_coalescer: typing.Optional[WriteCoalescer] = None,
+        coalesce_requests: bool = False,
+        response_cache: typing.Optional[ResponseCache] = None,
+        retry_policy: typing.Optional[RetryPolicy] = None,
+        circuit_breakers: typing.Optional[CircuitBreakers] = None,
+        rate_limiters: typing.Optional[RateLimiters] = None,
+        discovery_timeout: typing.Union[float, httpx.Timeout] = DiscoveryOptions.DEFAULT_TIMEOUT,
+        eager_discovery: typing.Union[bool, typing.Iterable[str]] = False,
+        discovery_snapshot: typing.Optional[DiscoverySnapshot] = None,
+        registry_refresh_interval: typing.Optional[float] = None,
+        http2: bool = False,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        max_connections_per_service: typing.Optional[int] = None,
+        connect_timeout: typing.Optional[float] = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: typing.Optional[float] = DEFAULT_READ_TIMEOUT,
+        json_codec: typing.Union[str, JSONCodec] = "auto",
+        decode_mode: typing.Union[str, DecodeMode] = DecodeMode.EAGER,
     ) -> None:
         """
         Client to interact with Sequoia services.
@@ -37,17 +70,83 @@ class Client:
         :param client_secret: Sequoia client secret.
         :param registry_url: URL for Registry service.
         :param owner: Owner.
-        :param httpx_client: Httpx client, a mechanism to reuse an already created client.
+        :param httpx_client: Httpx client, a mechanism to reuse an already created client. If defined, connection
+        options (http2, max connections and timeouts) are not used.
         :param max_retries: Max num of attempts to connect to a sequoia service after receiving an error
+        :param write_coalescer: If defined, concurrent creations of single resources are sent in batches.
+        :param coalesce_requests: If true, concurrent identical GET requests share a single request in flight.
+        :param response_cache: If defined, retrieved resources are cached.
+        :param retry_policy: Policy for retrying failed requests, by default retries up to `max_retries` attempts
+        within a retry budget shared by all requests of the client.
+        :param circuit_breakers: If defined, requests go through the circuit breaker of its service.
+        :param rate_limiters: If defined, requests go through the adaptive rate limiter of its service.
+        :param discovery_timeout: Timeout for requests to discovery endpoints of Registry and services.
+        :param eager_discovery: If true, resources of all services are discovered when the client is opened. It can
+        also be the list of services whose resources are discovered.
+        :param discovery_snapshot: If defined, the client starts from this snapshot while it's fresh, revalidating it in
+        background, and it's saved when the client is closed.
+        :param registry_refresh_interval: If defined, num of seconds between background updates of services registry.
+        :param http2: If true, HTTP/2 is used when available, multiplexing concurrent requests over a connection.
+        :param max_connections: Max num of connections in the pool.
+        :param max_keepalive_connections: Max num of idle connections kept alive in the pool.
+        :param max_connections_per_service: If defined, max num of concurrent requests to each service, which bounds
+        the connections to its host. It's applied through adaptive rate limiters, so it cannot be used along with
+        `rate_limiters`.
+        :param connect_timeout: Timeout for establishing a connection, in seconds.
+        :param read_timeout: Timeout for reading a response, and for writing a request or waiting for a connection from
+        the pool, in seconds.
+        :param json_codec: Codec for encoding requests and decoding responses, either a codec or its name: "orjson",
+        "ujson", "json" or "auto", which encodes with the fastest one installed and decodes with "json". All of them
+        decode and encode the same documents as "json".
+        :param decode_mode: How responses are decoded: "eager" serializes datetimes and durations straight away, "lazy"
+        returns mappings that serialize each value the first time it's accessed, and "raw" returns JSON values as they
+        are.
         """
+        if max_connections_per_service is not None:
+            if rate_limiters is not None:
+                raise ValueError("Cannot define both 'max_connections_per_service' and 'rate_limiters'")
+
+            rate_limiters = RateLimiters(
+                initial_limit=max_connections_per_service, max_limit=max_connections_per_service
+            )
+
         self._registry_url = registry_url
         self._client_id = client_id
         self._client_secret = client_secret
-        self._httpx_client = httpx_client if httpx_client is not None else httpx.AsyncClient(verify=False)
+        self._httpx_client = (
+            httpx_client
+            if httpx_client is not None
+            else httpx.AsyncClient(
+                verify=False,
+                http2=http2,
+                pool_limits=httpx.PoolLimits(soft_limit=max_keepalive_connections, hard_limit=max_connections),
+                timeout=httpx.Timeout(read_timeout, connect_timeout=connect_timeout),
+            )
+        )
         self._owner = owner
-        self._token: typing.Optional[str] = None
+        self._token_manager = TokenManager(self._fetch_token)
         self._services: ServicesRegistry = ServicesRegistry()
+        self._owner_services: typing.Dict[str, LazyServicesRegistry] = {}
+        self._root_builders: typing.Dict[typing.Optional[str], RequestBuilder] = {}
         self._max_retries = max_retries
+        self._write_coalescer = write_coalescer
+        self._single_flight = SingleFlight() if coalesce_requests else None
+        self._response_cache = response_cache
+        self._retry_policy = (
+            retry_policy if retry_policy is not None else RetryPolicy(max_tries=max_retries, budget=RetryBudget())
+        )
+        self._circuit_breakers = circuit_breakers
+        self._rate_limiters = rate_limiters
+        self._json_codec = get_codec(json_codec)
+        self._decode_mode = DecodeMode(decode_mode)
+        self._eager_discovery = eager_discovery
+        self._discovery_snapshot = discovery_snapshot
+        self._revalidation: typing.Optional[asyncio.Task] = None
+        self._registry_refresh_interval = registry_refresh_interval
+        self._registry_refresh: typing.Optional[asyncio.Task] = None
+        self._discovery_options = DiscoveryOptions(
+            httpx_client=self._httpx_client, timeout=discovery_timeout, retry_policy=self._retry_policy
+        )
 
     async def set_owner(self, owner: str):
         """
@@ -80,33 +179,205 @@ class Client:
 
         return dict(await self._services[service].resources)
 
+    def circuits(self) -> typing.Dict[str, CircuitState]:
+        """
+        List the state of circuit breakers of those services that have been requested.
+
+        :return: Circuit state by service name.
+        """
+        if self._circuit_breakers is None:
+            return {}
+
+        return {k: v.state for k, v in self._circuit_breakers.items()}
+
+    def limits(self) -> typing.Dict[typing.Any, int]:
+        """
+        List the current concurrency limit of rate limiters of those services that have been requested.
+
+        :return: Limit by service name, or by service name and owner.
+        """
+        if self._rate_limiters is None:
+            return {}
+
+        return {k: v.limit for k, v in self._rate_limiters.items()}
+
     @property
     def _builder(self) -> RequestBuilder:
         """
-        Create a new instance of request builder.
+        Request builder for this client's owner.
+
+        :return: Request builder instance.
+        """
+        return self._owner_builder(self._owner, self._services)
+
+    def for_owner(self, owner: str) -> RequestBuilder:
+        """
+        Request builder for requests on behalf of an owner, sharing connections, token and
+        policies of this client. Services registry of each owner is discovered when first needed and then cached.
 
+        :param owner: Owner.
+        :return: Request builder instance.
+        """
+        if owner == self._owner:
+            return self._builder
+
+        if owner not in self._owner_services:
+            self._owner_services[owner] = LazyServicesRegistry(
+                self._registry_url, owner, self._discovery_options, shared=self._services
+            )
+
+        return self._owner_builder(owner, self._owner_services[owner])
+
+    def _owner_builder(self, owner: typing.Optional[str], services: ServicesRegistry) -> RequestBuilder:
+        """
+        Request builder for an owner, cached while its registry is the same. Builders take the token from the token
+        manager on each request, so a new token doesn't rebuild them.
+
+        :param owner: Owner.
+        :param services: Services registry of the owner.
         :return: Request builder instance.
         """
         if not self._services:
             raise ClientNotInitialized
 
-        return self.request_builder(
+        builder = self._root_builders.get(owner)
+        if builder is not None and builder._available_services is services:
+            return builder
+
+        builder = self._root_builders[owner] = self.request_builder(
             httpx_client=self._httpx_client,
-            available_services=self._services,
-            owner=self._owner,
+            available_services=services,
+            owner=owner,
             token=self._token,
+            token_manager=self._token_manager,
             max_retries=self._max_retries,
+            write_coalescer=self._write_coalescer,
+            single_flight=self._single_flight,
+            cache=self._response_cache,
+            retry_policy=self._retry_policy,
+            circuit_breakers=self._circuit_breakers,
+            rate_limiters=self._rate_limiters,
+            json_codec=self._json_codec,
+            decode_mode=self._decode_mode,
         )
+        return builder
 
-    async def update_services(self):
+    async def update_services(self) -> RegistryDiff:
         """
-        Update services registry and its resources using discovery methods.
+        Update services registry using discovery methods, keeping resources of services whose URL hasn't changed.
+
+        :return: Differences with the previous services registry.
         """
-        await self._services.discover(self._registry_url, self._owner)
+        return await self._services.discover(self._registry_url, self._owner, self._discovery_options)
+
+    async def _refresh_registry(self):
+        """
+        Update services registry periodically, saving the discovery snapshot when it changes. Errors keep the current
+        registry and the loop going, only cancelling it stops the refresh.
+        """
+        while True:
+            await asyncio.sleep(self._registry_refresh_interval)
+            try:
+                if await self.update_services():
+                    self._save_snapshot(fresh=True)
+            except DiscoveryServicesError:
+                logger.warning("Error refreshing services registry, keeping current one")
+            except asyncio.CancelledError:  # It's an Exception before Python 3.8
+                raise
+            except Exception:
+                logger.exception("Unexpected error refreshing services registry, keeping current one")
+
+    @property
+    def _token(self) -> typing.Optional[str]:
+        """
+        Current authentication token.
+
+        :return: Token.
+        """
+        return self._token_manager.token
+
+    def _load_snapshot(self) -> bool:
+        """
+        Load services registry from discovery snapshot, if any.
+
+        :return: True if the registry was loaded.
+        """
+        if self._discovery_snapshot is None:
+            return False
+
+        services = self._discovery_snapshot.load(self._registry_url, self._owner, self._discovery_options)
+        if services is None:
+            return False
+
+        self._services.clear()
+        self._services.update(services)
+        return True
+
+    def _save_snapshot(self, fresh: bool = False):
+        """
+        Save services registry into discovery snapshot, if any.
+
+        :param fresh: If the registry has just been discovered, so the snapshot is stamped as new.
+        """
+        if self._discovery_snapshot is not None and self._services:
+            self._discovery_snapshot.save(self._services, self._registry_url, self._owner, fresh=fresh)
+
+    async def _revalidate(self):
+        """
+        Discover again services and the resources of those already discovered, saving a new snapshot.
+        """
+        discovered = [name for name, service in self._services.items() if hasattr(service, "_resources")]
+        try:
+            await self.update_services()
+        except DiscoveryServicesError:
+            logger.warning("Error revalidating discovery snapshot, keeping it")
+            return
+
+        await self.warm_up(discovered, refresh=True)
+        self._save_snapshot(fresh=True)
+
+    async def warm_up(
+        self,
+        services: typing.Optional[typing.Iterable[str]] = None,
+        concurrency: int = DEFAULT_WARM_UP_CONCURRENCY,
+        refresh: bool = False,
+    ) -> typing.Dict[str, Exception]:
+        """
+        Discover resources of services concurrently, so the first request to each service doesn't have to. A service
+        whose discovery fails doesn't stop the rest, and it will be discovered again when requested.
+
+        :param services: Names of the services to discover, all of them by default.
+        :param concurrency: Max num of services being discovered at the same time.
+        :param refresh: If true, resources already discovered are discovered again.
+        :return: Errors by service name, for those services whose discovery failed.
+        """
+        names = list(services) if services is not None else list(self._services)
+        slots = asyncio.Semaphore(concurrency)
+
+        async def discover(name: str):
+            async with slots:
+                service = self._services[name]
+                await (service.discover() if refresh else service.resources)
+
+        results = await asyncio.gather(*[discover(name) for name in names], return_exceptions=True)
+        errors = {name: result for name, result in zip(names, results) if isinstance(result, Exception)}
+        for name, error in errors.items():
+            logger.warning("Error warming up service '%s': %r", name, error)
+
+        return errors
 
     async def update_token(self):
         """
-        Request a new token from Identity to interact with Sequoia services.
+        Request a new token from Identity to interact with Sequoia services. It will be refreshed in background before
+        it expires.
+        """
+        await self._token_manager.refresh()
+
+    async def _fetch_token(self) -> typing.Tuple[str, typing.Optional[float]]:
+        """
+        Request a new token from Identity.
+
+        :return: Token and its lifetime in seconds, if known.
         """
         encoded_auth = base64.b64encode(f"{self._client_id}:{self._client_secret}".encode()).decode()
         headers = {"Authorization": f"Basic {encoded_auth}"}
@@ -125,20 +396,43 @@ class Client:
         except (httpx.exceptions.HTTPError, OSError) as e:
             raise UpdateTokenError() from e
 
-        self._token = token
+        return token, response.get("expires_in")
 
     async def close(self) -> None:
         """
         Closes client connections.
         """
-        self._token = None
+        if self._write_coalescer is not None:
+            await self._write_coalescer.close()
+
+        for task in (self._revalidation, self._registry_refresh):
+            if task is not None:
+                task.cancel()
+        self._revalidation = self._registry_refresh = None
+
+        self._save_snapshot()
+        await self._token_manager.close()
         self._owner = None
         self._services.clear()
+        self._owner_services.clear()
+        self._root_builders.clear()
         await self._httpx_client.aclose()
 
     async def __aenter__(self) -> httpx.AsyncClient:
-        await self.update_services()
-        await self.update_token()
+        if self._load_snapshot():
+            self._revalidation = asyncio.ensure_future(self._revalidate())
+        else:
+            await self.update_services()
+            self._save_snapshot(fresh=True)
+
+        if self._registry_refresh_interval:
+            self._registry_refresh = asyncio.ensure_future(self._refresh_registry())
+
+        if self._eager_discovery:
+            services = None if self._eager_discovery is True else self._eager_discovery
+            await asyncio.gather(self.update_token(), self.warm_up(services))
+        else:
+            await self.update_token()
         return self
 
     async def __aexit__(
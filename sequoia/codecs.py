@@ -1,9 +1,21 @@
 import datetime
+import enum
 import json
+import re
 import typing
 
 import isodate
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
 
 class JSONEncoder(json.JSONEncoder):
     """
@@ -35,26 +47,28 @@ class JSONEncoder(json.JSONEncoder):
 class JSONDecoder(json.JSONDecoder):
     """
     Extended JSON decoder adapted to Sequoia API spec: http://docs.sequoia.piksel.com/concepts/api/types.html
+
+    Objects are serialized once their members are decoded, so each value is visited once, and only strings shaped like
+    an ISO 8601 datetime or duration are parsed.
     """
 
-    serialize_functions = (isodate.parse_datetime, isodate.parse_duration)
+    utc_datetime_pattern = re.compile(
+        r"([0-9]{4})-([0-9]{2})-([0-9]{2})T([0-9]{2}):([0-9]{2}):([0-9]{2})(?:\.([0-9]{1,6}))?Z\Z"
+    )
+    datetime_pattern = re.compile(r"[+-]?[0-9]{2}[^T]*T[0-9]")
+    duration_pattern = re.compile(r"[+-]?PT?[0-9]")
 
     def __init__(self, *, strict=True):
-        super().__init__(object_hook=self.serialize, strict=strict)
+        super().__init__(object_pairs_hook=self.serialize, strict=strict)
 
-    def serialize(self, o):
+    def serialize(self, pairs: typing.List[typing.Tuple[str, typing.Any]]) -> typing.Dict[str, typing.Any]:
         """
-        Serialize JSON objects into Python native types.
+        Serialize members of a JSON object into Python native types. Nested objects are already serialized.
 
-        :param o: JSON object.
+        :param pairs: JSON object members.
         :return: Serialized object.
         """
-        if isinstance(o, dict):
-            return {k: self.serialize(v) for k, v in o.items()}
-        elif isinstance(o, list):
-            return [self.serialize(i) for i in o]
-
-        return self.parse(o)
+        return {k: self.parse(v) if type(v) in (str, list) else v for k, v in pairs}
 
     def parse(self, value) -> typing.Any:
         """
@@ -63,13 +77,588 @@ class JSONDecoder(json.JSONDecoder):
         :param value: JSON value to be serialized.
         :return: Serialized value.
         """
-        for f in self.serialize_functions:
+        if isinstance(value, list):
+            return [self.parse(i) if type(i) in (str, list) else i for i in value]
+
+        if not isinstance(value, str):
+            return value
+
+        if self.datetime_pattern.match(value):
+            return self.parse_datetime(value)
+
+        if self.duration_pattern.match(value):
+            return self.parse_duration(value)
+
+        return value
+
+    def convert(self, document) -> typing.Any:
+        """
+        Serialize an already decoded JSON document into Python native types, as if it was decoded by this decoder: only
+        values inside objects are serialized, so top-level strings and arrays are kept as they are.
+
+        :param document: Decoded JSON document.
+        :return: Serialized document.
+        """
+        if isinstance(document, dict):
+            return self.convert_member(document)
+
+        if isinstance(document, list):
+            return [self.convert(i) if type(i) in (list, dict) else i for i in document]
+
+        return document
+
+    def convert_member(self, value) -> typing.Any:
+        """
+        Serialize an already decoded value of an object member into Python native types, walking through its objects
+        and arrays.
+
+        :param value: Decoded JSON value.
+        :return: Serialized value.
+        """
+        if type(value) is str:
+            return self.parse(value)
+
+        if isinstance(value, dict):
+            return {k: self.convert_member(v) if type(v) in (str, list, dict) else v for k, v in value.items()}
+
+        if isinstance(value, list):
+            return [self.convert_member(i) if type(i) in (str, list, dict) else i for i in value]
+
+        return value
+
+    def lazy(self, document) -> typing.Any:
+        """
+        Wrap an already decoded JSON document so its objects are serialized into Python native types on access. As in
+        convert, top-level strings and arrays are kept as they are.
+
+        :param document: Decoded JSON document.
+        :return: Lazily serialized document.
+        """
+        if isinstance(document, dict):
+            return LazyMapping(document, self.lazy_member)
+
+        if isinstance(document, list):
+            return [self.lazy(i) if type(i) in (list, dict) else i for i in document]
+
+        return document
+
+    def lazy_member(self, value) -> typing.Any:
+        """
+        Wrap an already decoded value of an object member so its objects are serialized into Python native types on
+        access.
+
+        :param value: Decoded JSON value.
+        :return: Lazily serialized value.
+        """
+        if type(value) is str:
+            return self.parse(value)
+
+        if isinstance(value, dict):
+            return LazyMapping(value, self.lazy_member)
+
+        if isinstance(value, list):
+            return [self.lazy_member(i) if type(i) in (str, list, dict) else i for i in value]
+
+        return value
+
+    def parse_datetime(self, value) -> typing.Any:
+        """
+        Parse a datetime string, leaving it untouched if it is not a valid datetime.
+
+        :param value: JSON value to be serialized.
+        :return: Datetime or original value.
+        """
+        if not isinstance(value, str):
+            return value
+
+        utc_datetime = self.utc_datetime_pattern.match(value)
+        if utc_datetime:
             try:
-                result = f(value)
-                break
-            except Exception:
+                return self._utc_datetime(*utc_datetime.groups())
+            except ValueError:
                 pass
-        else:
-            result = value
 
-        return result
+        try:
+            return isodate.parse_datetime(value)
+        except Exception:
+            return value
+
+    @staticmethod
+    def parse_duration(value) -> typing.Any:
+        """
+        Parse a duration string, leaving it untouched if it is not a valid duration.
+
+        :param value: JSON value to be serialized.
+        :return: Duration or original value.
+        """
+        if not isinstance(value, str):
+            return value
+
+        try:
+            return isodate.parse_duration(value)
+        except Exception:
+            return value
+
+    @staticmethod
+    def _utc_datetime(
+        year: str, month: str, day: str, hour: str, minute: str, second: str, fraction: typing.Optional[str]
+    ) -> datetime.datetime:
+        """
+        Build an UTC datetime from its components, a fast path for the format used by Sequoia services.
+
+        :return: Datetime.
+        """
+        microsecond = int(fraction.ljust(6, "0")) if fraction else 0
+        return datetime.datetime(
+            int(year), int(month), int(day), int(hour), int(minute), int(second), microsecond, tzinfo=isodate.UTC
+        )
+
+
+class LazyMapping(dict):
+    """
+    Dict holding a decoded JSON object whose values are serialized into Python native types the first time they are
+    accessed, and memoized in place.
+
+    Values not accessed yet are kept as raw JSON values, which encode into the same JSON, so the mapping can be passed
+    to any JSON encoder. Methods returning values, such as get, items, values or copy, serialize them first. Copies
+    are plain dicts.
+    """
+
+    __slots__ = ("_pending", "_convert", "_converters")
+
+    def __init__(
+        self,
+        data: typing.Dict[str, typing.Any],
+        convert: typing.Callable[[typing.Any], typing.Any],
+        converters: typing.Optional[typing.Dict[str, typing.Callable[[typing.Any], typing.Any]]] = None,
+    ):
+        """
+        :param data: Decoded JSON object.
+        :param convert: Conversion applied to values.
+        :param converters: Conversions applied to specific keys instead of the default one.
+        """
+        super().__init__(data)
+        self._pending = set(data)
+        self._convert = convert
+        self._converters = converters if converters is not None else {}
+
+    def __getitem__(self, key: str) -> typing.Any:
+        value = super().__getitem__(key)
+        if key in self._pending:
+            self._pending.discard(key)
+            if type(value) in (str, list, dict):
+                value = self._converters.get(key, self._convert)(value)
+                super().__setitem__(key, value)
+        return value
+
+    def __setitem__(self, key: str, value: typing.Any):
+        super().__setitem__(key, value)
+        self._pending.discard(key)
+
+    def __delitem__(self, key: str):
+        super().__delitem__(key)
+        self._pending.discard(key)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        # Overriding it stops dict() and unpacking from copying raw values straight from the dict storage
+        return super().__iter__()
+
+    def __eq__(self, other: typing.Any) -> bool:
+        self._serialize()
+        if isinstance(other, LazyMapping):
+            other._serialize()
+        return super().__eq__(other)
+
+    def __ne__(self, other: typing.Any) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __or__(self, other: typing.Any) -> typing.Any:
+        return self.copy().__or__(other)
+
+    def __ror__(self, other: typing.Any) -> typing.Any:
+        return self.copy().__ror__(other)
+
+    def __ior__(self, other: typing.Any) -> "LazyMapping":
+        self.update(other)
+        return self
+
+    def __repr__(self) -> str:
+        self._serialize()
+        return super().__repr__()
+
+    def __reduce__(self) -> typing.Tuple[typing.Any, ...]:
+        return dict, (self.copy(),)
+
+    def get(self, key: str, default: typing.Any = None) -> typing.Any:
+        return self[key] if key in self else default
+
+    def items(self) -> typing.ItemsView[str, typing.Any]:
+        self._serialize()
+        return super().items()
+
+    def values(self) -> typing.ValuesView[typing.Any]:
+        self._serialize()
+        return super().values()
+
+    def copy(self) -> typing.Dict[str, typing.Any]:
+        self._serialize()
+        return dict(super().items())
+
+    def pop(self, key: str, *default: typing.Any) -> typing.Any:
+        if key not in self and default:
+            return default[0]
+
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self) -> typing.Tuple[str, typing.Any]:
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+
+        key = next(reversed(self.keys()))
+        return key, self.pop(key)
+
+    def setdefault(self, key: str, default: typing.Any = None) -> typing.Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args: typing.Any, **kwargs: typing.Any):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        super().clear()
+        self._pending.clear()
+
+    def _serialize(self):
+        """
+        Serialize all values not accessed yet.
+        """
+        for key in list(self._pending):
+            self.__getitem__(key)
+
+
+class DecodeMode(enum.Enum):
+    """
+    How responses are decoded: values serialized straight away, serialized on access, or kept as raw JSON values.
+    """
+
+    EAGER = "eager"
+    LAZY = "lazy"
+    RAW = "raw"
+
+
+class DecodePlan:
+    """
+    Decoding plan for the records of a resource, compiled from the field types declared in its service descriptor.
+
+    Fields declared as datetime or duration are parsed straight away, other declared fields keep their strings as they
+    are and fields not declared fall back to the generic parsing of JSONDecoder.
+    """
+
+    datetime_types = frozenset({"date", "datetime", "timestamp"})
+    duration_types = frozenset({"duration"})
+
+    def __init__(self, resource: str, fields: typing.Dict[str, str], decoder: typing.Optional[JSONDecoder] = None):
+        """
+        :param resource: Resource name, the key holding the records in a response.
+        :param fields: Declared type of each field, by field name.
+        :param decoder: Decoder used for values not covered by the plan.
+        """
+        self.resource = resource
+        self.decoder = decoder if decoder is not None else JSONDecoder()
+        self.converters = {name: self._converter(kind) for name, kind in fields.items()}
+        self.lazy_converters = {name: self._converter(kind, lazy=True) for name, kind in fields.items()}
+
+    def _converter(self, kind: str, lazy: bool = False) -> typing.Callable[[typing.Any], typing.Any]:
+        """
+        Choose the conversion applied to a field given its declared type.
+
+        :param kind: Declared type.
+        :param lazy: If true, objects and arrays of the field are serialized on access.
+        :return: Conversion function.
+        """
+        kind = kind.lower()
+        if kind in self.datetime_types:
+            return self.decoder.parse_datetime
+
+        if kind in self.duration_types:
+            return self.decoder.parse_duration
+
+        return self._keep_string_lazy if lazy else self._keep_string
+
+    def _keep_string(self, value: typing.Any) -> typing.Any:
+        """
+        Keep strings untouched, serializing any other value through the generic path.
+
+        :param value: JSON value.
+        :return: Serialized value.
+        """
+        return value if type(value) is str else self.decoder.convert_member(value)
+
+    def _keep_string_lazy(self, value: typing.Any) -> typing.Any:
+        """
+        Keep strings untouched, serializing any other value lazily through the generic path.
+
+        :param value: JSON value.
+        :return: Lazily serialized value.
+        """
+        return value if type(value) is str else self.decoder.lazy_member(value)
+
+    def decode(self, document: typing.Any) -> typing.Any:
+        """
+        Serialize a decoded JSON document, applying the plan to the records of the resource.
+
+        :param document: Decoded JSON document.
+        :return: Serialized document.
+        """
+        if not isinstance(document, dict):
+            return self.decoder.convert(document)
+
+        return {
+            k: (
+                [self.decode_record(i) for i in v]
+                if k == self.resource and isinstance(v, list)
+                else self.decoder.convert_member(v)
+            )
+            for k, v in document.items()
+        }
+
+    def decode_record(self, record: typing.Any) -> typing.Any:
+        """
+        Serialize a single record of the resource.
+
+        :param record: Decoded JSON record.
+        :return: Serialized record.
+        """
+        if not isinstance(record, dict):
+            return self.decoder.convert_member(record)
+
+        convert = self.decoder.convert_member
+        return {k: self.converters.get(k, convert)(v) for k, v in record.items()}
+
+    def lazy(self, document: typing.Any) -> typing.Any:
+        """
+        Wrap a decoded JSON document so it's serialized on access, applying the plan to the records of the resource.
+
+        :param document: Decoded JSON document.
+        :return: Lazily serialized document.
+        """
+        if not isinstance(document, dict):
+            return self.decoder.lazy(document)
+
+        return LazyMapping(document, self.decoder.lazy_member, {self.resource: self._lazy_records})
+
+    def _lazy_records(self, records: typing.Any) -> typing.Any:
+        """
+        Wrap the records of the resource so they are serialized on access following the plan.
+
+        :param records: Decoded JSON records.
+        :return: Lazily serialized records.
+        """
+        if not isinstance(records, list):
+            return self.decoder.lazy_member(records)
+
+        return [self.lazy_record(i) for i in records]
+
+    def lazy_record(self, record: typing.Any) -> typing.Any:
+        """
+        Wrap a single record of the resource so it's serialized on access following the plan.
+
+        :param record: Decoded JSON record.
+        :return: Lazily serialized record.
+        """
+        if not isinstance(record, dict):
+            return self.decoder.lazy_member(record)
+
+        return LazyMapping(record, self.decoder.lazy_member, self.lazy_converters)
+
+
+def record_decoder(
+    decode_mode: DecodeMode, decode_plan: typing.Optional[DecodePlan], decoder: JSONDecoder
+) -> typing.Callable[[typing.Any], typing.Any]:
+    """
+    Choose how single records of a resource, already decoded from JSON, are serialized.
+
+    :param decode_mode: Decode mode.
+    :param decode_plan: Decoding plan of the resource, if any.
+    :param decoder: Decoder used when there is no plan.
+    :return: Serialization function.
+    """
+    if decode_mode is DecodeMode.RAW:
+        return lambda record: record
+
+    if decode_mode is DecodeMode.LAZY:
+        return decode_plan.lazy_record if decode_plan is not None else decoder.lazy_member
+
+    return decode_plan.decode_record if decode_plan is not None else decoder.convert_member
+
+
+class JSONCodec:
+    """
+    JSON codec following Sequoia API spec, backed by the standard library json module. Other codecs produce the same
+    wire format using faster backends.
+    """
+
+    name = "json"
+    module: typing.Any = json
+
+    def __init__(self):
+        self.encoder = JSONEncoder()
+        self.decoder = JSONDecoder()
+
+    @classmethod
+    def available(cls) -> bool:
+        """
+        Check if the backend of this codec is installed.
+
+        :return: True if it can be used.
+        """
+        return cls.module is not None
+
+    def dumps(self, o: typing.Any) -> bytes:
+        """
+        Encode a document into JSON.
+
+        :param o: Document.
+        :return: UTF-8 encoded JSON.
+        """
+        return json.dumps(o, cls=JSONEncoder).encode("utf-8")
+
+    def loads(self, content: typing.Union[bytes, str]) -> typing.Any:
+        """
+        Decode a JSON document, serializing its values into Python native types.
+
+        :param content: JSON content.
+        :return: Document.
+        """
+        return json.loads(content, cls=JSONDecoder)
+
+    def loads_raw(self, content: typing.Union[bytes, str]) -> typing.Any:
+        """
+        Decode a JSON document without serializing its values.
+
+        :param content: JSON content.
+        :return: Document.
+        """
+        return json.loads(content)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    JSON codec backed by orjson.
+
+    orjson doesn't support integers beyond 64 bits, nor NaN and infinite floats, so documents that may contain them fall
+    back to the standard library json module to produce the same results.
+    """
+
+    name = "orjson"
+    module = orjson
+
+    # Maps digits to "0" and any other byte to " ", so long numbers are found with a substring search
+    digits_table = bytes(48 if 48 <= i <= 57 else 32 for i in range(256))
+
+    def dumps(self, o: typing.Any) -> bytes:
+        try:
+            content = orjson.dumps(
+                o, default=self.encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            )
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, or values that can't be serialized at all and raise again
+            return super().dumps(o)
+
+        # NaN and infinite floats are written as null
+        if b"null" in content:
+            return super().dumps(o)
+
+        return content
+
+    def loads(self, content: typing.Union[bytes, str]) -> typing.Any:
+        return self.decoder.convert(self.loads_raw(content))
+
+    def loads_raw(self, content: typing.Union[bytes, str]) -> typing.Any:
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        # Integers beyond 64 bits would be decoded as floats
+        if b"0" * 19 not in data.translate(self.digits_table):
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                # NaN and infinite literals are rejected, and malformed documents raise again
+                pass
+
+        return super().loads_raw(content)
+
+
+class UjsonCodec(JSONCodec):
+    """
+    JSON codec backed by ujson.
+    """
+
+    name = "ujson"
+    module = ujson
+
+    def dumps(self, o: typing.Any) -> bytes:
+        return ujson.dumps(o, default=self.encoder.default, ensure_ascii=False, escape_forward_slashes=False).encode(
+            "utf-8"
+        )
+
+    def loads(self, content: typing.Union[bytes, str]) -> typing.Any:
+        return self.decoder.convert(self.loads_raw(content))
+
+    def loads_raw(self, content: typing.Union[bytes, str]) -> typing.Any:
+        try:
+            return ujson.loads(content)
+        except ujson.JSONDecodeError as e:
+            document = content.decode("utf-8", "replace") if isinstance(content, bytes) else content
+            raise json.JSONDecodeError(str(e), document, 0) from e
+
+
+CODECS: typing.Dict[str, typing.Type[JSONCodec]] = {c.name: c for c in (OrjsonCodec, UjsonCodec, JSONCodec)}
+
+
+class AutoCodec(JSONCodec):
+    """
+    JSON codec that encodes with the fastest installed backend and decodes with the standard library json module.
+
+    Converting datetimes and durations takes most of the time spent decoding a response, so faster backends barely
+    speed it up, while json needs no checks to decode every document the same way.
+    """
+
+    name = "auto"
+
+    def __init__(self):
+        super().__init__()
+        self.encoding_codec = next(c for c in CODECS.values() if c.available())()
+
+    def dumps(self, o: typing.Any) -> bytes:
+        return self.encoding_codec.dumps(o)
+
+
+def get_codec(codec: typing.Union[str, JSONCodec] = "auto") -> JSONCodec:
+    """
+    Build a JSON codec by name, where "auto" encodes with the fastest installed backend (orjson, ujson or json) and
+    decodes with json.
+
+    :param codec: Codec name or instance.
+    :return: JSON codec.
+    :raise ValueError: Unknown codec.
+    :raise ImportError: Backend of the codec is not installed.
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec == "auto":
+        return AutoCodec()
+
+    try:
+        codec_cls = CODECS[codec]
+    except KeyError:
+        raise ValueError(f"Unknown JSON codec '{codec}', choose one of: auto, {', '.join(CODECS)}")
+
+    if not codec_cls.available():
+        raise ImportError(f"JSON codec '{codec}' requires '{codec}' package to be installed")
+
+    return codec_cls()
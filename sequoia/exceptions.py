@@ -7,6 +7,7 @@ __all__ = [
     "DiscoveryResourcesError",
     "UpdateTokenError",
     "ClientNotInitialized",
+    "CircuitOpenError",
 ]
 
 
@@ -72,3 +73,15 @@ class ClientNotInitialized(Exception):
     """
     Exception class for representing a client that hasn't been initialized.
     """
+
+
+class CircuitOpenError(Exception):
+    """
+    Exception class for requests rejected because the circuit of its service is open.
+    """
+
+    def __init__(self, service: str):
+        self.service = service
+
+    def __str__(self):
+        return self.service  # pragma: no cover
@@ -0,0 +1,43 @@
+import asyncio
+import typing
+
+__all__ = ["SingleFlight"]
+
+
+class SingleFlight:
+    """
+    Share a single execution between concurrent calls identified by the same key, so only the first one is actually
+    executed and the rest wait for its result.
+    """
+
+    def __init__(self):
+        self._calls: typing.Dict[typing.Hashable, asyncio.Future] = {}
+
+    async def do(self, key: typing.Hashable, function: typing.Callable[[], typing.Awaitable]) -> typing.Any:
+        """
+        Execute a function unless there is another execution in flight for the same key, waiting for its result.
+
+        :param key: Key identifying the call.
+        :param function: Function to execute.
+        :return: Function result.
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = self._calls[key] = asyncio.ensure_future(function())
+            future.add_done_callback(lambda f: self._forget(key, f))
+
+        # Shielded, so a cancelled caller doesn't cancel the execution shared with others
+        return await asyncio.shield(future)
+
+    def _forget(self, key: typing.Hashable, future: asyncio.Future):
+        """
+        Remove a finished execution, so next calls with the same key will execute the function again.
+
+        :param key: Key identifying the call.
+        :param future: Finished execution.
+        """
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+        if not future.cancelled():
+            future.exception()  # Mark exception as retrieved even if all callers were cancelled
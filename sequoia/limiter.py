@@ -0,0 +1,221 @@
+import asyncio
+import collections
+import logging
+import time
+import typing
+
+import httpx
+
+from sequoia.retry import retry_after_delay
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["AdaptiveLimiter", "RateLimiters"]
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limiter that adapts its limit following an AIMD (additive increase, multiplicative decrease) approach.
+
+    Each successful response increases the limit by one over the current limit, so it grows by one when a full window
+    of requests succeeds. A throttled response (429 or 503) multiplies the limit by the backoff ratio. When the service
+    asks to wait, using Retry-After or rate limit headers, no new requests are sent until that time.
+    """
+
+    DEFAULT_INITIAL_LIMIT = 10
+    DEFAULT_MIN_LIMIT = 1
+    DEFAULT_MAX_LIMIT = 200
+    DEFAULT_BACKOFF_RATIO = 0.5
+    THROTTLED_STATUSES = frozenset({429, 503})
+    REMAINING_HEADERS = ("RateLimit-Remaining", "X-RateLimit-Remaining")
+    RESET_HEADERS = ("RateLimit-Reset", "X-RateLimit-Reset")
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = DEFAULT_MIN_LIMIT,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        backoff_ratio: float = DEFAULT_BACKOFF_RATIO,
+    ):
+        """
+        Concurrency limiter that adapts its limit following an AIMD approach.
+
+        :param name: Limiter name, used for logging.
+        :param initial_limit: Initial num of concurrent requests.
+        :param min_limit: Min num of concurrent requests.
+        :param max_limit: Max num of concurrent requests.
+        :param backoff_ratio: Ratio applied to the limit when a request is throttled.
+        """
+        self.name = name
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._backoff_ratio = backoff_ratio
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._waiters: typing.Deque[asyncio.Future] = collections.deque()
+
+    @property
+    def limit(self) -> int:
+        """
+        Current num of concurrent requests allowed.
+
+        :return: Limit.
+        """
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Num of requests in flight.
+
+        :return: Num of requests.
+        """
+        return self._in_flight
+
+    async def call(self, send: typing.Callable[[], typing.Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Send a request once the limiter allows it, updating the limit given its response.
+
+        :param send: Function that sends the request.
+        :return: Response.
+        """
+        await self._acquire()
+        try:
+            response = await send()
+            self._update(response)
+        finally:
+            self._release()
+
+        return response
+
+    async def _acquire(self):
+        """
+        Wait until the limiter isn't paused and there is room for a new request.
+        """
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            elif self._in_flight < self.limit:
+                self._in_flight += 1
+                return
+            else:
+                waiter = asyncio.get_event_loop().create_future()
+                self._waiters.append(waiter)
+                try:
+                    await waiter
+                except asyncio.CancelledError:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    else:
+                        self._wake()
+                    raise
+
+    def _release(self):
+        """
+        Free the room of a finished request.
+        """
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        """
+        Wake up as many waiters as new requests allowed.
+        """
+        for _ in range(max(0, self.limit - self._in_flight)):
+            if not self._waiters:
+                break
+
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _update(self, response: httpx.Response):
+        """
+        Update limit and pause given a response.
+
+        :param response: Response received.
+        """
+        if response.status_code in self.THROTTLED_STATUSES:
+            self._limit = max(float(self._min_limit), self._limit * self._backoff_ratio)
+            logger.warning("Requests to '%s' throttled, limit decreased to %d", self.name, self.limit)
+            self._pause(retry_after_delay(response))
+        else:
+            self._limit = min(float(self._max_limit), self._limit + 1.0 / self._limit)
+
+        remaining = _header(response, self.REMAINING_HEADERS)
+        if remaining is not None and remaining <= 0:
+            self._pause(_reset_delay(_header(response, self.RESET_HEADERS)))
+
+    def _pause(self, delay: typing.Optional[float]):
+        """
+        Stop sending requests for a period.
+
+        :param delay: Num of seconds.
+        """
+        if delay:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+
+class RateLimiters(dict):
+    """
+    Mapping of adaptive limiters by service name, or by service name and owner, created on demand using the same
+    configuration.
+    """
+
+    def __init__(self, per_owner: bool = False, **kwargs):
+        """
+        Mapping of adaptive limiters by service name, or by service name and owner.
+
+        :param per_owner: If true, each owner has its own limiter for each service.
+        :param kwargs: AdaptiveLimiter keyword arguments.
+        """
+        super().__init__()
+        self._per_owner = per_owner
+        self._kwargs = kwargs
+
+    def limiter(self, service: str, owner: typing.Optional[str] = None) -> AdaptiveLimiter:
+        """
+        Get the limiter for requests to a service on behalf of an owner.
+
+        :param service: Service name.
+        :param owner: Owner.
+        :return: Limiter.
+        """
+        key = (service, owner) if self._per_owner else service
+        if key not in self:
+            self[key] = AdaptiveLimiter(name=f"{service}:{owner}" if self._per_owner else service, **self._kwargs)
+
+        return self[key]
+
+
+def _header(response: httpx.Response, names: typing.Iterable[str]) -> typing.Optional[float]:
+    """
+    Numeric value of the first header present.
+
+    :param response: Response received.
+    :param names: Header names.
+    :return: Header value if present and valid.
+    """
+    for name in names:
+        try:
+            return float(response.headers[name])
+        except (KeyError, ValueError):
+            pass
+
+    return None
+
+
+def _reset_delay(reset: typing.Optional[float]) -> typing.Optional[float]:
+    """
+    Num of seconds until rate limit reset, given as seconds or as epoch timestamp.
+
+    :param reset: Rate limit reset header value.
+    :return: Num of seconds.
+    """
+    if reset is None:
+        return None
+
+    return max(0.0, reset - time.time()) if reset > 10 ** 9 else reset
@@ -0,0 +1,30 @@
+import datetime
+import typing
+
+from sequoia.codecs import JSONEncoder
+
+__all__ = ["time_windows"]
+
+
+def time_windows(
+    field: str, start: datetime.datetime, end: datetime.datetime, count: int
+) -> typing.List[typing.Dict[str, str]]:
+    """
+    Split a time range into disjoint windows that can be used as partitions of a collection, filtering it by a date
+    field. Sequoia dates have millisecond precision, so each window ends one millisecond before the next one starts.
+
+    :param field: Date field used to filter, e.g: updatedAt.
+    :param start: Start of the time range.
+    :param end: End of the time range.
+    :param count: Num of windows.
+    :return: Params for filtering each window.
+    """
+    encode = JSONEncoder.deserialize_functions[datetime.datetime]
+    param = f"with{field[0].upper()}{field[1:]}"
+    step = (end - start) / count
+    bounds = [start + step * i for i in range(count)] + [end + datetime.timedelta(milliseconds=1)]
+
+    return [
+        {param: f"{encode(bounds[i])}/{encode(bounds[i + 1] - datetime.timedelta(milliseconds=1))}"}
+        for i in range(count)
+    ]
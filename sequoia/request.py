@@ -1,18 +1,35 @@
-import json as jsonlib
+import asyncio
+import copy
+import functools
 import logging
 import typing
-from functools import wraps
 from json import JSONDecodeError
 from urllib.parse import parse_qsl, urljoin, urlparse, urlunparse
 
-import backoff
 import httpx
 import httpx.content_streams
 
-from sequoia.codecs import JSONEncoder
-from sequoia.exceptions import RequestAlreadyBuilt, RequestNotBuilt
+from sequoia.auth import TokenManager
+from sequoia.batching import WriteCoalescer
+from sequoia.cache import ResponseCache
+from sequoia.circuit import CircuitBreakers
+from sequoia.codecs import DecodeMode, DecodePlan, JSONCodec, record_decoder
+from sequoia.exceptions import RequestAlreadyBuilt, RequestNotBuilt, UpdateTokenError
+from sequoia.flight import SingleFlight
+from sequoia.limiter import RateLimiters
 from sequoia.response import Response
-from sequoia.types import Resource, Service, ServicesRegistry
+from sequoia.retry import RetryPolicy
+from sequoia.streaming import ListStreamParser
+from sequoia.types import (
+    BulkResult,
+    ChunkError,
+    Page,
+    Resource,
+    ResourcesRegistry,
+    RetrieveResult,
+    Service,
+    ServicesRegistry,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +37,8 @@ __all__ = ["Request", "RequestBuilder"]
 
 
 class JSONStream(httpx.content_streams.JSONStream):
-    def __init__(self, json: typing.Any) -> None:
-        self.body = jsonlib.dumps(json, cls=JSONEncoder).encode("utf-8")
+    def __init__(self, json: typing.Any, json_codec: typing.Optional[JSONCodec] = None) -> None:
+        self.body = (json_codec if json_codec is not None else JSONCodec()).dumps(json)
 
 
 class Request(httpx.Request):
@@ -29,9 +46,9 @@ class Request(httpx.Request):
     Low level request interface for interact with Sequoia services.
     """
 
-    def __init__(self, *args, json: typing.Any = None, **kwargs):
+    def __init__(self, *args, json: typing.Any = None, json_codec: typing.Optional[JSONCodec] = None, **kwargs):
         if json is not None:
-            kwargs["stream"] = JSONStream(json)
+            kwargs["stream"] = JSONStream(json, json_codec)
 
         super().__init__(*args, **kwargs)
 
@@ -50,6 +67,109 @@ class Request(httpx.Request):
         return f"<{self.__class__.__name__}({formatted_params})>"
 
 
+_END = object()
+
+
+async def _produce(iterator: typing.AsyncGenerator, queue: asyncio.Queue, slots: asyncio.Semaphore):
+    """
+    Move elements from an async iterator into a queue, waiting for a free slot before requesting each one.
+
+    :param iterator: Async generator to consume.
+    :param queue: Queue where elements, or the error raised, will be put.
+    :param slots: Semaphore bounding the num of elements requested ahead.
+    """
+    try:
+        while True:
+            await slots.acquire()
+            try:
+                element = await iterator.__anext__()
+            except StopAsyncIteration:
+                slots.release()
+                break
+
+            await queue.put(element)
+    except Exception as e:
+        await queue.put(e)
+    finally:
+        await iterator.aclose()
+        await queue.put(_END)
+
+
+async def _prefetch(iterator: typing.AsyncGenerator, size: int) -> typing.AsyncGenerator:
+    """
+    Consume an async iterator in a background task, keeping at most `size` elements requested ahead of the consumer.
+
+    :param iterator: Async generator to consume.
+    :param size: Max num of elements requested ahead.
+    :return: Elements of the iterator, in the same order.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(size)
+    producer = asyncio.ensure_future(_produce(iterator, queue, slots))
+    try:
+        while True:
+            element = await queue.get()
+            if element is _END:
+                break
+            elif isinstance(element, Exception):
+                raise element
+
+            slots.release()
+            yield element
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+
+async def _chunks(
+    iterable: typing.Union[typing.Iterable, typing.AsyncIterable], size: int
+) -> typing.AsyncGenerator[typing.List, None]:
+    """
+    Split an iterable or async iterable into lists of a given size, the last one can be smaller.
+
+    :param iterable: Iterable or async iterable to split.
+    :param size: Size of each chunk.
+    :return: Chunks.
+    """
+    if not isinstance(iterable, typing.AsyncIterable):
+        iterable = _aiter(iterable)
+
+    chunk = []
+    async for element in iterable:
+        chunk.append(element)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+async def _stream(send: typing.Callable[..., typing.Awaitable[httpx.Response]]) -> httpx.Response:
+    """
+    Send a request streaming its response. The body of error responses is read, so they can be retried or reported.
+
+    :param send: Function that sends the request.
+    :return: Response.
+    """
+    response = await send(stream=True)
+    if response.is_error:
+        await response.aread()
+
+    return response
+
+
+async def _aiter(iterable: typing.Iterable) -> typing.AsyncGenerator:
+    """
+    Wrap an iterable into an async generator.
+
+    :param iterable: Iterable to wrap.
+    :return: Elements of the iterable.
+    """
+    for element in iterable:
+        yield element
+
+
 def built(service: bool = False, resource: bool = False) -> typing.Callable:
     """
     Decorator to check if the request is fully built, raising exceptions if it isn't.
@@ -60,7 +180,7 @@ def built(service: bool = False, resource: bool = False) -> typing.Callable:
     """
 
     def _built(f: typing.Callable) -> typing.Callable:
-        @wraps(f)
+        @functools.wraps(f)
         def _wrapper(self, *args, **kwargs):
             if (service or resource) and self._service_name is None:
                 raise RequestNotBuilt("service")
@@ -78,8 +198,32 @@ def built(service: bool = False, resource: bool = False) -> typing.Callable:
 class RequestBuilder:
     """
     Helper for building requests to Sequoia services.
+
+    Builders are cached by their parent, so each step of a chain like `client.metadata.offers` is created only once,
+    and the resource and its URL are resolved once while the service and its resources don't change.
     """
 
+    __slots__ = (
+        "_owner",
+        "_token",
+        "_token_manager",
+        "_httpx_client",
+        "_available_services",
+        "_service_name",
+        "_resource_name",
+        "_max_retries",
+        "_write_coalescer",
+        "_single_flight",
+        "_cache",
+        "_retry_policy",
+        "_circuit_breakers",
+        "_rate_limiters",
+        "_json_codec",
+        "_decode_mode",
+        "_children",
+        "_resolved",
+    )
+
     def __init__(
         self,
         httpx_client: httpx.AsyncClient,
@@ -89,6 +233,15 @@ class RequestBuilder:
         resource: typing.Optional[str] = None,
         owner: typing.Optional[str] = None,
         token: typing.Optional[str] = None,
+        token_manager: typing.Optional[TokenManager] = None,
+        write_coalescer: typing.Optional[WriteCoalescer] = None,
+        single_flight: typing.Optional[SingleFlight] = None,
+        cache: typing.Optional[ResponseCache] = None,
+        retry_policy: typing.Optional[RetryPolicy] = None,
+        circuit_breakers: typing.Optional[CircuitBreakers] = None,
+        rate_limiters: typing.Optional[RateLimiters] = None,
+        json_codec: typing.Optional[JSONCodec] = None,
+        decode_mode: typing.Union[str, DecodeMode] = DecodeMode.EAGER,
     ):
         """
         Helper for building requests to Sequoia services.
@@ -99,14 +252,36 @@ class RequestBuilder:
         :param resource: Sequoia resource name.
         :param owner: Owner.
         :param token: Sequoia authentication token.
+        :param token_manager: If defined, the authentication token is taken from it and refreshed when rejected.
+        :param write_coalescer: If defined, concurrent creations of single resources are sent in batches.
+        :param single_flight: If defined, concurrent identical GET requests share a single request in flight.
+        :param cache: If defined, retrieved resources are cached.
+        :param retry_policy: Policy for retrying failed requests, by default retries up to `max_retries` attempts.
+        :param circuit_breakers: If defined, requests go through the circuit breaker of its service.
+        :param rate_limiters: If defined, requests go through the adaptive rate limiter of its service.
+        :param json_codec: Codec for encoding requests and decoding responses, by default the standard library one.
+        :param decode_mode: How responses are decoded: "eager", "lazy" or "raw".
         """
         self._owner = owner
         self._token = token
+        self._token_manager = token_manager
         self._httpx_client = httpx_client
         self._available_services = available_services
         self._service_name = service
         self._resource_name = resource
         self._max_retries = max_retries
+        self._write_coalescer = write_coalescer
+        self._single_flight = single_flight
+        self._cache = cache
+        self._retry_policy = retry_policy if retry_policy is not None else RetryPolicy(max_tries=max_retries)
+        self._circuit_breakers = circuit_breakers
+        self._rate_limiters = rate_limiters
+        self._json_codec = json_codec if json_codec is not None else JSONCodec()
+        self._decode_mode = DecodeMode(decode_mode)
+        self._children: typing.Dict[str, RequestBuilder] = {}
+        self._resolved: typing.Optional[
+            typing.Tuple[Service, ResourcesRegistry, Resource, str, typing.Optional[DecodePlan]]
+        ] = None
 
     @property
     @built(service=True)
@@ -126,7 +301,30 @@ class RequestBuilder:
 
         :return: Resource object.
         """
-        return (await self._service.resources)[self._resource_name]
+        return (await self._resolve())[0]
+
+    async def _resolve(self) -> typing.Tuple[Resource, str]:
+        """
+        Resolve the resource and its URL, reusing them while the service and its resources are the same. The decoding
+        plan of the resource is compiled along with them, if its descriptor declares field types.
+
+        :return: Resource object and its URL.
+        """
+        if self._resolved is not None:
+            service, resources, resource, url, _ = self._resolved
+            if self._available_services.get(self._service_name) is service and (
+                service.discovered_resources is resources
+            ):
+                return resource, url
+
+        await self._available_services.ready()
+        service = self._service
+        resources = await service.resources
+        resource = resources[self._resource_name]
+        url = urljoin(service.url, resource.path)
+        decode_plan = DecodePlan(resource.name, resource.fields) if resource.fields else None
+        self._resolved = (service, resources, resource, url, decode_plan)
+        return resource, url
 
     def _build_service(self, service: str) -> "RequestBuilder":
         """
@@ -142,7 +340,16 @@ class RequestBuilder:
             resource=self._resource_name,
             owner=self._owner,
             token=self._token,
+            token_manager=self._token_manager,
             max_retries=self._max_retries,
+            write_coalescer=self._write_coalescer,
+            single_flight=self._single_flight,
+            cache=self._cache,
+            retry_policy=self._retry_policy,
+            circuit_breakers=self._circuit_breakers,
+            rate_limiters=self._rate_limiters,
+            json_codec=self._json_codec,
+            decode_mode=self._decode_mode,
         )
 
     def _build_resource(self, resource: str) -> "RequestBuilder":
@@ -160,7 +367,16 @@ class RequestBuilder:
             resource=resource,
             owner=self._owner,
             token=self._token,
+            token_manager=self._token_manager,
             max_retries=self._max_retries,
+            write_coalescer=self._write_coalescer,
+            single_flight=self._single_flight,
+            cache=self._cache,
+            retry_policy=self._retry_policy,
+            circuit_breakers=self._circuit_breakers,
+            rate_limiters=self._rate_limiters,
+            json_codec=self._json_codec,
+            decode_mode=self._decode_mode,
         )
 
     async def custom(self, path: str, method: str = "GET", **kwargs) -> typing.Dict[typing.Any, typing.Any]:
@@ -172,17 +388,25 @@ class RequestBuilder:
         :param kwargs: Request keyword arguments.
         :return: Response from custom request.
         """
+        await self._available_services.ready()
         return (await self._request(method=method, url=urljoin(self._service.url, path), **kwargs)).json()
 
     def __getattr__(self, item) -> typing.Union[Request, "RequestBuilder"]:
+        child = self._children.get(item)
+        if child is not None:
+            return child
+
         if self._service_name is None:
             # First step: Service is not defined yet
-            return self._build_service(item)
+            child = self._build_service(item)
         elif self._resource_name is None:
             # Second step: Service is defined but path is not
-            return self._build_resource(item)
+            child = self._build_resource(item)
+        else:
+            raise RequestAlreadyBuilt
 
-        raise RequestAlreadyBuilt
+        self._children[item] = child
+        return child
 
     # HTTP Methods
     async def create(self, json, **kwargs) -> typing.Dict[typing.Any, typing.Any]:
@@ -192,10 +416,69 @@ class RequestBuilder:
         :param json: JSON body to send.
         :return: Response.
         """
+        if self._write_coalescer is not None and not kwargs:
+            return await self._write_coalescer.create(self, json)
+
+        return (await self._create_chunk([json], **kwargs))[0]
+
+    async def create_many(
+        self,
+        documents: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]],
+        chunk_size: int = 100,
+        concurrency: int = 4,
+        **kwargs,
+    ) -> BulkResult:
+        """
+        Create many resources packing them into chunks, each one sent in a single request. Chunks are sent
+        concurrently and an error in one of them doesn't stop the others. If iterating documents fails, chunks already
+        being sent are waited for before raising the error.
+
+        :param documents: Iterable or async iterable of JSON bodies to send.
+        :param chunk_size: Max num of resources sent in a single request.
+        :param concurrency: Max num of chunks being sent at the same time.
+        :return: Resources created, in the same order they were given, and errors of chunks that failed.
+        """
+        result = BulkResult()
+        created = {}
+        slots = asyncio.Semaphore(concurrency)
+
+        async def send(index: int, chunk: typing.List[typing.Any]):
+            try:
+                created[index] = await self._create_chunk(chunk, **kwargs)
+            except Exception as e:
+                logger.error("Error creating chunk %d of %d resources: %s", index, len(chunk), str(e))
+                result.errors.append(ChunkError(index=index, documents=chunk, error=e))
+            finally:
+                slots.release()
+
+        tasks = []
+        index = 0
+        try:
+            async for chunk in _chunks(documents, chunk_size):
+                await slots.acquire()
+                tasks.append(asyncio.ensure_future(send(index, chunk)))
+                index += 1
+        finally:
+            # Chunks already being sent are waited for even if documents fail, so no request is left behind
+            await asyncio.gather(*tasks)
+
+        result.created = [i for k in sorted(created) for i in created[k]]
+        result.errors.sort(key=lambda x: x.index)
+        return result
+
+    async def _create_chunk(
+        self, chunk: typing.List[typing.Any], **kwargs
+    ) -> typing.List[typing.Dict[typing.Any, typing.Any]]:
+        """
+        Create a list of resources in a single request.
+
+        :param chunk: JSON bodies to send.
+        :return: Resources created.
+        """
         resource_name = (await self._resource).name
-        kwargs["json"] = {resource_name: [json]}
+        kwargs["json"] = {resource_name: chunk}
 
-        return (await self._request(method="POST", url=await self._build_url(), **kwargs)).json()[resource_name][0]
+        return (await self._request(method="POST", url=await self._build_url(), **kwargs)).json()[resource_name]
 
     async def retrieve(self, pk: str, **kwargs) -> typing.Dict[typing.Any, typing.Any]:
         """
@@ -204,9 +487,105 @@ class RequestBuilder:
         :param pk: Resource primary key.
         :return: Response
         """
-        return (await self._request(method="GET", url=await self._build_url(pk), **kwargs)).json()[
-            (await self._resource).name
-        ][0]
+        url = await self._build_url(pk)
+        if self._cache is not None and not kwargs:
+            return await self._retrieve_cached(url)
+
+        return (await self._request(method="GET", url=url, **kwargs)).json()[(await self._resource).name][0]
+
+    async def _retrieve_cached(self, url: str) -> typing.Dict[typing.Any, typing.Any]:
+        """
+        Retrieve a resource from cache if it's fresh, otherwise request it. Requests for outdated resources are
+        conditional when validators are available, so the cached resource is reused if it wasn't modified.
+
+        Each caller gets its own copy of the resource, so changing it doesn't alter the cached one.
+
+        :param url: Resource url.
+        :return: Resource.
+        """
+        key = (self._owner, url)
+        resource = f"{self._service_name}.{self._resource_name}"
+        entry = self._cache.get(key)
+        if entry is not None and entry.fresh:
+            return copy.deepcopy(entry.value)
+
+        response = await self._request(method="GET", url=url, headers=entry.validators if entry is not None else {})
+        if entry is not None and response.status_code == 304:
+            self._cache.refresh(key, resource)
+            return copy.deepcopy(entry.value)
+
+        value = response.json()[(await self._resource).name][0]
+        self._cache.set(
+            key,
+            value,
+            resource,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return copy.deepcopy(value)
+
+    async def retrieve_many(
+        self, pks: typing.Iterable[str], max_url_length: int = 2000, concurrency: int = 4, **kwargs
+    ) -> RetrieveResult:
+        """
+        Retrieve many resources given its primary keys, grouping them into as few requests as possible.
+
+        :param pks: Resources primary keys.
+        :param max_url_length: Max length of each request url, query params aside.
+        :param concurrency: Max num of requests being sent at the same time.
+        :return: Resources found by primary key and primary keys that don't exist.
+        """
+        pks = list(dict.fromkeys(pks))
+        url_length = len(await self._build_url()) + 1
+        chunks = [[]]
+        length = url_length
+        for pk in pks:
+            if chunks[-1] and length + len(pk) > max_url_length:
+                chunks.append([])
+                length = url_length
+
+            chunks[-1].append(pk)
+            length += len(pk) + 1
+
+        found = {}
+        slots = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*[self._retrieve_chunk(chunk, found, slots, **kwargs) for chunk in chunks if chunk])
+
+        return RetrieveResult(
+            found={pk: found[pk] for pk in pks if pk in found}, missing=[pk for pk in pks if pk not in found]
+        )
+
+    async def _retrieve_chunk(
+        self,
+        chunk: typing.List[str],
+        found: typing.Dict[str, typing.Dict[typing.Any, typing.Any]],
+        slots: asyncio.Semaphore,
+        **kwargs,
+    ):
+        """
+        Retrieve a list of resources in a single request, matching them with its primary key by ref or name. If the
+        request fails because any of them doesn't exist, they will be requested one by one.
+
+        :param chunk: Resources primary keys.
+        :param found: Resources found by primary key, to be filled.
+        :param slots: Semaphore bounding the num of requests being sent at the same time.
+        """
+        try:
+            async with slots:
+                response = await self._request(method="GET", url=await self._build_url(",".join(chunk)), **kwargs)
+        except httpx.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+
+            if len(chunk) > 1:
+                await asyncio.gather(*[self._retrieve_chunk([pk], found, slots, **kwargs) for pk in chunk])
+            return
+
+        pks = set(chunk)
+        for document in response.json()[(await self._resource).name]:
+            for key in (document.get("ref"), document.get("name")):
+                if key in pks:
+                    found[key] = document
 
     async def update(self, pk: str, json, **kwargs) -> typing.Dict[typing.Any, typing.Any]:
         """
@@ -218,8 +597,11 @@ class RequestBuilder:
         """
         resource_name = (await self._resource).name
         kwargs["json"] = {resource_name: [json]}
+        url = await self._build_url(pk)
+        if self._cache is not None:
+            self._cache.invalidate((self._owner, url))
 
-        return (await self._request(method="PUT", url=await self._build_url(pk), **kwargs)).json()[resource_name][0]
+        return (await self._request(method="PUT", url=url, **kwargs)).json()[resource_name][0]
 
     async def delete(self, pk: str, **kwargs) -> None:
         """
@@ -227,34 +609,178 @@ class RequestBuilder:
 
         :param pk: Resource primary key.
         """
-        await self._request(method="DELETE", url=await self._build_url(pk), **kwargs)
+        url = await self._build_url(pk)
+        if self._cache is not None:
+            self._cache.invalidate((self._owner, url))
 
-    async def list(self, **kwargs) -> typing.AsyncGenerator[typing.Dict[typing.Any, typing.Any], None]:
+        await self._request(method="DELETE", url=url, **kwargs)
+
+    async def list(
+        self, prefetch: int = 0, stream: bool = False, **kwargs
+    ) -> typing.AsyncGenerator[typing.Dict[typing.Any, typing.Any], None]:
         """
         Retrieve a collection.
 
+        :param prefetch: Max num of pages requested ahead while the current one is being consumed. Zero disables it.
+        :param stream: If true, each page is parsed while its body is received, yielding every item as soon as it's
+        complete instead of waiting for the whole page. It cannot be used along with `prefetch`.
         :return: Response
         """
+        if stream:
+            if prefetch > 0:
+                raise ValueError("Cannot prefetch pages while streaming them")
+
+            async for item in self._stream_items(**kwargs):
+                yield item
+        else:
+            async for page in self.list_pages(prefetch=prefetch, **kwargs):
+                for item in page.items:
+                    yield item
+
+    async def list_pages(self, prefetch: int = 0, **kwargs) -> typing.AsyncGenerator[Page, None]:
+        """
+        Retrieve a collection page by page.
+
+        :param prefetch: Max num of pages requested ahead while the current one is being consumed. Zero disables it.
+        :return: Pages, including its items, meta and linked resources.
+        """
+        resource_name = (await self._resource).name
+        pages = self._pages(**kwargs)
+        if prefetch > 0:
+            pages = _prefetch(pages, size=prefetch)
+
+        async for page in pages:
+            yield Page(items=page[resource_name], meta=page.get("meta", {}), linked=page.get("linked", {}))
+
+    async def list_partitioned(
+        self,
+        partitions: typing.Iterable[typing.Dict[str, typing.Any]],
+        concurrency: int = 4,
+        ordered: bool = False,
+        prefetch: int = 1,
+        **kwargs,
+    ) -> typing.AsyncGenerator[typing.Dict[typing.Any, typing.Any], None]:
+        """
+        Retrieve a collection splitting it into disjoint partitions whose pages are requested concurrently.
+
+        Concurrency is bounded for this call only. The cap on requests to the service shared by all calls comes from
+        the client rate limiters, such as the one defined by `max_connections_per_service`, and partitions requested at
+        the same time never exceed its current limit.
+
+        :param partitions: Params that filter each partition, they will be merged into request params.
+        :param concurrency: Max num of partitions being requested at the same time.
+        :param ordered: If true, items are yielded partition after partition, otherwise as soon as they are received.
+        :param prefetch: Max num of pages requested ahead for each partition.
+        :return: Response
+        """
+        if self._rate_limiters is not None:
+            # Partitions beyond the service limit would only wait for it while holding prefetched pages
+            concurrency = min(concurrency, self._rate_limiters.limiter(self._service_name, self._owner).limit)
+
+        params = kwargs.pop("params", {})
+        channels = []
+        shared_channel = (asyncio.Queue(), asyncio.Semaphore(prefetch * concurrency))
+        for partition in partitions:
+            channel = (asyncio.Queue(), asyncio.Semaphore(prefetch)) if ordered else shared_channel
+            channels.append(({**params, **partition}, *channel))
+
+        pending = iter(channels)
+        workers = [
+            asyncio.ensure_future(self._list_partitions(pending, **kwargs))
+            for _ in range(min(concurrency, len(channels)))
+        ]
+        readers = [(queue, slots) for _, queue, slots in channels] if ordered else [shared_channel] * len(channels)
+        try:
+            for queue, slots in readers:
+                while True:
+                    page = await queue.get()
+                    if page is _END:
+                        break
+                    elif isinstance(page, Exception):
+                        raise page
+
+                    slots.release()
+                    for item in page.items:
+                        yield item
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _list_partitions(
+        self, partitions: typing.Iterator[typing.Tuple[typing.Dict, asyncio.Queue, asyncio.Semaphore]], **kwargs
+    ):
+        """
+        Request, one after another, all pages of the pending partitions, putting them into its queue.
+
+        :param partitions: Pending partitions, shared between all workers.
+        """
+        for params, queue, slots in partitions:
+            await _produce(self.list_pages(params=params, **kwargs), queue, slots)
+
+    async def _pages(self, **kwargs) -> typing.AsyncGenerator[typing.Dict[typing.Any, typing.Any], None]:
+        """
+        Iterate over the pages of a collection following continue-based pagination.
+
+        :return: Decoded pages.
+        """
         url = await self._build_url()
         kwargs["params"] = {**kwargs.get("params", {}), **{"continue": True}}
         while url:
             response = (await self._request(method="GET", url=url, **kwargs)).json()
 
-            for item in response[(await self._resource).name]:
-                yield item
+            yield response
 
-            if response["meta"].get("continue"):
-                parsed_url = urlparse(urljoin(self._service.url, response["meta"].get("continue")))
+            url = self._next_page(response["meta"].get("continue"), kwargs)
 
-                # Update url and params
-                kwargs["params"] = {**kwargs.get("params", {}), **dict(parse_qsl(parsed_url.query))}
-                url = urlunparse([parsed_url.scheme, parsed_url.netloc, parsed_url.path, None, None, None])
-            else:
-                url = None
+    async def _stream_items(self, **kwargs) -> typing.AsyncGenerator[typing.Any, None]:
+        """
+        Iterate over the items of a collection following continue-based pagination, parsing each page incrementally
+        while its body is received.
+
+        :return: Decoded items.
+        """
+        url = await self._build_url()
+        resource_name = (await self._resource).name
+        decode_record = record_decoder(self._decode_mode, self._resolved[4], self._json_codec.decoder)
+        kwargs["params"] = {**kwargs.get("params", {}), **{"continue": True}}
+        while url:
+            response = await self._request(method="GET", url=url, stream=True, **kwargs)
+            parser = ListStreamParser(resource_name)
+            try:
+                async for chunk in response.aiter_bytes():
+                    for item in parser.feed(chunk):
+                        yield decode_record(item)
+
+                parser.close()
+            except JSONDecodeError:
+                logger.error("Wrong response from service '%s': %r", self._service.name, response)
+                raise
+            finally:
+                await response.aclose()
+
+            url = self._next_page(parser.members.get("meta", {}).get("continue"), kwargs)
+
+    def _next_page(
+        self, continue_url: typing.Optional[str], kwargs: typing.Dict[str, typing.Any]
+    ) -> typing.Optional[str]:
+        """
+        Build the url of the next page of a collection, updating request params with those of the continue url.
+
+        :param continue_url: Continue url given by the current page, if any.
+        :param kwargs: Request keyword arguments.
+        :return: Url of the next page, or None if it's the last one.
+        """
+        if not continue_url:
+            return None
+
+        parsed_url = urlparse(urljoin(self._service.url, continue_url))
+        kwargs["params"] = {**kwargs.get("params", {}), **dict(parse_qsl(parsed_url.query))}
+        return urlunparse([parsed_url.scheme, parsed_url.netloc, parsed_url.path, None, None, None])
 
     async def _request(
-        self, method: str, url: str, *args, owner: bool = True, token: bool = True, **kwargs
-    ) -> Response:
+        self, method: str, url: str, *args, owner: bool = True, token: bool = True, stream: bool = False, **kwargs
+    ) -> typing.Union[Response, httpx.Response]:
         """
         Default request proxy method.
 
@@ -263,11 +789,11 @@ class RequestBuilder:
         :param kwargs: Request keyword arguments.
         :param owner: If true the owner param will be injected.
         :param token: If true the authorization token will be injected.
+        :param stream: If true, the response is returned without reading its body, that must be closed by the caller.
         :return: JSON-serialized response.
         :raise httpx.exceptions.HTTPError: Request error.
         """
-        self.method = method.upper()
-        self.url = url
+        method = method.upper()
 
         # Add owner if necessary
         if owner and self._owner is not None:
@@ -280,22 +806,63 @@ class RequestBuilder:
         }
 
         # Authorization token
-        if token and self._token:
-            kwargs["headers"]["Authorization"] = f"Bearer {self._token}"
+        current_token = self._token_manager.token if self._token_manager is not None else self._token
+        if token and current_token:
+            kwargs["headers"]["Authorization"] = f"Bearer {current_token}"
+
+        # Streamed responses are read by a single caller, so they can't be shared
+        if stream:
+            return await self._send(method, url, stream=True, **kwargs)
+
+        # Share identical GET requests in flight
+        if self._single_flight is not None and method == "GET" and kwargs.keys() <= {"params", "headers"}:
+            key = (
+                method,
+                url,
+                tuple(sorted((k, str(v)) for k, v in kwargs.get("params", {}).items())),
+                tuple(sorted(kwargs["headers"].items())),
+            )
+            return await self._single_flight.do(key, lambda: self._send(method, url, **kwargs))
 
+        return await self._send(method, url, **kwargs)
+
+    async def _send(
+        self, method: str, url: str, stream: bool = False, **kwargs
+    ) -> typing.Union[Response, httpx.Response]:
+        """
+        Send a request and parse its response.
+
+        :param method: HTTP method.
+        :param url: Request url.
+        :param stream: If true, the response is returned without reading its body, that must be closed by the caller.
+        :param kwargs: Request keyword arguments.
+        :return: JSON-serialized response.
+        :raise httpx.exceptions.HTTPError: Request error.
+        """
         try:
-            request = Request(method=self.method, url=self.url, **kwargs)
+            request = Request(method=method, url=url, json_codec=self._json_codec, **kwargs)
             logger.debug("Request: %r", request)
-            response = await self._request_with_retry(request)
+            response = await self._request_with_retry(request, stream=stream)
+            if response.status_code == 401 and self._token_manager is not None and "Authorization" in request.headers:
+                response = await self._reauthenticate(request, response, stream=stream)
             response.raise_for_status()
-            response = Response(response=response)
-            response.json()  # Parse immediately to check there is no error and cache json
+            if not stream:
+                decode_plan = self._resolved[4] if self._resolved is not None else None
+                response = Response(
+                    response=response,
+                    decode_plan=decode_plan,
+                    json_codec=self._json_codec,
+                    decode_mode=self._decode_mode,
+                )
+                response.json()  # Parse immediately to check there is no error and cache json
         except httpx.exceptions.ResponseNotRead:
             pass
         except httpx.exceptions.HTTPError as e:
-            logger.error(
-                "Error %d requesting (%s) '%s': %s", e.response.status_code, self.method, self.url, e.response.content
-            )
+            if e.response is not None:
+                status_code, content = e.response.status_code, e.response.content
+                logger.error("Error %d requesting (%s) '%s': %s", status_code, method, url, content)
+            else:
+                logger.error("Error requesting (%s) '%s': %r", method, url, e)
             raise
         except JSONDecodeError:
             logger.error("Wrong response from service '%s': %r", self._service.name, response)
@@ -305,14 +872,34 @@ class RequestBuilder:
 
         return response
 
-    async def _request_with_retry(self, request: Request) -> Response:
-        send_with_retry = backoff.on_exception(
-            backoff.expo, httpx.exceptions.HTTPError, max_tries=self._max_retries, logger=logger,
-        )(self._request_with_retry_aux)
-        return await send_with_retry(request)
+    async def _reauthenticate(self, request: Request, response: httpx.Response, stream: bool = False) -> httpx.Response:
+        """
+        Refresh the rejected token and send the request again.
+
+        :param request: Request rejected.
+        :param response: Response rejecting the request.
+        :param stream: If true, the response of the request sent again is streamed.
+        :return: Response of the request sent again, or the rejecting one if the token cannot be refreshed.
+        """
+        try:
+            token = await self._token_manager.refresh(stale=request.headers["Authorization"].partition(" ")[2])
+        except UpdateTokenError:
+            logger.exception("Error refreshing token rejected by '%s'", self._service_name)
+            return response
+
+        request.headers["Authorization"] = f"Bearer {token}"
+        return await self._request_with_retry(request, stream=stream)
+
+    async def _request_with_retry(self, request: Request, stream: bool = False) -> httpx.Response:
+        send = functools.partial(self._httpx_client.send, request=request)
+        if stream:
+            send = functools.partial(_stream, send)
+        if self._circuit_breakers is not None:
+            send = functools.partial(self._circuit_breakers[self._service_name].call, send)
+        if self._rate_limiters is not None:
+            send = functools.partial(self._rate_limiters.limiter(self._service_name, self._owner).call, send)
 
-    async def _request_with_retry_aux(self, request: Request) -> Response:
-        return await self._httpx_client.send(request=request)
+        return await self._retry_policy.send(request.method, send)
 
     async def _build_url(self, pk: str = None) -> str:
         """
@@ -321,12 +908,11 @@ class RequestBuilder:
         :param pk: Resource primary key.
         :return: Full URL.
         """
-        # Build path
-        path = (await self._resource).path
+        url = (await self._resolve())[1]
         if pk is not None:
-            path += f"/{pk}"
+            url += f"/{pk}"
 
-        return urljoin(self._service.url, path)
+        return url
 
     def __repr__(self):
         params = ", ".join([f"{i}={getattr(self, i)}" for i in ("service", "resource")])
@@ -3,7 +3,7 @@ import typing
 
 import httpx
 
-from sequoia.codecs import JSONDecoder
+from sequoia.codecs import DecodeMode, DecodePlan, JSONCodec
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +15,37 @@ class Response(httpx.Response):
     Low level response interface for interact with Sequoia services.
     """
 
-    def __init__(self, response: httpx.Response):
+    def __init__(
+        self,
+        response: httpx.Response,
+        decode_plan: typing.Optional[DecodePlan] = None,
+        json_codec: typing.Optional[JSONCodec] = None,
+        decode_mode: DecodeMode = DecodeMode.EAGER,
+    ):
         self.__dict__.update(response.__dict__.copy())
+        self._decode_plan = decode_plan
+        self._json_codec = json_codec if json_codec is not None else JSONCodec()
+        self._decode_mode = decode_mode
 
     def json(self, **kwargs: typing.Any) -> typing.Union[dict, list]:
+        """
+        Decode response content. Depending on the decode mode, values are serialized into Python native types straight
+        away, objects are returned as mappings that serialize their values on access, or raw JSON values are returned.
+
+        :return: Decoded content.
+        """
         if not hasattr(self, "_json"):
-            self._json = super().json(cls=JSONDecoder) if self.text != "" else self.text
+            if not self.content:
+                self._json = self.text
+            elif self._decode_mode is DecodeMode.RAW:
+                self._json = self._json_codec.loads_raw(self.content)
+            elif self._decode_mode is DecodeMode.LAZY:
+                decoder = self._decode_plan if self._decode_plan is not None else self._json_codec.decoder
+                self._json = decoder.lazy(self._json_codec.loads_raw(self.content))
+            elif self._decode_plan is not None:
+                self._json = self._decode_plan.decode(self._json_codec.loads_raw(self.content))
+            else:
+                self._json = self._json_codec.loads(self.content)
 
         return self._json
 
@@ -0,0 +1,235 @@
+import asyncio
+import email.utils
+import logging
+import time
+import typing
+
+import backoff
+import httpx
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["RetryBudget", "RetryPolicy"]
+
+
+class RetryBudget:
+    """
+    Token bucket that limits retries to a ratio of the requests sent plus a min num of retries per second, so retries
+    cannot multiply the load of a service that is already failing.
+    """
+
+    DEFAULT_RATIO = 0.2
+    DEFAULT_MIN_PER_SECOND = 10.0
+    DEFAULT_MAX_TOKENS = 100.0
+
+    def __init__(
+        self,
+        ratio: float = DEFAULT_RATIO,
+        min_per_second: float = DEFAULT_MIN_PER_SECOND,
+        max_tokens: float = DEFAULT_MAX_TOKENS,
+    ):
+        """
+        Token bucket that limits retries.
+
+        :param ratio: Ratio of requests that can be retried, each request deposits this amount of tokens.
+        :param min_per_second: Num of tokens deposited each second regardless of requests sent.
+        :param max_tokens: Max num of tokens that can be accumulated.
+        """
+        self._ratio = ratio
+        self._min_per_second = min_per_second
+        self._max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated_at = time.monotonic()
+
+    @property
+    def tokens(self) -> float:
+        """
+        Num of tokens available, each retry needs one of them.
+
+        :return: Num of tokens.
+        """
+        self._refill(0.0)
+        return self._tokens
+
+    def deposit(self):
+        """
+        Deposit tokens for a new request.
+        """
+        self._refill(self._ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Withdraw the token needed for a retry.
+
+        :return: True if there were tokens enough, otherwise the retry isn't allowed.
+        """
+        self._refill(0.0)
+        if self._tokens < 1.0:
+            return False
+
+        self._tokens -= 1.0
+        return True
+
+    def _refill(self, amount: float):
+        now = time.monotonic()
+        self._tokens = min(self._max_tokens, self._tokens + amount + (now - self._updated_at) * self._min_per_second)
+        self._updated_at = now
+
+
+class RetryPolicy:
+    """
+    Policy that decides which requests are retried and how long to wait between attempts.
+
+    Requests are retried after connection errors, timeouts and responses with a retryable status code, but only if the
+    method is idempotent. Non idempotent requests are only retried when the service didn't process them: connection
+    couldn't be established or it was throttled. Waits follow an exponential backoff with full jitter, unless the
+    service asks for an specific wait using Retry-After header.
+    """
+
+    DEFAULT_MAX_TRIES = 3
+    DEFAULT_BASE_DELAY = 0.5
+    DEFAULT_MAX_DELAY = 30.0
+    DEFAULT_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+    NOT_PROCESSED_STATUSES = frozenset({429})
+    NOT_PROCESSED_ERRORS = (httpx.exceptions.ConnectTimeout, httpx.exceptions.PoolTimeout)
+    RETRYABLE_ERRORS = (
+        httpx.exceptions.TimeoutException,
+        httpx.exceptions.NetworkError,
+        httpx.exceptions.ProtocolError,
+        OSError,
+    )
+
+    def __init__(
+        self,
+        max_tries: int = DEFAULT_MAX_TRIES,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        retry_statuses: typing.Iterable[int] = DEFAULT_RETRY_STATUSES,
+        budget: typing.Optional[RetryBudget] = None,
+    ):
+        """
+        Policy that decides which requests are retried and how long to wait between attempts.
+
+        :param max_tries: Max num of attempts for each request, including the first one.
+        :param base_delay: Upper bound of the first wait, it's doubled on each attempt.
+        :param max_delay: Max num of seconds to wait between attempts.
+        :param retry_statuses: Response status codes that will be retried.
+        :param budget: Retry budget shared between all requests using this policy.
+        """
+        self.max_tries = max_tries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+        self.budget = budget
+
+    async def send(self, method: str, send: typing.Callable[[], typing.Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Send a request, retrying it following this policy.
+
+        :param method: HTTP method of the request.
+        :param send: Function that sends the request.
+        :return: Last response received.
+        :raise httpx.exceptions.HTTPError: Error of the last attempt.
+        """
+        if self.budget is not None:
+            self.budget.deposit()
+
+        attempt = 1
+        while True:
+            try:
+                response = await send()
+            except Exception as e:
+                if not self._retry(attempt, self.retryable_error(method, e)):
+                    raise
+
+                delay = self.delay(attempt)
+                logger.warning("Retrying %s request in %.2fs after error: %r", method, delay, e)
+            else:
+                if not self._retry(attempt, self.retryable_response(method, response)):
+                    return response
+
+                delay = self.delay(attempt, response)
+                logger.warning("Retrying %s request in %.2fs after status %d", method, delay, response.status_code)
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def retryable_error(self, method: str, error: Exception) -> bool:
+        """
+        Check if a request that raised an error can be retried.
+
+        :param method: HTTP method of the request.
+        :param error: Error raised.
+        :return: True if it can be retried.
+        """
+        if method.upper() in self.IDEMPOTENT_METHODS:
+            return isinstance(error, self.RETRYABLE_ERRORS)
+
+        return isinstance(error, self.NOT_PROCESSED_ERRORS)
+
+    def retryable_response(self, method: str, response: httpx.Response) -> bool:
+        """
+        Check if a request can be retried given its response.
+
+        :param method: HTTP method of the request.
+        :param response: Response received.
+        :return: True if it can be retried.
+        """
+        if method.upper() in self.IDEMPOTENT_METHODS:
+            return response.status_code in self.retry_statuses
+
+        return response.status_code in self.retry_statuses & self.NOT_PROCESSED_STATUSES
+
+    def delay(self, attempt: int, response: typing.Optional[httpx.Response] = None) -> float:
+        """
+        Num of seconds to wait before next attempt.
+
+        :param attempt: Num of the attempt that failed, starting in 1.
+        :param response: Response received, if any.
+        :return: Num of seconds.
+        """
+        retry_after = retry_after_delay(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+
+        return backoff.full_jitter(min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _retry(self, attempt: int, retryable: bool) -> bool:
+        """
+        Check if a new attempt is allowed, withdrawing from the budget if so.
+
+        :param attempt: Num of the attempt that failed, starting in 1.
+        :param retryable: If the attempt failed in a retryable way.
+        :return: True if a new attempt is allowed.
+        """
+        if not retryable or attempt >= self.max_tries:
+            return False
+
+        if self.budget is not None and not self.budget.withdraw():
+            logger.warning("Retry budget exhausted, giving up")
+            return False
+
+        return True
+
+
+def retry_after_delay(response: httpx.Response) -> typing.Optional[float]:
+    """
+    Num of seconds a service asks to wait before sending new requests, using Retry-After header.
+
+    :param response: Response received.
+    :return: Num of seconds if the header is present and valid.
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,86 @@
+import json
+import logging
+import os
+import time
+import typing
+
+from sequoia.types import DiscoveryOptions, ServicesRegistry
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["DiscoverySnapshot"]
+
+
+class DiscoverySnapshot:
+    """
+    Local file storing the services registry, along with the resources already discovered, so a client can start
+    without requesting discovery endpoints while the snapshot is fresh.
+    """
+
+    DEFAULT_TTL = 3600.0
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL):
+        """
+        Local file storing the services registry.
+
+        :param path: File path.
+        :param ttl: Num of seconds the snapshot can be used since it was saved.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.created_at: typing.Optional[float] = None
+
+    def load(
+        self, registry_url: str, owner: typing.Optional[str] = None, options: typing.Optional[DiscoveryOptions] = None
+    ) -> typing.Optional[ServicesRegistry]:
+        """
+        Load the services registry if the snapshot is fresh and was saved for the same registry and owner.
+
+        :param registry_url: URL for Registry service.
+        :param owner: Owner.
+        :param options: Options for discovering resources of services.
+        :return: Services registry, or None if there is no valid snapshot.
+        """
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+
+            if data["registry_url"] != registry_url or data["owner"] != owner:
+                return None
+
+            if time.time() - data["created_at"] > self.ttl:
+                logger.debug("Discovery snapshot '%s' expired", self.path)
+                return None
+
+            services = ServicesRegistry.from_dict(data, options)
+            self.created_at = data["created_at"]
+            return services
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning("Ignoring invalid discovery snapshot '%s'", self.path, exc_info=True)
+            return None
+
+    def save(
+        self, services: ServicesRegistry, registry_url: str, owner: typing.Optional[str] = None, fresh: bool = True
+    ):
+        """
+        Save the services registry, replacing the file atomically so concurrent processes never read a partial one.
+
+        :param services: Services registry.
+        :param registry_url: URL for Registry service.
+        :param owner: Owner.
+        :param fresh: If the registry has just been discovered. Otherwise the snapshot keeps the creation time of the
+        one it was loaded from or last saved, so it expires as the original discovery does.
+        """
+        created_at = time.time() if fresh or self.created_at is None else self.created_at
+        data = {"created_at": created_at, "registry_url": registry_url, "owner": owner, **services.to_dict()}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+
+            os.replace(tmp_path, self.path)
+            self.created_at = created_at
+        except OSError:
+            logger.warning("Error saving discovery snapshot '%s'", self.path, exc_info=True)
@@ -0,0 +1,238 @@
+import codecs
+import enum
+import json
+import re
+import typing
+
+__all__ = ["ListStreamParser"]
+
+
+class _State(enum.Enum):
+    START = "start"
+    FIRST_KEY = "first_key"
+    KEY = "key"
+    VALUE = "value"
+    AFTER_VALUE = "after_value"
+    FIRST_ITEM = "first_item"
+    ITEM = "item"
+    AFTER_ITEM = "after_item"
+    END = "end"
+
+
+class ListStreamParser:
+    """
+    Incremental parser of list pages. It's fed with chunks of the response body and returns each item of the resource
+    array as soon as it's complete, keeping the rest of members of the page, such as `meta`, once they are parsed.
+
+    Items and members are returned as raw JSON values.
+    """
+
+    whitespace = re.compile(r"[ \t\n\r]*")
+    delimiters = frozenset(" \t\n\r,:]}")
+
+    def __init__(self, resource: str):
+        """
+        :param resource: Resource name, the key holding the items in the page.
+        """
+        self.resource = resource
+        self.members: typing.Dict[str, typing.Any] = {}
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._final = False
+        self._state = _State.START
+        self._key: typing.Optional[str] = None
+        self._steps = {
+            _State.START: self._start,
+            _State.FIRST_KEY: self._first_member,
+            _State.KEY: self._member_key,
+            _State.VALUE: self._member_value,
+            _State.AFTER_VALUE: self._after_member,
+            _State.FIRST_ITEM: self._first_item,
+            _State.ITEM: self._item,
+            _State.AFTER_ITEM: self._after_item,
+            _State.END: self._end,
+        }
+
+    def feed(self, chunk: bytes) -> typing.List[typing.Any]:
+        """
+        Parse a new chunk of the page.
+
+        :param chunk: Bytes of the page following the previous chunk.
+        :return: Items completed by this chunk.
+        :raise json.JSONDecodeError: Malformed page.
+        """
+        self._buffer = self._buffer[self._pos :] + self._text_decoder.decode(chunk)
+        self._pos = 0
+        return self._parse()
+
+    def close(self):
+        """
+        Finish parsing the page once its whole body has been fed. Items are always completed by the chunk closing them,
+        so there are no items left at this point.
+
+        :raise json.JSONDecodeError: Malformed or incomplete page.
+        """
+        self._buffer = self._buffer[self._pos :] + self._text_decoder.decode(b"", final=True)
+        self._pos = 0
+        self._final = True
+        self._parse()
+        if self._state is not _State.END:
+            raise json.JSONDecodeError("Incomplete page", self._buffer, self._pos)
+
+    def _parse(self) -> typing.List[typing.Any]:
+        """
+        Advance through the buffered text as far as possible.
+
+        :return: Items completed.
+        """
+        items: typing.List[typing.Any] = []
+        while self._steps[self._state](items):
+            pass
+
+        return items
+
+    def _next_char(self) -> typing.Optional[str]:
+        """
+        Skip whitespaces and return the next char, without consuming it.
+
+        :return: Next char, or None if the buffer is exhausted.
+        """
+        self._pos = self.whitespace.match(self._buffer, self._pos).end()
+        return self._buffer[self._pos] if self._pos < len(self._buffer) else None
+
+    def _expect(self, *chars: str) -> typing.Optional[str]:
+        """
+        Consume the next char, that must be one of the given ones.
+
+        :param chars: Valid chars.
+        :return: Char consumed, or None if the buffer is exhausted.
+        :raise json.JSONDecodeError: Unexpected char.
+        """
+        char = self._next_char()
+        if char is None:
+            return None
+
+        if char not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {', '.join(repr(c) for c in chars)}", self._buffer, self._pos)
+
+        self._pos += 1
+        return char
+
+    def _value(self) -> typing.Tuple[bool, typing.Any]:
+        """
+        Consume the next JSON value if it's complete. A value is complete when it's followed by a whitespace or a
+        delimiter, so numbers split between chunks, such as `1.` followed by `5`, are not cut.
+
+        :return: Whether a value was consumed, and its value.
+        :raise json.JSONDecodeError: Malformed value.
+        """
+        if self._next_char() is None:
+            return False, None
+
+        try:
+            value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if self._final:
+                raise
+            return False, None
+
+        if not self._final and (end == len(self._buffer) or self._buffer[end] not in self.delimiters):
+            return False, None
+
+        self._pos = end
+        return True, value
+
+    def _start(self, items: typing.List[typing.Any]) -> bool:
+        if self._expect("{") is None:
+            return False
+
+        self._state = _State.FIRST_KEY
+        return True
+
+    def _first_member(self, items: typing.List[typing.Any]) -> bool:
+        char = self._next_char()
+        if char is None:
+            return False
+
+        if char == "}":
+            self._pos += 1
+            self._state = _State.END
+        else:
+            self._state = _State.KEY
+        return True
+
+    def _member_key(self, items: typing.List[typing.Any]) -> bool:
+        if self._next_char() not in ('"', None):
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes", self._buffer, self._pos)
+
+        start = self._pos
+        parsed, key = self._value()
+        if not parsed:
+            return False
+
+        if self._expect(":") is None:
+            self._pos = start
+            return False
+
+        self._key = key
+        self._state = _State.VALUE
+        return True
+
+    def _member_value(self, items: typing.List[typing.Any]) -> bool:
+        if self._key == self.resource and self._next_char() == "[":
+            self._pos += 1
+            self._state = _State.FIRST_ITEM
+            return True
+
+        parsed, value = self._value()
+        if not parsed:
+            return False
+
+        self.members[self._key] = value
+        self._state = _State.AFTER_VALUE
+        return True
+
+    def _after_member(self, items: typing.List[typing.Any]) -> bool:
+        char = self._expect(",", "}")
+        if char is None:
+            return False
+
+        self._state = _State.KEY if char == "," else _State.END
+        return True
+
+    def _first_item(self, items: typing.List[typing.Any]) -> bool:
+        char = self._next_char()
+        if char is None:
+            return False
+
+        if char == "]":
+            self._pos += 1
+            self._state = _State.AFTER_VALUE
+        else:
+            self._state = _State.ITEM
+        return True
+
+    def _item(self, items: typing.List[typing.Any]) -> bool:
+        parsed, value = self._value()
+        if not parsed:
+            return False
+
+        items.append(value)
+        self._state = _State.AFTER_ITEM
+        return True
+
+    def _after_item(self, items: typing.List[typing.Any]) -> bool:
+        char = self._expect(",", "]")
+        if char is None:
+            return False
+
+        self._state = _State.ITEM if char == "," else _State.AFTER_VALUE
+        return True
+
+    def _end(self, items: typing.List[typing.Any]) -> bool:
+        if self._next_char() is not None:
+            raise json.JSONDecodeError("Extra data", self._buffer, self._pos)
+
+        return False
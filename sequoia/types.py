@@ -5,10 +5,24 @@ import typing
 import httpx
 
 from sequoia.exceptions import DiscoveryResourcesError, DiscoveryServicesError, ResourceNotFound, ServiceNotFound
+from sequoia.flight import SingleFlight
+from sequoia.retry import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["Resource", "ResourcesRegistry", "Service", "ServicesRegistry"]
+__all__ = [
+    "BulkResult",
+    "ChunkError",
+    "DiscoveryOptions",
+    "LazyServicesRegistry",
+    "Page",
+    "RegistryDiff",
+    "Resource",
+    "ResourcesRegistry",
+    "RetrieveResult",
+    "Service",
+    "ServicesRegistry",
+]
 
 
 @dataclasses.dataclass
@@ -19,6 +33,104 @@ class Resource:
 
     name: str
     path: str
+    fields: typing.Dict[str, str] = dataclasses.field(default_factory=dict, compare=False)
+
+    @staticmethod
+    def field_types(fields: typing.Any) -> typing.Dict[str, str]:
+        """
+        Extract the declared type of each field from the fields description of a resourceful in a service descriptor.
+
+        Fields can be described either as a mapping of field name to definition or as a list of definitions, and the
+        type is taken from the Sequoia type of the field if present, the JSON schema type otherwise.
+
+        :param fields: Fields description.
+        :return: Declared type of each field, by field name.
+        """
+        if isinstance(fields, dict):
+            definitions = [{"name": k, **v} for k, v in fields.items() if isinstance(v, dict)]
+        elif isinstance(fields, list):
+            definitions = [i for i in fields if isinstance(i, dict) and "name" in i]
+        else:
+            definitions = []
+
+        types = {}
+        for definition in definitions:
+            kind = definition.get("sequoiaType") or definition.get("type")
+            if isinstance(kind, str):
+                types[definition["name"]] = kind
+
+        return types
+
+
+@dataclasses.dataclass
+class Page:
+    """
+    Representation of a single page of a Sequoia collection.
+    """
+
+    items: typing.List[typing.Dict[str, typing.Any]]
+    meta: typing.Dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+    linked: typing.Dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class ChunkError:
+    """
+    Representation of an error occurred sending a chunk of a bulk operation.
+    """
+
+    index: int
+    documents: typing.List[typing.Dict[str, typing.Any]]
+    error: Exception
+
+
+@dataclasses.dataclass
+class BulkResult:
+    """
+    Representation of the outcome of a bulk operation.
+    """
+
+    created: typing.List[typing.Dict[str, typing.Any]] = dataclasses.field(default_factory=list)
+    errors: typing.List[ChunkError] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class RetrieveResult:
+    """
+    Representation of the outcome of retrieving many resources.
+    """
+
+    found: typing.Dict[str, typing.Dict[str, typing.Any]] = dataclasses.field(default_factory=dict)
+    missing: typing.List[str] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class DiscoveryOptions:
+    """
+    Options for requesting discovery endpoints.
+    """
+
+    DEFAULT_TIMEOUT = 60.0
+
+    httpx_client: typing.Optional[httpx.AsyncClient] = None
+    timeout: typing.Union[float, httpx.Timeout] = DEFAULT_TIMEOUT
+    retry_policy: RetryPolicy = dataclasses.field(default_factory=RetryPolicy)
+
+    async def get(self, url: str) -> httpx.Response:
+        """
+        Request a discovery endpoint, reusing the connection pool of the httpx client if defined.
+
+        :param url: Endpoint url.
+        :return: Response.
+        :raise httpx.exceptions.HTTPError: Request error.
+        """
+        if self.httpx_client is None:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                return await DiscoveryOptions(client, self.timeout, self.retry_policy).get(url)
+
+        response = await self.retry_policy.send("GET", lambda: self.httpx_client.get(url, timeout=self.timeout))
+        response.raise_for_status()
+        return response
 
 
 class ResourcesRegistry(dict):
@@ -43,43 +155,92 @@ class Service:
     url: str
     title: typing.Optional[str] = dataclasses.field(default=None, hash=False, compare=False)
     description: typing.Optional[str] = dataclasses.field(default=None, hash=False, compare=False)
+    options: DiscoveryOptions = dataclasses.field(
+        default_factory=DiscoveryOptions, hash=False, compare=False, repr=False
+    )
+    _flight: SingleFlight = dataclasses.field(
+        default_factory=SingleFlight, init=False, hash=False, compare=False, repr=False
+    )
 
     async def discover(self):
         """
         Request a service description endpoint to discover its resources and metadata.
         """
-        async with httpx.AsyncClient(timeout=60) as client:
-            try:
-                response = await client.get(f"{self.url}/descriptor/raw/")
-                response.raise_for_status()
-                response = response.json()
-
-                self.title = response["title"]
-                self.description = response["description"]
-                self._resources = ResourcesRegistry(
-                    {
-                        i["hyphenatedPluralName"].replace("-", "_"): Resource(
-                            name=i["pluralName"], path=f"{i['path']}/{i['hyphenatedPluralName']}"
-                        )
-                        for i in response["resourcefuls"].values()
-                    }
-                )
-            except KeyError:
-                logger.exception("Wrong response retrieving description of service '%s': %s", self.name, str(response))
-                raise DiscoveryResourcesError(service=self.name)
-            except (httpx.exceptions.HTTPError, OSError):
-                raise DiscoveryResourcesError(service=self.name)
+        try:
+            response = (await self.options.get(f"{self.url}/descriptor/raw/")).json()
+
+            self.title = response["title"]
+            self.description = response["description"]
+            self._resources = ResourcesRegistry(
+                {
+                    i["hyphenatedPluralName"].replace("-", "_"): Resource(
+                        name=i["pluralName"],
+                        path=f"{i['path']}/{i['hyphenatedPluralName']}",
+                        fields=Resource.field_types(i.get("fields")),
+                    )
+                    for i in response["resourcefuls"].values()
+                }
+            )
+        except KeyError:
+            logger.exception("Wrong response retrieving description of service '%s': %s", self.name, str(response))
+            raise DiscoveryResourcesError(service=self.name)
+        except (httpx.exceptions.HTTPError, OSError):
+            raise DiscoveryResourcesError(service=self.name)
+
+    @property
+    def discovered_resources(self) -> typing.Optional[ResourcesRegistry]:
+        """
+        Return the registry of resources if already discovered, without discovering it.
+
+        :return: Resources registry, or None if not discovered yet.
+        """
+        return getattr(self, "_resources", None)
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """
+        Serializable representation of the service, including its resources if already discovered.
+
+        :return: Service data.
+        """
+        data = {"name": self.name, "url": self.url, "title": self.title, "description": self.description}
+        if hasattr(self, "_resources"):
+            data["resources"] = {k: dataclasses.asdict(v) for k, v in self._resources.items()}
+
+        return data
+
+    @classmethod
+    def from_dict(
+        cls, data: typing.Dict[str, typing.Any], options: typing.Optional[DiscoveryOptions] = None
+    ) -> "Service":
+        """
+        Build a service from its serializable representation.
+
+        :param data: Service data.
+        :param options: Options for discovering its resources, if not included in data.
+        :return: Service.
+        """
+        service = cls(
+            name=data["name"],
+            url=data["url"],
+            title=data.get("title"),
+            description=data.get("description"),
+            options=options if options is not None else DiscoveryOptions(),
+        )
+        if "resources" in data:
+            service._resources = ResourcesRegistry({k: Resource(**v) for k, v in data["resources"].items()})
+
+        return service
 
     @property
     async def resources(self) -> ResourcesRegistry:
         """
         Return the registry containing all the resources that are part of this service. This registry will be loaded
-        when requested, following lazy pattern.
+        when requested, following lazy pattern, sharing a single discovery between concurrent calls.
 
         :return: Resources registry.
         """
         if not hasattr(self, "_resources"):
-            await self.discover()
+            await self._flight.do("discover", self.discover)
 
         return self._resources
 
@@ -97,26 +258,144 @@ class ServicesRegistry(dict):
 
         return value
 
-    async def discover(self, registry_url: str, owner: typing.Optional[str] = None):
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """
+        Serializable representation of the registry, including resources of those services already discovered.
+
+        :return: Registry data.
         """
-        Request Registry service to update the list of all available services.
+        return {"services": [service.to_dict() for service in self.values()]}
 
+    @classmethod
+    def from_dict(
+        cls, data: typing.Dict[str, typing.Any], options: typing.Optional[DiscoveryOptions] = None
+    ) -> "ServicesRegistry":
+        """
+        Build a registry from its serializable representation.
+
+        :param data: Registry data.
+        :param options: Options for discovering resources of its services.
         :return: Services registry.
         """
-        async with httpx.AsyncClient(timeout=60) as client:
-            try:
-                response = await client.get(f"{registry_url}/services/{owner or 'root'}/")
-                response.raise_for_status()
-                response = response.json()
+        return cls({i["name"]: Service.from_dict(i, options) for i in data["services"]})
 
-                self.clear()
-                self.update(
-                    sorted(
-                        {i["name"]: Service(name=i["name"], url=i["location"]) for i in response["services"]}.items()
-                    )
-                )
-            except KeyError:
-                logger.exception("Wrong response retrieving list of services from 'registry': %s", str(response))
-                raise DiscoveryServicesError()
-            except (httpx.exceptions.HTTPError, OSError):
-                raise DiscoveryServicesError()
+    async def ready(self):
+        """
+        Wait until the registry is ready to be used. This registry is always ready since it's updated explicitly.
+        """
+        pass
+
+    async def discover(
+        self, registry_url: str, owner: typing.Optional[str] = None, options: typing.Optional[DiscoveryOptions] = None
+    ) -> "RegistryDiff":
+        """
+        Request Registry service to update the list of all available services. The new list is built aside and then
+        swapped in at once, keeping the services whose URL hasn't changed along with their discovered resources.
+
+        :param registry_url: URL for Registry service.
+        :param owner: Owner.
+        :param options: Options for requesting Registry and the description of each service.
+        :return: Differences with the previous list of services.
+        """
+        options = options if options is not None else DiscoveryOptions()
+        try:
+            response = (await options.get(f"{registry_url}/services/{owner or 'root'}/")).json()
+            services = {
+                i["name"]: Service(name=i["name"], url=i["location"], options=options) for i in response["services"]
+            }
+        except KeyError:
+            logger.exception("Wrong response retrieving list of services from 'registry': %s", str(response))
+            raise DiscoveryServicesError()
+        except (httpx.exceptions.HTTPError, OSError):
+            raise DiscoveryServicesError()
+
+        return self._swap(services)
+
+    def _swap(self, services: typing.Dict[str, Service]) -> "RegistryDiff":
+        """
+        Replace current services by the given ones, keeping current services whose URL hasn't changed.
+
+        :param services: New services by name.
+        :return: Differences with the previous services.
+        """
+        diff = RegistryDiff(
+            added=sorted(services.keys() - self.keys()),
+            removed=sorted(self.keys() - services.keys()),
+            relocated=sorted(k for k in services.keys() & self.keys() if services[k].url != self[k].url),
+        )
+
+        for name in services.keys() & self.keys():
+            if name not in diff.relocated:
+                self[name].options = services[name].options
+                services[name] = self[name]
+
+        # No awaits from here on, so no other coroutine can see a partially updated registry
+        self.clear()
+        self.update(sorted(services.items()))
+
+        if diff:
+            logger.info("Services registry updated: %s", diff)
+
+        return diff
+
+
+class LazyServicesRegistry(ServicesRegistry):
+    """
+    Mapping of available services by name for an owner, discovered the first time it's needed.
+    """
+
+    def __init__(
+        self,
+        registry_url: str,
+        owner: typing.Optional[str] = None,
+        options: typing.Optional[DiscoveryOptions] = None,
+        shared: typing.Optional[ServicesRegistry] = None,
+    ):
+        """
+        Mapping of available services by name for an owner, discovered the first time it's needed.
+
+        :param registry_url: URL for Registry service.
+        :param owner: Owner.
+        :param options: Options for requesting Registry and the description of each service.
+        :param shared: Registry whose services are reused when they have the same URL, along with their resources.
+        """
+        super().__init__()
+        self._registry_url = registry_url
+        self._owner = owner
+        self._options = options
+        self._shared = shared
+        self._discovered = False
+        self._flight = SingleFlight()
+
+    async def ready(self):
+        """
+        Discover the registry unless it's already discovered, sharing a single discovery between concurrent calls.
+        """
+        if not self._discovered:
+            await self._flight.do("discover", self._discover)
+
+    async def _discover(self):
+        """
+        Discover the registry, reusing services of the shared registry.
+        """
+        await self.discover(self._registry_url, self._owner, self._options)
+        if self._shared is not None:
+            for name, service in list(self.items()):
+                if name in self._shared and self._shared[name].url == service.url:
+                    self[name] = self._shared[name]
+
+        self._discovered = True
+
+
+@dataclasses.dataclass
+class RegistryDiff:
+    """
+    Representation of the differences between two versions of the services registry.
+    """
+
+    added: typing.List[str] = dataclasses.field(default_factory=list)
+    removed: typing.List[str] = dataclasses.field(default_factory=list)
+    relocated: typing.List[str] = dataclasses.field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.relocated)
@@ -1,5 +1,6 @@
 from unittest.mock import Mock
 
+import httpx
 import pytest
 
 from sequoia.response import Response
@@ -8,6 +9,7 @@ from sequoia.response import Response
 @pytest.fixture
 def response_registry_list_services():
     response_mock = Mock(spec=Response)
+    response_mock.status_code = 200
     response_mock.json.return_value = {
         "services": [
             {
@@ -37,6 +39,7 @@ def response_registry_list_services():
 @pytest.fixture
 def response_identity_get_description():
     response_mock = Mock(spec=Response)
+    response_mock.status_code = 200
     response_mock.json.return_value = {
         "name": "identity",
         "urn": "urn:piksel:service:identity",
@@ -62,6 +65,7 @@ def response_identity_get_description():
 @pytest.fixture
 def response_registry_get_description():
     response_mock = Mock(spec=Response)
+    response_mock.status_code = 200
     response_mock.json.return_value = {
         "name": "registry",
         "urn": "urn:piksel:service:registry",
@@ -114,6 +118,7 @@ def response_registry_get_description():
 @pytest.fixture
 def response_metadata_get_description():
     response_mock = Mock(spec=Response)
+    response_mock.status_code = 200
     response_mock.json.return_value = {
         "name": "metadata",
         "urn": "urn:piksel:service:metadata",
@@ -151,6 +156,15 @@ def response_metadata_get_description():
 @pytest.fixture
 def response_identity_get_oauth_token():
     response_mock = Mock(spec=Response)
+    response_mock.status_code = 200
     response_mock.json.return_value = {"access_token": "74b685d3ba5943662884cf786e4ca8d6ff71cc09"}
 
     return response_mock
+
+
+@pytest.fixture
+def response():
+    def _response(status_code: int, headers: dict = None) -> httpx.Response:
+        return httpx.Response(request=Mock(), status_code=status_code, headers=headers, content=b"")
+
+    return _response
@@ -0,0 +1,180 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from sequoia.auth import TokenManager
+from sequoia.exceptions import UpdateTokenError
+
+
+class TestCaseTokenManager:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_refresh(self):
+        # Prepare
+        manager = TokenManager(AsyncMock(return_value=("foo", None)))
+
+        # Run
+        token = await manager.refresh()
+
+        # Asserts
+        assert token == "foo"
+        assert manager.token == "foo"
+        assert manager.expires_in is None
+        assert manager._refresh_task is None
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_refresh_single_flight(self):
+        # Prepare
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return "foo", None
+
+        fetch_mock = AsyncMock(side_effect=fetch)
+        manager = TokenManager(fetch_mock)
+
+        # Run
+        tokens = await asyncio.gather(*[manager.refresh() for _ in range(100)])
+
+        # Asserts
+        assert tokens == ["foo"] * 100
+        assert fetch_mock.call_count == 1
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_refresh_stale(self):
+        # Prepare
+        fetch_mock = AsyncMock(side_effect=[("foo", None), ("bar", None)])
+        manager = TokenManager(fetch_mock)
+        await manager.refresh()
+
+        # Run
+        first = await manager.refresh(stale="foo")
+        second = await manager.refresh(stale="foo")
+
+        # Asserts
+        assert first == "bar"
+        assert second == "bar"
+        assert fetch_mock.call_count == 2
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_refresh_before_expiration(self):
+        # Prepare
+        fetch_mock = AsyncMock(side_effect=[("foo", 1.0), ("bar", 3600)])
+        manager = TokenManager(fetch_mock, refresh_margin=0.5, min_refresh_delay=0)
+
+        # Run
+        await manager.refresh()
+        expires_in = manager.expires_in
+        await asyncio.sleep(0.6)
+
+        # Asserts
+        assert 0.5 < expires_in <= 1.0
+        assert manager.token == "bar"
+        assert fetch_mock.call_count == 2
+        await manager.close()
+        assert manager.token is None
+        assert manager._refresh_task is None
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "expires_in,expected_delay",
+        [
+            pytest.param(30, 15, id="Below margin"),
+            pytest.param(60, 30, id="Equal to margin"),
+            pytest.param(1, 1, id="Below min delay"),
+            pytest.param(3600, 3540, id="Above margin"),
+        ],
+    )
+    async def test_refresh_short_expiration(self, expires_in, expected_delay):
+        # Prepare
+        fetch_mock = AsyncMock(return_value=("foo", expires_in))
+        manager = TokenManager(fetch_mock)
+
+        # Run
+        with patch.object(manager, "_schedule", wraps=manager._schedule) as schedule_mock:
+            await manager.refresh()
+            await asyncio.sleep(0.05)
+
+        # Asserts
+        assert fetch_mock.call_count == 1
+        schedule_mock.assert_called_once_with(expected_delay)
+        await manager.close()
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_refresh_before_expiration_error(self):
+        # Prepare
+        fetch_mock = AsyncMock(side_effect=[("foo", 0.02), UpdateTokenError(), ("bar", None)])
+        manager = TokenManager(fetch_mock, refresh_margin=1, retry_delay=0, min_refresh_delay=0)
+
+        # Run
+        await manager.refresh()
+        with patch("sequoia.auth.logger"):
+            await asyncio.sleep(0.05)
+
+        # Asserts
+        assert manager.token == "bar"
+        assert fetch_mock.call_count == 3
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_close_cancels_refresh(self):
+        # Prepare
+        manager = TokenManager(AsyncMock(return_value=("foo", 3600)))
+        await manager.refresh()
+        task = manager._refresh_task
+
+        # Run
+        await manager.close()
+        await asyncio.sleep(0)
+
+        # Asserts
+        assert task.cancelled()
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_close_during_refresh(self):
+        # Prepare
+        fetching = asyncio.Event()
+        release = asyncio.Event()
+
+        async def fetch():
+            fetching.set()
+            await release.wait()
+            return "foo", 3600
+
+        manager = TokenManager(AsyncMock(side_effect=fetch))
+        refresh = asyncio.ensure_future(manager.refresh())
+        await fetching.wait()
+
+        # Run
+        await manager.close()
+        release.set()
+        token = await refresh
+
+        # Asserts
+        assert token == "foo"
+        assert manager.token is None
+        assert manager.expires_in is None
+        assert manager._refresh_task is None
+        assert not [t for t in asyncio.all_tasks() if t.get_coro().__name__ == "_refresh_later"]
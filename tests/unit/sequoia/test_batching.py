@@ -0,0 +1,191 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+
+from sequoia.batching import WriteCoalescer
+from sequoia.request import RequestBuilder
+from sequoia.types import Resource, ResourcesRegistry, Service, ServicesRegistry
+
+
+@pytest.fixture(scope="module")
+def services_registry():
+    s = Service(name="foo", url="https://foo")
+    s._resources = ResourcesRegistry({"bar": Resource(name="bar", path="/bar")})
+    return ServicesRegistry({"foo": s})
+
+
+def echo(status_code=200, body=None):
+    async def send(request):
+        await request.aread()
+        content = json.dumps(body if body is not None else json.loads(request.content)).encode()
+        return httpx.Response(request=Mock(), status_code=status_code, content=content)
+
+    return send
+
+
+class TestCaseWriteCoalescer:
+    @pytest.fixture
+    def write_coalescer(self):
+        return WriteCoalescer(max_size=3, max_delay=0.01)
+
+    @pytest.fixture
+    def request_builder(self, services_registry, write_coalescer):
+        httpx_client = AsyncMock(spec=httpx.AsyncClient)
+        httpx_client.send = AsyncMock(side_effect=echo())
+        return RequestBuilder(
+            httpx_client=httpx_client,
+            available_services=services_registry,
+            max_retries=1,
+            write_coalescer=write_coalescer,
+        )
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_create_gathered(self, request_builder):
+        # Run
+        results = await asyncio.gather(*[request_builder.foo.bar.create(json={"id": i}) for i in range(2)])
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 1
+        request = request_builder._httpx_client.send.call_args_list[0][1]["request"]
+        assert request.method == "POST"
+        assert request.url == "https://foo/bar"
+        assert request.content == b'{"bar": [{"id": 0}, {"id": 1}]}'
+        assert results == [{"id": 0}, {"id": 1}]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_create_max_size(self, request_builder):
+        # Run
+        results = await asyncio.gather(*[request_builder.foo.bar.create(json={"id": i}) for i in range(4)])
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 2
+        assert results == [{"id": i} for i in range(4)]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_create_with_kwargs_not_gathered(self, request_builder):
+        # Run
+        results = await asyncio.gather(
+            *[request_builder.foo.bar.create(json={"id": i}, headers={"foo": "bar"}) for i in range(2)]
+        )
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 2
+        assert results == [{"id": 0}, {"id": 1}]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_create_rejected_one_by_one(self, request_builder):
+        # Prepare
+        async def send(request):
+            await request.aread()
+            body = json.loads(request.content)
+            status_code = 400 if len(body["bar"]) > 1 or body["bar"][0]["id"] == 1 else 200
+            return httpx.Response(request=Mock(), status_code=status_code, content=request.content)
+
+        request_builder._httpx_client.send = AsyncMock(side_effect=send)
+
+        # Run
+        results = await asyncio.gather(
+            *[request_builder.foo.bar.create(json={"id": i}) for i in range(2)], return_exceptions=True
+        )
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 3
+        assert results[0] == {"id": 0}
+        assert isinstance(results[1], httpx.exceptions.HTTPError)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_create_server_error(self, request_builder):
+        # Prepare
+        request_builder._httpx_client.send = AsyncMock(side_effect=echo(status_code=503))
+
+        # Run
+        results = await asyncio.gather(
+            *[request_builder.foo.bar.create(json={"id": i}) for i in range(2)], return_exceptions=True
+        )
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 1
+        assert all(isinstance(i, httpx.exceptions.HTTPError) for i in results)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_create_wrong_response(self, request_builder):
+        # Prepare
+        request_builder._httpx_client.send = AsyncMock(side_effect=echo(body={"bar": [{"id": 0}]}))
+
+        # Run
+        results = await asyncio.gather(
+            *[request_builder.foo.bar.create(json={"id": i}) for i in range(2)], return_exceptions=True
+        )
+
+        # Asserts
+        assert all(isinstance(i, ValueError) for i in results)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_create_unexpected_error(self, request_builder):
+        # Prepare
+        request_builder._httpx_client.send = AsyncMock(side_effect=echo(body={"foo": []}))
+
+        # Run
+        results = await asyncio.gather(
+            *[request_builder.foo.bar.create(json={"id": i}) for i in range(2)], return_exceptions=True
+        )
+
+        # Asserts
+        assert all(isinstance(i, KeyError) for i in results)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_create_caller_cancelled(self, request_builder):
+        # Run
+        cancelled = asyncio.ensure_future(request_builder.foo.bar.create(json={"id": 0}))
+        result = asyncio.ensure_future(request_builder.foo.bar.create(json={"id": 1}))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        # Asserts
+        assert await result == {"id": 1}
+        assert cancelled.cancelled()
+        assert request_builder._httpx_client.send.call_count == 1
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_close(self, request_builder, write_coalescer):
+        # Prepare
+        write_coalescer._max_delay = 60
+        result = asyncio.ensure_future(request_builder.foo.bar.create(json={"id": 0}))
+        await asyncio.sleep(0)
+
+        # Run
+        await write_coalescer.close()
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 1
+        assert await result == {"id": 0}
@@ -0,0 +1,99 @@
+from unittest.mock import patch
+
+import pytest
+
+from sequoia.cache import CacheEntry, ResponseCache
+
+
+class TestCaseCacheEntry:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_fresh(self):
+        with patch("time.monotonic", return_value=10.0):
+            assert CacheEntry(value="foo", expires_at=11.0).fresh
+            assert not CacheEntry(value="foo", expires_at=10.0).fresh
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_validators(self):
+        entry = CacheEntry(value="foo", expires_at=0.0, etag='"foo"', last_modified="Sat, 01 Jan 2000 00:00:00 GMT")
+
+        assert entry.validators == {"If-None-Match": '"foo"', "If-Modified-Since": "Sat, 01 Jan 2000 00:00:00 GMT"}
+        assert CacheEntry(value="foo", expires_at=0.0).validators == {}
+
+
+class TestCaseResponseCache:
+    @pytest.fixture
+    def cache(self):
+        return ResponseCache(ttl=10.0, max_size=2, ttls={"foo.bar": 100.0})
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_set_get(self, cache):
+        # Run
+        with patch("time.monotonic", return_value=0.0):
+            cache.set("foo", "foo", "foo.foo", etag='"foo"')
+            cache.set("bar", "bar", "foo.bar")
+
+        # Asserts
+        assert cache.get("foo") == CacheEntry(value="foo", expires_at=10.0, etag='"foo"')
+        assert cache.get("bar") == CacheEntry(value="bar", expires_at=100.0)
+        assert cache.get("foobar") is None
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_evict_least_recently_used(self, cache):
+        # Run
+        cache.set("foo", "foo", "foo.foo")
+        cache.set("bar", "bar", "foo.foo")
+        cache.get("foo")
+        cache.set("foobar", "foobar", "foo.foo")
+
+        # Asserts
+        assert len(cache) == 2
+        assert cache.get("bar") is None
+        assert cache.get("foo").value == "foo"
+        assert cache.get("foobar").value == "foobar"
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_refresh(self, cache):
+        # Prepare
+        with patch("time.monotonic", return_value=0.0):
+            cache.set("foo", "foo", "foo.foo")
+
+        # Run
+        with patch("time.monotonic", return_value=50.0):
+            cache.refresh("foo", "foo.foo")
+            cache.refresh("bar", "foo.foo")
+
+        # Asserts
+        assert cache.get("foo").expires_at == 60.0
+        assert cache.get("bar") is None
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_invalidate(self, cache):
+        # Prepare
+        cache.set("foo", "foo", "foo.foo")
+        cache.set("bar", "bar", "foo.foo")
+
+        # Run
+        cache.invalidate("foo")
+        cache.invalidate("foobar")
+
+        # Asserts
+        assert cache.get("foo") is None
+        assert len(cache) == 1
+
+        # Run
+        cache.clear()
+
+        # Asserts
+        assert len(cache) == 0
@@ -0,0 +1,199 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from sequoia.circuit import CircuitBreaker, CircuitBreakers, CircuitState
+from sequoia.exceptions import CircuitOpenError
+
+
+class TestCaseCircuitBreaker:
+    @pytest.fixture
+    def breaker(self):
+        return CircuitBreaker(
+            name="foo", failure_rate=0.5, window_size=4, min_calls=4, reset_timeout=10.0, slow_call_duration=1.0
+        )
+
+    @pytest.fixture
+    def fail(self, response):
+        async def _fail(breaker: CircuitBreaker, times: int, error: bool = False):
+            send = AsyncMock(side_effect=httpx.exceptions.NetworkError() if error else None, return_value=response(503))
+            for _ in range(times):
+                try:
+                    await breaker.call(send)
+                except httpx.exceptions.NetworkError:
+                    pass
+
+        return _fail
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_closed(self, breaker, fail, response):
+        # Run
+        await fail(breaker, 1)
+        result = await breaker.call(AsyncMock(return_value=response(200)))
+        await breaker.call(AsyncMock(return_value=response(404)))
+        await fail(breaker, 1, error=True)
+
+        # Asserts
+        assert result.status_code == 200
+        assert breaker.state == CircuitState.OPEN
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_min_calls(self, breaker, fail):
+        # Run
+        await fail(breaker, 3)
+
+        # Asserts
+        assert breaker.state == CircuitState.CLOSED
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_open_fail_fast(self, breaker, fail, response):
+        # Prepare
+        await fail(breaker, 4)
+        send = AsyncMock(return_value=response(200))
+
+        # Run
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(send)
+
+        # Asserts
+        assert send.call_count == 0
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_open_slow_calls(self, response):
+        # Prepare
+        breaker = CircuitBreaker(name="foo", slow_call_rate=0.5, slow_call_duration=0.0, min_calls=2)
+
+        # Run
+        await breaker.call(AsyncMock(return_value=response(200)))
+        await breaker.call(AsyncMock(return_value=response(200)))
+
+        # Asserts
+        assert breaker.state == CircuitState.OPEN
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_half_open_close(self, breaker, fail, response):
+        # Prepare
+        with patch("time.monotonic", return_value=0.0):
+            await fail(breaker, 4)
+
+        # Run
+        with patch("time.monotonic", return_value=10.0):
+            assert breaker.state == CircuitState.HALF_OPEN
+            result = await breaker.call(AsyncMock(return_value=response(200)))
+
+            # Asserts
+            assert result.status_code == 200
+            assert breaker.state == CircuitState.CLOSED
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_half_open_reopen(self, breaker, fail):
+        # Prepare
+        with patch("time.monotonic", return_value=0.0):
+            await fail(breaker, 4)
+
+        # Run
+        with patch("time.monotonic", return_value=10.0):
+            await fail(breaker, 1)
+
+            # Asserts
+            assert breaker.state == CircuitState.OPEN
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_half_open_probes_in_flight(self, breaker, fail, response):
+        # Prepare
+        with patch("time.monotonic", return_value=0.0):
+            await fail(breaker, 4)
+
+        # Run
+        with patch("time.monotonic", return_value=10.0):
+
+            async def send():
+                with pytest.raises(CircuitOpenError):
+                    await breaker.call(AsyncMock(return_value=response(200)))
+                return response(200)
+
+            await breaker.call(send)
+
+            # Asserts
+            assert breaker.state == CircuitState.CLOSED
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_half_open_probe_cancelled(self, breaker, fail, response):
+        # Prepare
+        with patch("time.monotonic", return_value=0.0):
+            await fail(breaker, 4)
+
+        # Run
+        with patch("time.monotonic", return_value=10.0):
+            probe = asyncio.ensure_future(breaker.call(asyncio.Event().wait))
+            await asyncio.sleep(0)
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+
+            result = await breaker.call(AsyncMock(return_value=response(200)))
+
+            # Asserts
+            assert result.status_code == 200
+            assert breaker.state == CircuitState.CLOSED
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_half_open_probe_unexpected_error(self, breaker, fail, response):
+        # Prepare
+        with patch("time.monotonic", return_value=0.0):
+            await fail(breaker, 4)
+
+        # Run
+        with patch("time.monotonic", return_value=10.0):
+            with pytest.raises(ValueError):
+                await breaker.call(AsyncMock(side_effect=ValueError))
+
+            result = await breaker.call(AsyncMock(return_value=response(200)))
+
+            # Asserts
+            assert result.status_code == 200
+            assert breaker.state == CircuitState.CLOSED
+
+
+class TestCaseCircuitBreakers:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_create_on_demand(self):
+        breakers = CircuitBreakers(reset_timeout=5.0)
+
+        breaker = breakers["foo"]
+
+        assert breaker.name == "foo"
+        assert breaker._reset_timeout == 5.0
+        assert breakers["foo"] is breaker
+        assert list(breakers) == ["foo"]
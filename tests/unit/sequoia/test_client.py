@@ -1,13 +1,28 @@
+import asyncio
+import json
 from unittest.mock import AsyncMock, Mock, patch
 
 import httpx
 import pytest
 
+from sequoia.batching import WriteCoalescer
+from sequoia.circuit import CircuitBreakers, CircuitState
 from sequoia.client import Client
-from sequoia.exceptions import ClientNotInitialized, DiscoveryResourcesError, DiscoveryServicesError, UpdateTokenError
+from sequoia.codecs import DecodeMode, JSONCodec
+from sequoia.exceptions import (
+    ClientNotInitialized,
+    DiscoveryResourcesError,
+    DiscoveryServicesError,
+    ServiceNotFound,
+    UpdateTokenError,
+)
+from sequoia.flight import SingleFlight
+from sequoia.limiter import RateLimiters
 from sequoia.request import RequestBuilder
 from sequoia.response import Response
-from sequoia.types import Resource, Service, ServicesRegistry
+from sequoia.retry import RetryBudget
+from sequoia.snapshot import DiscoverySnapshot
+from sequoia.types import RegistryDiff, Resource, Service, ServicesRegistry
 
 
 class TestCaseSequoiaClient:
@@ -26,6 +41,16 @@ class TestCaseSequoiaClient:
         assert client._owner is None
         assert len(client._services) == 0
         assert client._max_retries == Client.DEFAULT_MAX_RETRIES
+        assert client._single_flight is None
+        assert client._retry_policy.max_tries == Client.DEFAULT_MAX_RETRIES
+        assert isinstance(client._retry_policy.budget, RetryBudget)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_init_coalesce_requests(self):
+        client = Client(registry_url="", client_id="foo", client_secret="bar", coalesce_requests=True)
+        assert isinstance(client._single_flight, SingleFlight)
 
     @pytest.mark.asyncio
     @pytest.mark.type_unit
@@ -235,6 +260,7 @@ class TestCaseSequoiaClient:
     @pytest.mark.priority_high
     async def test_update_services_wrong_response_getting_registry_list(self):
         wrong_response = Mock(spec=Response)
+        wrong_response.status_code = 200
         wrong_response.json.return_value = {"foo": "bar"}
         responses = [
             # Wrong response from registry
@@ -252,23 +278,25 @@ class TestCaseSequoiaClient:
     @pytest.mark.priority_high
     async def test_update_services_error_getting_registry_list(self):
         wrong_response = Mock(spec=Response)
+        wrong_response.status_code = 200
         wrong_response.json.return_value = {"foo": "bar"}
-        responses = [
-            # Error raised establishing connection with registry
-            OSError()
-        ]
-        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=responses), pytest.raises(
+        with patch.object(
+            httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=OSError()  # Error connecting to registry
+        ) as request_mock, patch("sequoia.retry.asyncio.sleep", new_callable=AsyncMock), pytest.raises(
             DiscoveryServicesError
         ):
             sequoia_client = Client(registry_url="", client_id="", client_secret="")
             await sequoia_client.update_services()
 
+        assert request_mock.call_count == Client.DEFAULT_MAX_RETRIES
+
     @pytest.mark.asyncio
     @pytest.mark.type_unit
     @pytest.mark.execution_fast
     @pytest.mark.priority_high
     async def test_update_services_wrong_response_getting_service_description(self, response_registry_list_services):
         wrong_response = Mock(spec=Response)
+        wrong_response.status_code = 200
         wrong_response.json.return_value = {"foo": "bar"}
         responses = [
             # Registry's list of services
@@ -289,16 +317,17 @@ class TestCaseSequoiaClient:
     @pytest.mark.priority_high
     async def test_update_services_error_getting_service_description(self, response_registry_list_services):
         wrong_response = Mock(spec=Response)
+        wrong_response.status_code = 200
         wrong_response.json.return_value = {"foo": "bar"}
         responses = [
             # Registry's list of services
             response_registry_list_services,
-            # Error raised establishing connection with service
-            OSError(),
+            # Error raised establishing connection with service, on every attempt
+            *[OSError()] * Client.DEFAULT_MAX_RETRIES,
         ]
-        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=responses), pytest.raises(
-            DiscoveryResourcesError
-        ):
+        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=responses), patch(
+            "sequoia.retry.asyncio.sleep", new_callable=AsyncMock
+        ), pytest.raises(DiscoveryResourcesError):
             sequoia_client = Client(registry_url="", client_id="", client_secret="")
             await sequoia_client.update_services()
             await sequoia_client.resources("metadata")
@@ -311,6 +340,7 @@ class TestCaseSequoiaClient:
         self, sequoia_client, response_registry_list_services, response_identity_get_oauth_token
     ):
         wrong_response = Mock(spec=Response)
+        wrong_response.status_code = 200
         wrong_response.json.return_value = {"foo": "bar"}
         responses = [
             # Services discovery
@@ -370,9 +400,415 @@ class TestCaseSequoiaClient:
                     max_retries=client._max_retries,
                 )
 
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_get_request_builder_cached(
+        self, sequoia_client, response_registry_list_services, response_identity_get_oauth_token
+    ):
+        responses = [
+            # Services discovery
+            response_registry_list_services,
+            # Right response from identity (for initializing)
+            response_identity_get_oauth_token,
+        ]
+        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=responses):
+            async with sequoia_client as client:
+                builder = client.metadata.offers
+                assert client.metadata.offers is builder
+
+                # Builders take the token from the manager on each request, so a new one doesn't rebuild them
+                client._token_manager._token = "foo"
+                assert client.metadata.offers is builder
+                assert builder._token_manager.token == "foo"
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_json_codec_and_decode_mode(self, response_registry_list_services, response_identity_get_oauth_token):
+        responses = [response_registry_list_services, response_identity_get_oauth_token]
+        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=responses):
+            async with Client(
+                registry_url="", client_id="", client_secret="", json_codec="json", decode_mode="lazy"
+            ) as client:
+                assert type(client._json_codec) is JSONCodec
+                assert client.metadata.offers._json_codec is client._json_codec
+                assert client.metadata.offers._decode_mode is DecodeMode.LAZY
+
     @pytest.mark.type_unit
     @pytest.mark.execution_fast
     @pytest.mark.priority_high
     def test_get_request_builder_client_uninitialized(self, sequoia_client):
         with pytest.raises(ClientNotInitialized):
             sequoia_client.registry
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_close_write_coalescer(self, response_registry_list_services, response_identity_get_oauth_token):
+        responses = [
+            # Services discovery
+            response_registry_list_services,
+            # Right response from identity (for initializing)
+            response_identity_get_oauth_token,
+        ]
+        write_coalescer = AsyncMock(spec=WriteCoalescer)
+        sequoia_client = Client(registry_url="", client_id="", client_secret="", write_coalescer=write_coalescer)
+        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=responses):
+            async with sequoia_client as client:
+                assert client._builder._write_coalescer is write_coalescer
+
+        assert write_coalescer.close.call_count == 1
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_circuits(self):
+        circuit_breakers = CircuitBreakers()
+        circuit_breakers["metadata"]._transition(CircuitState.OPEN)
+        client = Client(registry_url="", client_id="", client_secret="", circuit_breakers=circuit_breakers)
+
+        assert client.circuits() == {"metadata": CircuitState.OPEN}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_circuits_disabled(self, sequoia_client):
+        assert sequoia_client.circuits() == {}
+
+    @pytest.mark.asyncio
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    async def test_update_token_expiration(self, sequoia_client, response_registry_list_services):
+        token_response = Mock(spec=Response)
+        token_response.status_code = 200
+        token_response.json.return_value = {"access_token": "foo", "expires_in": 3600}
+        responses = [
+            # Services discovery
+            response_registry_list_services,
+            # Auth token
+            token_response,
+        ]
+        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=responses):
+            async with sequoia_client as client:
+                assert client._token == "foo"
+                assert client._builder._token_manager is client._token_manager
+                assert 3500 < client._token_manager.expires_in <= 3600
+                refresh_task = client._token_manager._refresh_task
+
+        await asyncio.sleep(0)
+        assert refresh_task.cancelled()
+        assert sequoia_client._token is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    async def test_update_services_shared_client(self, response_registry_list_services):
+        httpx_client = httpx.AsyncClient()
+        sequoia_client = Client(
+            registry_url="https://registry",
+            client_id="",
+            client_secret="",
+            httpx_client=httpx_client,
+            discovery_timeout=5,
+        )
+        with patch.object(
+            httpx.AsyncClient, "request", new_callable=AsyncMock, return_value=response_registry_list_services
+        ) as request_mock:
+            await sequoia_client.update_services()
+
+        assert request_mock.call_args_list[0][1]["timeout"] == 5
+        assert sequoia_client._services["metadata"].options.httpx_client is httpx_client
+        assert sequoia_client._services["metadata"].options.retry_policy is sequoia_client._retry_policy
+
+    @pytest.fixture
+    def responses_by_url(
+        self,
+        response_registry_list_services,
+        response_identity_get_oauth_token,
+        response_identity_get_description,
+        response_metadata_get_description,
+        response_registry_get_description,
+    ):
+        return {
+            "/services/root/": response_registry_list_services,
+            "/oauth/token/": response_identity_get_oauth_token,
+            "https://identity.sequoia.piksel.com/descriptor/raw/": response_identity_get_description,
+            "https://metadata.sequoia.piksel.com/descriptor/raw/": response_metadata_get_description,
+            "https://registry.sequoia.piksel.com/descriptor/raw/": response_registry_get_description,
+        }
+
+    @pytest.mark.asyncio
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    async def test_eager_discovery(self, responses_by_url):
+        async def request(method, url, **kwargs):
+            return next(v for k, v in responses_by_url.items() if url.endswith(k))
+
+        sequoia_client = Client(registry_url="", client_id="", client_secret="", eager_discovery=True)
+        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=request) as request_mock:
+            async with sequoia_client as client:
+                assert client._token == "74b685d3ba5943662884cf786e4ca8d6ff71cc09"
+                assert all(hasattr(service, "_resources") for service in client._services.values())
+                assert request_mock.call_count == 5
+
+    @pytest.mark.asyncio
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    async def test_eager_discovery_specific(self, responses_by_url):
+        async def request(method, url, **kwargs):
+            return next(v for k, v in responses_by_url.items() if url.endswith(k))
+
+        sequoia_client = Client(registry_url="", client_id="", client_secret="", eager_discovery=["metadata"])
+        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=request):
+            async with sequoia_client as client:
+                assert hasattr(client._services["metadata"], "_resources")
+                assert not hasattr(client._services["identity"], "_resources")
+
+    @pytest.mark.asyncio
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    async def test_warm_up_errors(self, responses_by_url):
+        async def request(method, url, **kwargs):
+            if "metadata" in url:
+                raise OSError()
+            return next(v for k, v in responses_by_url.items() if url.endswith(k))
+
+        sequoia_client = Client(registry_url="", client_id="", client_secret="")
+        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=request):
+            await sequoia_client.update_services()
+            errors = await sequoia_client.warm_up(["identity", "metadata", "foo"], concurrency=1)
+
+        assert list(errors) == ["metadata", "foo"]
+        assert isinstance(errors["metadata"], DiscoveryResourcesError)
+        assert isinstance(errors["foo"], ServiceNotFound)
+        assert hasattr(sequoia_client._services["identity"], "_resources")
+        assert not hasattr(sequoia_client._services["metadata"], "_resources")
+
+    @pytest.mark.asyncio
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    async def test_discovery_snapshot(self, tmp_path, responses_by_url):
+        async def request(method, url, **kwargs):
+            requested.append(url)
+            return next(v for k, v in responses_by_url.items() if url.endswith(k))
+
+        requested = []
+        snapshot = DiscoverySnapshot(str(tmp_path / "snapshot.json"))
+        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=request):
+            # First client discovers and saves a snapshot, including resources discovered
+            async with Client(registry_url="", client_id="", client_secret="", discovery_snapshot=snapshot) as client:
+                await client.resources("metadata")
+
+            # Second client starts from snapshot without discovery requests
+            requested.clear()
+            with patch.object(Client, "_revalidate", new_callable=AsyncMock):
+                async with Client(
+                    registry_url="", client_id="", client_secret="", discovery_snapshot=snapshot
+                ) as client:
+                    resources = await client.resources("metadata")
+
+            assert requested == ["https://identity.sequoia.piksel.com/oauth/token/"]
+            assert resources == {
+                "tenancy_configurations": Resource(name="tenancyConfigurations", path="/data/tenancy-configurations")
+            }
+
+            # Third client starts from snapshot, revalidating it in background
+            requested.clear()
+            async with Client(registry_url="", client_id="", client_secret="", discovery_snapshot=snapshot) as client:
+                await client._revalidation
+
+        assert sorted(requested) == [
+            "/services/root/",
+            "https://identity.sequoia.piksel.com/oauth/token/",
+            "https://metadata.sequoia.piksel.com/descriptor/raw/",
+        ]
+
+    @pytest.mark.asyncio
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    async def test_discovery_snapshot_revalidation_error(self, tmp_path, responses_by_url):
+        async def request(method, url, **kwargs):
+            if url.endswith("/services/root/"):
+                raise OSError()
+            return next(v for k, v in responses_by_url.items() if url.endswith(k))
+
+        snapshot = DiscoverySnapshot(str(tmp_path / "snapshot.json"))
+        snapshot.save(
+            ServicesRegistry({"identity": Service(name="identity", url="https://identity.sequoia.piksel.com")}), ""
+        )
+        created_at = snapshot.created_at
+        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=request):
+            async with Client(registry_url="", client_id="", client_secret="", discovery_snapshot=snapshot) as client:
+                await client._revalidation
+                assert list(client.services()) == ["identity"]
+
+        # Snapshot saved on close keeps its original creation time, as it wasn't revalidated
+        with open(tmp_path / "snapshot.json") as f:
+            assert json.load(f)["created_at"] == created_at
+
+    @pytest.mark.asyncio
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    async def test_registry_refresh(self, tmp_path, responses_by_url):
+        async def request(method, url, **kwargs):
+            return next(v for k, v in responses_by_url.items() if url.endswith(k))
+
+        snapshot = DiscoverySnapshot(str(tmp_path / "snapshot.json"))
+        sequoia_client = Client(
+            registry_url="",
+            client_id="",
+            client_secret="",
+            discovery_snapshot=snapshot,
+            registry_refresh_interval=0.01,
+        )
+        diffs = iter([RegistryDiff(), DiscoveryServicesError(), KeyError("services"), RegistryDiff(added=["foo"])])
+
+        async def update_services():
+            diff = next(diffs, RegistryDiff())
+            if isinstance(diff, Exception):
+                raise diff
+            return diff
+
+        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=request):
+            async with sequoia_client as client:
+                with patch.object(
+                    Client, "update_services", new_callable=AsyncMock, side_effect=update_services
+                ) as update_mock, patch.object(Client, "_save_snapshot") as save_mock:
+                    await asyncio.sleep(0.1)
+                    refresh_task = client._registry_refresh
+
+        await asyncio.sleep(0)
+        assert update_mock.call_count >= 4
+        assert save_mock.call_count == 1
+        assert refresh_task.cancelled()
+
+    @pytest.mark.asyncio
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    async def test_registry_refresh_cancelled(self):
+        # Prepare
+        sequoia_client = Client(registry_url="", client_id="", client_secret="", registry_refresh_interval=0.01)
+
+        # Run
+        with patch.object(Client, "update_services", new_callable=AsyncMock, side_effect=asyncio.CancelledError):
+            with pytest.raises(asyncio.CancelledError):
+                await sequoia_client._refresh_registry()
+
+    @pytest.mark.asyncio
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    async def test_for_owner(self, responses_by_url):
+        async def request(method, url, **kwargs):
+            requested.append(url)
+            return next(v for k, v in responses_by_url.items() if url.endswith(k))
+
+        requested = []
+        owner_services = Mock(spec=Response)
+        owner_services.status_code = 200
+        owner_services.json.return_value = {
+            "services": [
+                {"name": "metadata", "location": "https://metadata.sequoia.piksel.com"},
+                {"name": "identity", "location": "https://foo.identity.sequoia.piksel.com"},
+            ]
+        }
+        responses_by_url["/services/foo/"] = owner_services
+        responses_by_url["https://foo.identity.sequoia.piksel.com/descriptor/raw/"] = responses_by_url[
+            "https://identity.sequoia.piksel.com/descriptor/raw/"
+        ]
+        with patch.object(httpx.AsyncClient, "request", new_callable=AsyncMock, side_effect=request):
+            async with Client(registry_url="", client_id="", client_secret="") as client:
+                metadata_resources = await client.resources("metadata")
+                requested.clear()
+
+                builder = client.for_owner("foo")
+                resources = await asyncio.gather(
+                    *[client.for_owner("foo").metadata.tenancy_configurations._resource for _ in range(10)],
+                    client.for_owner("foo").identity.users._resource,
+                )
+
+                assert builder._owner == "foo"
+                assert builder._httpx_client is client._httpx_client
+                assert builder._token_manager is client._token_manager
+                assert client.for_owner(None) == client._builder
+                assert resources[0] is metadata_resources["tenancy_configurations"]
+                assert resources[-1] == Resource(name="users", path="/data/users")
+                assert client._owner_services["foo"]["metadata"] is client._services["metadata"]
+                assert client._owner_services["foo"]["identity"] is not client._services["identity"]
+                assert requested == ["/services/foo/", "https://foo.identity.sequoia.piksel.com/descriptor/raw/"]
+
+        assert client._owner_services == {}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_for_owner_not_initialized(self, sequoia_client):
+        with pytest.raises(ClientNotInitialized):
+            sequoia_client.for_owner("foo")
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_connection_options(self):
+        with patch("sequoia.client.httpx.AsyncClient") as httpx_client_mock:
+            client = Client(
+                registry_url="",
+                client_id="",
+                client_secret="",
+                http2=True,
+                max_connections=20,
+                max_keepalive_connections=5,
+                max_connections_per_service=4,
+                connect_timeout=1.0,
+                read_timeout=30.0,
+            )
+
+        kwargs = httpx_client_mock.call_args[1]
+        assert kwargs["http2"] is True
+        assert kwargs["pool_limits"] == httpx.PoolLimits(soft_limit=5, hard_limit=20)
+        assert kwargs["timeout"] == httpx.Timeout(30.0, connect_timeout=1.0)
+        assert client._discovery_options.httpx_client is httpx_client_mock.return_value
+        assert client._rate_limiters.limiter("metadata").limit == 4
+        assert client._rate_limiters.limiter("metadata")._max_limit == 4
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_connection_options_rate_limiters(self):
+        with pytest.raises(ValueError):
+            Client(
+                registry_url="",
+                client_id="",
+                client_secret="",
+                max_connections_per_service=4,
+                rate_limiters=RateLimiters(),
+            )
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_limits(self):
+        rate_limiters = RateLimiters(initial_limit=5)
+        rate_limiters.limiter("metadata")
+        client = Client(registry_url="", client_id="", client_secret="", rate_limiters=rate_limiters)
+
+        assert client.limits() == {"metadata": 5}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_limits_disabled(self, sequoia_client):
+        assert sequoia_client.limits() == {}
@@ -1,9 +1,26 @@
+import copy
 import datetime
 import json
+import pickle
+from unittest.mock import ANY, patch
 
+import isodate
 import pytest
 
-from sequoia.codecs import JSONDecoder, JSONEncoder
+from sequoia.codecs import (
+    CODECS,
+    AutoCodec,
+    DecodeMode,
+    DecodePlan,
+    JSONCodec,
+    JSONDecoder,
+    JSONEncoder,
+    LazyMapping,
+    OrjsonCodec,
+    UjsonCodec,
+    get_codec,
+    record_decoder,
+)
 
 
 class TestCaseJSONEncoder:
@@ -124,3 +141,593 @@ class TestCaseJSONDecoder:
 
         # Asserts
         assert decoded_json == expected_result
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_decode_nested_list(self):
+        # Prepare
+        expected_result = {
+            "foo": [
+                [
+                    datetime.timedelta(days=1),
+                    {"bar": [datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)]},
+                ]
+            ]
+        }
+
+        # Run
+        decoded_json = json.loads('{"foo": [["P1D", {"bar": ["2000-01-01T00:00:00Z"]}]]}', cls=JSONDecoder)
+
+        # Asserts
+        assert decoded_json == expected_result
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "value",
+        [
+            pytest.param("2000-01-01T00:00:00.000Z", id="Datetime"),
+            pytest.param("2000-01-01T00:00:00.123456Z", id="Datetime microseconds"),
+            pytest.param("2000-01-01T00:00:00Z", id="Datetime seconds"),
+            pytest.param("2000-02-30T00:00:00.000Z", id="Datetime out of range"),
+            pytest.param("2000-01-01T00:00:00", id="Naive datetime"),
+            pytest.param("20000101T000000+0100", id="Basic datetime"),
+            pytest.param("2000-W01-1T10:00Z", id="Week datetime"),
+            pytest.param("2000-001T10:00Z", id="Ordinal datetime"),
+            pytest.param("2000-13-45T99:00:00Z", id="Invalid datetime"),
+            pytest.param("2000-01-01", id="Date"),
+            pytest.param("1234T5678", id="Datetime shaped"),
+            pytest.param("P1DT1H", id="Duration"),
+            pytest.param("-PT30M", id="Negative duration"),
+            pytest.param("P2W", id="Weeks duration"),
+            pytest.param("P1Y2M", id="Calendar duration"),
+            pytest.param("P0003-06-04T12:30:05", id="Alternative duration"),
+            pytest.param("P1X", id="Invalid duration"),
+            pytest.param("Premium", id="Text starting with P"),
+            pytest.param("Test", id="Text with T"),
+            pytest.param("２020-01-01T10:00:00Z", id="Fullwidth digit datetime"),
+            pytest.param("2020-01-01T１0:00:00Z", id="Fullwidth digit time"),
+            pytest.param("PT１H", id="Fullwidth digit duration"),
+            pytest.param("", id="Empty"),
+        ],
+    )
+    def test_decode_parity(self, value):
+        # Prepare
+        def legacy_parse(v):
+            for f in (isodate.parse_datetime, isodate.parse_duration):
+                try:
+                    return f(v)
+                except Exception:
+                    pass
+            return v
+
+        # Run
+        decoded_json = json.loads(json.dumps({"foo": value, "bar": [value]}), cls=JSONDecoder)
+
+        # Asserts
+        assert decoded_json == {"foo": legacy_parse(value), "bar": [legacy_parse(value)]}
+        assert type(getattr(decoded_json["foo"], "tzinfo", None)) is type(getattr(legacy_parse(value), "tzinfo", None))
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_parse_non_string(self):
+        assert JSONDecoder().parse(1) == 1
+        assert JSONDecoder().convert(1) == 1
+        assert JSONDecoder().convert_member(1) == 1
+        assert JSONDecoder().lazy_member(1) == 1
+
+
+class TestCaseDecodePlan:
+    @pytest.fixture
+    def decode_plan(self):
+        return DecodePlan(
+            "offers",
+            {"title": "string", "tags": "array", "startAt": "dateTime", "length": "duration", "endAt": "Date"},
+        )
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_decode(self, decode_plan):
+        # Prepare
+        document = {
+            "offers": [
+                {
+                    "title": "P1D",
+                    "tags": ["PT1H"],
+                    "startAt": "2000-01-01T00:00:00.000Z",
+                    "endAt": "2000-01-01T10:00:00+02:00",
+                    "length": "PT1H",
+                    "updatedAt": "2000-01-02T00:00:00.000Z",
+                },
+                "2000-01-01T00:00:00.000Z",
+            ],
+            "meta": {"continue": "P1D", "page": 1},
+        }
+
+        # Run
+        result = decode_plan.decode(document)
+
+        # Asserts
+        assert result == {
+            "offers": [
+                {
+                    "title": "P1D",
+                    "tags": [datetime.timedelta(hours=1)],
+                    "startAt": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc),
+                    "endAt": datetime.datetime(2000, 1, 1, 8, tzinfo=datetime.timezone.utc),
+                    "length": datetime.timedelta(hours=1),
+                    "updatedAt": datetime.datetime(2000, 1, 2, tzinfo=datetime.timezone.utc),
+                },
+                datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc),
+            ],
+            "meta": {"continue": datetime.timedelta(days=1), "page": 1},
+        }
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_decode_invalid_values(self, decode_plan):
+        # Run
+        result = decode_plan.decode({"offers": [{"startAt": "soon", "length": "long", "endAt": 1}, {"length": None}]})
+
+        # Asserts
+        assert result == {"offers": [{"startAt": "soon", "length": "long", "endAt": 1}, {"length": None}]}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_decode_invalid_utc_datetime(self, decode_plan):
+        # Run
+        result = decode_plan.decode({"offers": [{"startAt": "2000-13-01T00:00:00Z"}]})
+
+        # Asserts
+        assert result == {"offers": [{"startAt": "2000-13-01T00:00:00Z"}]}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_decode_not_object(self, decode_plan):
+        # Prepare
+        content = '["P1D", {"length": "PT1H"}]'
+
+        # Run
+        result = decode_plan.decode(json.loads(content))
+
+        # Asserts
+        assert result == ["P1D", {"length": datetime.timedelta(hours=1)}]
+        assert result == json.loads(content, cls=JSONDecoder)
+
+
+class TestCaseJSONCodec:
+    @pytest.fixture(
+        params=[
+            pytest.param(c, id=n, marks=pytest.mark.skipif(not c.available(), reason=f"{n} is not installed"))
+            for n, c in CODECS.items()
+        ]
+        + [pytest.param(AutoCodec, id="auto")]
+    )
+    def codec(self, request):
+        return request.param()
+
+    @pytest.fixture
+    def document(self):
+        return {
+            "ref": "demo:offer/1",
+            "title": "Ñandú P1D",
+            "active": True,
+            "price": 9.99,
+            "count": 3,
+            "missing": None,
+            "startAt": datetime.datetime(2000, 1, 1, 10, 30, 0, 123456, tzinfo=datetime.timezone.utc),
+            "endAt": datetime.datetime(2000, 1, 1, 10, 30),
+            "length": datetime.timedelta(days=1, hours=1),
+            "window": [datetime.datetime(2000, 1, 2), datetime.timedelta(minutes=30)],
+            "custom": {1: "one", "nested": {"at": datetime.datetime(2000, 1, 3)}},
+        }
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_dumps_parity(self, codec, document):
+        # Run
+        content = codec.dumps(document)
+
+        # Asserts
+        assert isinstance(content, bytes)
+        assert json.loads(content) == json.loads(JSONCodec().dumps(document))
+        assert b'"2000-01-01T10:30:00.123Z"' in content
+        assert b'"2000-01-01T10:30:00.000Z"' in content
+        assert b'"P1DT1H"' in content
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_dumps_not_serializable(self, codec):
+        with pytest.raises(TypeError):
+            codec.dumps({"foo": object()})
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize("encoding", [pytest.param("bytes", id="Bytes"), pytest.param("str", id="String")])
+    def test_loads_parity(self, codec, encoding):
+        # Prepare
+        content = json.dumps(
+            {
+                "offers": [
+                    {
+                        "title": "Premium",
+                        "startAt": "2000-01-01T10:30:00.123Z",
+                        "endAt": "2000-01-01T10:30:00+02:00",
+                        "length": "PT1H",
+                        "tags": ["P1D", 1, ["2000-01-01T00:00:00Z"]],
+                    }
+                ],
+                "meta": {"continue": "/data/offers?continue=P1", "count": 1.5},
+            }
+        )
+        if encoding == "bytes":
+            content = content.encode("utf-8")
+
+        # Run
+        result = codec.loads(content)
+
+        # Asserts
+        assert result == json.loads(content, cls=JSONDecoder)
+        assert codec.loads_raw(content) == json.loads(content)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param(b'"2000-01-01T00:00:00Z"', id="Top-level string"),
+            pytest.param(b'["2000-01-01T00:00:00Z", ["P1D"], {"length": ["P1D"]}]', id="Top-level array"),
+            pytest.param(b'{"count": 18446744073709551617, "offset": -9223372036854775809}', id="Big integers"),
+            pytest.param("[18446744073709551617]", id="Big integers string"),
+            pytest.param('["Ñandú", 18446744073709551617]', id="Big integers after non-ASCII string"),
+            pytest.param(b'{"ref": "1234567890123456789", "count": 1}', id="Long digits in strings"),
+            pytest.param(b'{"price": NaN, "min": -Infinity, "max": 1e400}', id="Non-finite floats"),
+        ],
+    )
+    def test_loads_parity_edge_cases(self, codec, content):
+        # Run
+        result = codec.loads(content)
+
+        # Asserts
+        assert repr(result) == repr(json.loads(content, cls=JSONDecoder))
+        assert repr(codec.loads_raw(content)) == repr(json.loads(content))
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "document",
+        [
+            pytest.param({"count": 2 ** 63 - 1, "offset": -(2 ** 63), "price": 9.99}, id="64-bit integers"),
+            pytest.param({"count": 2 ** 64 + 1, "offset": -(2 ** 63) - 1}, id="Big integers"),
+            pytest.param({"price": float("nan"), "min": float("-inf"), "max": float("inf")}, id="Non-finite floats"),
+            pytest.param({"price": None, "count": 1}, id="Null"),
+        ],
+    )
+    def test_dumps_parity_edge_cases(self, codec, document):
+        # Run
+        content = codec.dumps(document)
+
+        # Asserts
+        assert isinstance(content, bytes)
+        assert repr(json.loads(content)) == repr(json.loads(JSONCodec().dumps(document)))
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize("content", [pytest.param(b"{foo", id="Bytes"), pytest.param("{foo", id="String")])
+    def test_loads_invalid(self, codec, content):
+        with pytest.raises(json.JSONDecodeError):
+            codec.loads(content)
+
+
+class TestCaseGetCodec:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_get_codec_auto(self):
+        # Run
+        codec = get_codec()
+
+        # Asserts
+        assert type(codec) is AutoCodec
+        assert type(codec.encoding_codec) is next(c for c in CODECS.values() if c.available())
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_get_codec_auto_fallback(self):
+        with patch.object(OrjsonCodec, "module", None), patch.object(UjsonCodec, "module", None):
+            assert type(get_codec("auto").encoding_codec) is JSONCodec
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_auto_codec_decodes_with_json(self):
+        # Prepare
+        codec = AutoCodec()
+        content = b'{"id": 12345678901234567890, "at": "2020-01-01T10:00:00Z"}'
+
+        # Run
+        with patch.object(codec.encoding_codec, "loads", side_effect=AssertionError), patch.object(
+            codec.encoding_codec, "loads_raw", side_effect=AssertionError
+        ):
+            result = codec.loads(content)
+
+        # Asserts
+        assert result == {
+            "id": 12345678901234567890,
+            "at": datetime.datetime(2020, 1, 1, 10, tzinfo=datetime.timezone.utc),
+        }
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_get_codec_name(self):
+        assert type(get_codec("json")) is JSONCodec
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_get_codec_instance(self):
+        # Prepare
+        codec = JSONCodec()
+
+        # Run
+        result = get_codec(codec)
+
+        # Asserts
+        assert result is codec
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_get_codec_unknown(self):
+        with pytest.raises(ValueError, match="Unknown JSON codec 'foo'"):
+            get_codec("foo")
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_get_codec_not_installed(self):
+        with patch.object(OrjsonCodec, "module", None), pytest.raises(ImportError):
+            get_codec("orjson")
+
+
+class TestCaseLazyMapping:
+    @pytest.fixture
+    def content(self):
+        return json.dumps(
+            {
+                "ref": "demo:offer",
+                "count": 1,
+                "startAt": "2000-01-01T00:00:00.000Z",
+                "custom": {"length": "PT1H", "window": ["P1D", {"at": "2000-01-02T00:00:00.000Z"}]},
+            }
+        )
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_lazy(self, content):
+        # Prepare
+        decoder = JSONDecoder()
+
+        # Run
+        document = decoder.lazy(json.loads(content))
+
+        # Asserts
+        assert isinstance(document, LazyMapping)
+        assert isinstance(document, dict)
+        assert document._pending == {"ref", "count", "startAt", "custom"}
+        assert document["startAt"] == datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+        assert document["startAt"] is document["startAt"]
+        assert document._pending == {"ref", "count", "custom"}
+        assert document == json.loads(content, cls=JSONDecoder)
+        assert dict(document) == json.loads(content, cls=JSONDecoder)
+        assert len(document) == 4
+        assert list(document) == ["ref", "count", "startAt", "custom"]
+        assert document.get("foo", "bar") == "bar"
+        assert isinstance(document["custom"], LazyMapping)
+        assert repr(document) == repr(json.loads(content, cls=JSONDecoder))
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_lazy_update(self, content):
+        # Prepare
+        document = JSONDecoder().lazy(json.loads(content))
+
+        # Run
+        document["startAt"] = datetime.datetime(2001, 1, 1, tzinfo=datetime.timezone.utc)
+        document["title"] = "Foo"
+        del document["custom"]
+        del document["count"]
+
+        # Asserts
+        assert document == {
+            "ref": "demo:offer",
+            "startAt": datetime.datetime(2001, 1, 1, tzinfo=datetime.timezone.utc),
+            "title": "Foo",
+        }
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_lazy_encode(self, content):
+        # Prepare
+        document = JSONDecoder().lazy(json.loads(content))
+
+        # Run
+        result = JSONCodec().dumps(document)
+
+        # Asserts
+        assert json.loads(result) == json.loads(content)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_lazy_encode_stdlib(self, content):
+        # Prepare
+        expected_result = json.loads(content, cls=JSONDecoder)
+        document = JSONDecoder().lazy(json.loads(content))
+        document["custom"]  # Mix serialized and raw values
+
+        # Run
+        result = json.dumps(document, default=str)
+
+        # Asserts
+        assert result == json.dumps(expected_result, default=str)
+        assert json.loads(json.dumps(document, cls=JSONEncoder)) == json.loads(content)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_lazy_copy(self, content):
+        # Prepare
+        expected_result = json.loads(content, cls=JSONDecoder)
+        document = JSONDecoder().lazy(json.loads(content))
+
+        # Run
+        result = document.copy()
+        result["ref"] = "foo"
+
+        # Asserts
+        assert type(result) is dict
+        assert result == {**expected_result, "ref": "foo"}
+        assert document == expected_result
+        assert document == JSONDecoder().lazy(json.loads(content))
+        assert {**document} == dict(document) == copy.deepcopy(document) == pickle.loads(pickle.dumps(document))
+        assert list(document.items()) == list(expected_result.items())
+        assert list(document.values()) == list(expected_result.values())
+        assert document | {"ref": "foo"} == {"ref": "foo"} | document | {"ref": "foo"} == result
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_lazy_dict_methods(self, content):
+        # Prepare
+        document = JSONDecoder().lazy(json.loads(content))
+
+        # Run
+        custom = document.popitem()
+        start_at = document.pop("startAt")
+        missing = document.pop("foo", None)
+        title = document.setdefault("title", "Foo")
+        ref = document.setdefault("ref", "foo")
+        document.update({"count": 2}, ref="foo")
+        document |= {"active": True}
+
+        # Asserts
+        assert custom == ("custom", {"length": datetime.timedelta(hours=1), "window": ANY})
+        assert start_at == datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+        assert missing is None
+        assert title == "Foo"
+        assert ref == "demo:offer"
+        assert document == {"ref": "foo", "count": 2, "title": "Foo", "active": True}
+        assert document != {}
+        document.clear()
+        assert document == {} and document._pending == set()
+        with pytest.raises(KeyError):
+            document.popitem()
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_lazy_not_object(self):
+        # Run
+        result = JSONDecoder().lazy(["P1D", 1, [{"length": "PT1H"}]])
+
+        # Asserts
+        assert result == ["P1D", 1, [{"length": datetime.timedelta(hours=1)}]]
+        assert JSONDecoder().lazy("P1D") == "P1D"
+        assert JSONDecoder().lazy(1) == 1
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_decode_plan_lazy(self):
+        # Prepare
+        decode_plan = DecodePlan("offers", {"title": "string", "custom": "object", "startAt": "date"})
+        document = {
+            "offers": [
+                {"title": "P1D", "custom": {"length": "PT1H"}, "startAt": "2000-01-01T00:00:00.000Z", "tag": "P1D"},
+                "P1D",
+            ],
+            "meta": {"continue": "/data/offers?continue=foo"},
+        }
+
+        # Run
+        result = decode_plan.lazy(document)
+
+        # Asserts
+        assert isinstance(result["offers"][0], LazyMapping)
+        assert result == {
+            "offers": [
+                {
+                    "title": "P1D",
+                    "custom": {"length": datetime.timedelta(hours=1)},
+                    "startAt": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc),
+                    "tag": datetime.timedelta(days=1),
+                },
+                datetime.timedelta(days=1),
+            ],
+            "meta": {"continue": "/data/offers?continue=foo"},
+        }
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_decode_plan_lazy_unexpected(self):
+        # Prepare
+        decode_plan = DecodePlan("offers", {"title": "string"})
+
+        # Run
+        result = decode_plan.lazy({"offers": "P1D"})
+
+        # Asserts
+        assert result == {"offers": datetime.timedelta(days=1)}
+        assert decode_plan.lazy(["P1D"]) == ["P1D"]
+
+
+class TestCaseRecordDecoder:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "decode_mode,fields,expected_type,expected_value",
+        [
+            pytest.param(DecodeMode.EAGER, None, dict, datetime.timedelta(days=1), id="Eager"),
+            pytest.param(DecodeMode.EAGER, {"title": "string"}, dict, "P1D", id="Eager with plan"),
+            pytest.param(DecodeMode.LAZY, None, LazyMapping, datetime.timedelta(days=1), id="Lazy"),
+            pytest.param(DecodeMode.LAZY, {"title": "string"}, LazyMapping, "P1D", id="Lazy with plan"),
+            pytest.param(DecodeMode.RAW, None, dict, "P1D", id="Raw"),
+        ],
+    )
+    def test_record_decoder(self, decode_mode, fields, expected_type, expected_value):
+        # Prepare
+        decode_plan = DecodePlan("offers", fields) if fields is not None else None
+
+        # Run
+        result = record_decoder(decode_mode, decode_plan, JSONDecoder())({"title": "P1D"})
+
+        # Asserts
+        assert type(result) is expected_type
+        assert result == {"title": expected_value}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_lazy_record_not_object(self):
+        assert DecodePlan("offers", {}).lazy_record("P1D") == datetime.timedelta(days=1)
@@ -0,0 +1,96 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from sequoia.flight import SingleFlight
+
+
+class TestCaseSingleFlight:
+    @pytest.fixture
+    def single_flight(self):
+        return SingleFlight()
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_do_shared(self, single_flight):
+        # Prepare
+        async def function():
+            await asyncio.sleep(0.01)
+            return "foo"
+
+        function_mock = AsyncMock(side_effect=function)
+
+        # Run
+        results = await asyncio.gather(*[single_flight.do("key", function_mock) for _ in range(3)])
+
+        # Asserts
+        assert function_mock.call_count == 1
+        assert results == ["foo", "foo", "foo"]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_do_different_keys(self, single_flight):
+        # Prepare
+        function_mock = AsyncMock(return_value="foo")
+
+        # Run
+        await asyncio.gather(single_flight.do("foo", function_mock), single_flight.do("bar", function_mock))
+
+        # Asserts
+        assert function_mock.call_count == 2
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_do_sequential(self, single_flight):
+        # Prepare
+        function_mock = AsyncMock(return_value="foo")
+
+        # Run
+        await single_flight.do("key", function_mock)
+        await single_flight.do("key", function_mock)
+
+        # Asserts
+        assert function_mock.call_count == 2
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_do_error(self, single_flight):
+        # Prepare
+        function_mock = AsyncMock(side_effect=[ValueError, "foo"])
+
+        # Run
+        with pytest.raises(ValueError):
+            await single_flight.do("key", function_mock)
+        result = await single_flight.do("key", function_mock)
+
+        # Asserts
+        assert result == "foo"
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_do_caller_cancelled(self, single_flight):
+        # Prepare
+        async def function():
+            await asyncio.sleep(0.01)
+            return "foo"
+
+        # Run
+        cancelled = asyncio.ensure_future(single_flight.do("key", function))
+        result = asyncio.ensure_future(single_flight.do("key", function))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        # Asserts
+        assert await result == "foo"
+        assert cancelled.cancelled()
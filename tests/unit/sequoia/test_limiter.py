@@ -0,0 +1,217 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from sequoia.limiter import AdaptiveLimiter, RateLimiters
+
+
+class TestCaseAdaptiveLimiter:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_additive_increase(self, response):
+        # Prepare
+        limiter = AdaptiveLimiter(name="foo", initial_limit=2, max_limit=3)
+
+        # Run
+        for _ in range(10):
+            result = await limiter.call(AsyncMock(return_value=response(200)))
+
+        # Asserts
+        assert result.status_code == 200
+        assert limiter.limit == 3
+        assert limiter.in_flight == 0
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_multiplicative_decrease(self, response):
+        # Prepare
+        limiter = AdaptiveLimiter(name="foo", initial_limit=8, min_limit=3)
+
+        # Run
+        await limiter.call(AsyncMock(return_value=response(429)))
+        first_limit = limiter.limit
+        await limiter.call(AsyncMock(return_value=response(503)))
+
+        # Asserts
+        assert first_limit == 4
+        assert limiter.limit == 3
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_error_releases(self):
+        # Prepare
+        limiter = AdaptiveLimiter(name="foo", initial_limit=1)
+
+        # Run
+        with pytest.raises(httpx.exceptions.NetworkError):
+            await limiter.call(AsyncMock(side_effect=httpx.exceptions.NetworkError()))
+
+        # Asserts
+        assert limiter.in_flight == 0
+        assert limiter.limit == 1
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded(self, response):
+        # Prepare
+        limiter = AdaptiveLimiter(name="foo", initial_limit=2, max_limit=2)
+        max_in_flight = 0
+
+        async def send():
+            nonlocal max_in_flight
+            max_in_flight = max(max_in_flight, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            return response(200)
+
+        # Run
+        results = await asyncio.gather(*[limiter.call(send) for _ in range(6)])
+
+        # Asserts
+        assert len(results) == 6
+        assert max_in_flight == 2
+        assert limiter.in_flight == 0
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter(self, response):
+        # Prepare
+        limiter = AdaptiveLimiter(name="foo", initial_limit=1, max_limit=1)
+        event = asyncio.Event()
+
+        async def send():
+            await event.wait()
+            return response(200)
+
+        first = asyncio.ensure_future(limiter.call(send))
+        second = asyncio.ensure_future(limiter.call(send))
+        await asyncio.sleep(0)
+
+        # Run
+        second.cancel()
+        await asyncio.sleep(0)
+        event.set()
+        await first
+        third = await limiter.call(send)
+
+        # Asserts
+        assert second.cancelled()
+        assert third.status_code == 200
+        assert limiter.in_flight == 0
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_cancelled_woken_waiter(self, response):
+        # Prepare
+        limiter = AdaptiveLimiter(name="foo", initial_limit=1, max_limit=1)
+        event = asyncio.Event()
+
+        async def send():
+            await event.wait()
+            return response(200)
+
+        first = asyncio.ensure_future(limiter.call(send))
+        second = asyncio.ensure_future(limiter.call(send))
+        third = asyncio.ensure_future(limiter.call(send))
+        await asyncio.sleep(0)
+
+        # Run
+        event.set()
+        await asyncio.sleep(0)
+        second.cancel()
+        result = await third
+        await first
+
+        # Asserts
+        assert second.cancelled()
+        assert result.status_code == 200
+        assert limiter.in_flight == 0
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses(self, response):
+        # Prepare
+        limiter = AdaptiveLimiter(name="foo")
+        await limiter.call(AsyncMock(return_value=response(429, {"Retry-After": "2"})))
+
+        # Run
+        with patch("sequoia.limiter.asyncio.sleep", new_callable=AsyncMock) as sleep_mock, patch(
+            "sequoia.limiter.time.monotonic", side_effect=[limiter._paused_until - 2, limiter._paused_until]
+        ):
+            await limiter.call(AsyncMock(return_value=response(200)))
+
+        # Asserts
+        assert sleep_mock.call_args_list[0][0][0] == 2
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "headers,delay",
+        [
+            pytest.param({"RateLimit-Remaining": "0", "RateLimit-Reset": "5"}, 5.0, id="Seconds"),
+            pytest.param({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "2000000005"}, 5.0, id="Timestamp"),
+            pytest.param({"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": "5"}, None, id="Remaining"),
+            pytest.param({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "foo"}, None, id="Invalid"),
+            pytest.param({"X-RateLimit-Remaining": "0"}, None, id="No reset"),
+        ],
+    )
+    def test_rate_limit_headers(self, headers, delay, response):
+        # Prepare
+        limiter = AdaptiveLimiter(name="foo")
+
+        # Run
+        with patch.object(time, "time", return_value=2000000000), patch.object(time, "monotonic", return_value=0.0):
+            limiter._update(response(200, headers))
+
+        # Asserts
+        assert limiter._paused_until == (delay or 0.0)
+
+
+class TestCaseRateLimiters:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_per_service(self):
+        # Prepare
+        rate_limiters = RateLimiters(initial_limit=5)
+
+        # Run
+        limiter = rate_limiters.limiter("foo", "bar")
+
+        # Asserts
+        assert rate_limiters.limiter("foo", "baz") is limiter
+        assert limiter.name == "foo"
+        assert limiter.limit == 5
+        assert list(rate_limiters) == ["foo"]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_per_owner(self):
+        # Prepare
+        rate_limiters = RateLimiters(per_owner=True)
+
+        # Run
+        limiter = rate_limiters.limiter("foo", "bar")
+
+        # Asserts
+        assert rate_limiters.limiter("foo", "baz") is not limiter
+        assert limiter.name == "foo:bar"
+        assert list(rate_limiters) == [("foo", "bar"), ("foo", "baz")]
@@ -0,0 +1,36 @@
+import datetime
+
+import pytest
+
+from sequoia.partitions import time_windows
+
+
+class TestCaseTimeWindows:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_time_windows(self):
+        # Prepare
+        expected_result = [
+            {"withUpdatedAt": "2000-01-01T00:00:00.000Z/2000-01-01T11:59:59.999Z"},
+            {"withUpdatedAt": "2000-01-01T12:00:00.000Z/2000-01-02T00:00:00.000Z"},
+        ]
+
+        # Run
+        windows = time_windows("updatedAt", datetime.datetime(2000, 1, 1), datetime.datetime(2000, 1, 2), 2)
+
+        # Asserts
+        assert windows == expected_result
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_time_windows_single(self):
+        # Prepare
+        expected_result = [{"withCreatedAt": "2000-01-01T00:00:00.000Z/2000-01-02T00:00:00.000Z"}]
+
+        # Run
+        windows = time_windows("createdAt", datetime.datetime(2000, 1, 1), datetime.datetime(2000, 1, 2), 1)
+
+        # Asserts
+        assert windows == expected_result
@@ -1,14 +1,30 @@
+import asyncio
 import datetime
+import json
 from json import JSONDecodeError
 from unittest.mock import AsyncMock, Mock, patch
 
 import httpx
 import pytest
 
-from sequoia.exceptions import RequestAlreadyBuilt, RequestNotBuilt, ResourceNotFound, ServiceNotFound
+from sequoia.auth import TokenManager
+from sequoia.cache import ResponseCache
+from sequoia.circuit import CircuitBreakers
+from sequoia.codecs import JSONCodec, LazyMapping
+from sequoia.exceptions import (
+    CircuitOpenError,
+    RequestAlreadyBuilt,
+    RequestNotBuilt,
+    ResourceNotFound,
+    ServiceNotFound,
+    UpdateTokenError,
+)
+from sequoia.flight import SingleFlight
+from sequoia.limiter import RateLimiters
 from sequoia.request import RequestBuilder
 from sequoia.response import Response
-from sequoia.types import Resource, ResourcesRegistry, Service, ServicesRegistry
+from sequoia.retry import RetryPolicy
+from sequoia.types import BulkResult, Page, Resource, ResourcesRegistry, RetrieveResult, Service, ServicesRegistry
 
 
 @pytest.fixture(scope="module")
@@ -83,6 +99,63 @@ class TestCaseRequestBuilder:
         assert await builder._resource == Resource(name="bar", path="/bar")
         assert builder._max_retries == 1
 
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_build_request_cached(self, request_builder):
+        # Build request
+        builder = request_builder.foo.bar
+
+        # Asserts
+        assert request_builder.foo.bar is builder
+        assert request_builder.foo is not builder
+        assert "__dict__" not in vars(RequestBuilder)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_build_url_resolved_once(self, httpx_client):
+        # Prepare
+        service = Service(name="foo", url="https://foo")
+        service._resources = ResourcesRegistry({"bar": Resource(name="bar", path="/bar")})
+        registry = ServicesRegistry({"foo": service})
+        builder = RequestBuilder(httpx_client=httpx_client, available_services=registry, max_retries=1).foo.bar
+
+        # Run
+        with patch.object(ServicesRegistry, "ready", new_callable=AsyncMock) as ready_mock:
+            first = await builder._build_url()
+            second = await builder._build_url(pk="1")
+
+        # Asserts
+        assert first == "https://foo/bar"
+        assert second == "https://foo/bar/1"
+        assert ready_mock.call_count == 1
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_build_url_service_changed(self, httpx_client):
+        # Prepare
+        service = Service(name="foo", url="https://foo")
+        service._resources = ResourcesRegistry({"bar": Resource(name="bar", path="/bar")})
+        registry = ServicesRegistry({"foo": service})
+        builder = RequestBuilder(httpx_client=httpx_client, available_services=registry, max_retries=1).foo.bar
+        await builder._build_url()
+
+        # Run
+        service._resources = ResourcesRegistry({"bar": Resource(name="bar", path="/v2/bar")})
+        resources_changed = await builder._build_url()
+        relocated = Service(name="foo", url="https://new-foo")
+        relocated._resources = service._resources
+        registry["foo"] = relocated
+        service_relocated = await builder._build_url()
+
+        # Asserts
+        assert resources_changed == "https://foo/v2/bar"
+        assert service_relocated == "https://new-foo/v2/bar"
+
     @pytest.mark.type_unit
     @pytest.mark.execution_fast
     @pytest.mark.priority_high
@@ -153,6 +226,85 @@ class TestCaseRequestBuilder:
         assert request.content == b'{"bar": [{"foo": "2000-01-01T00:00:00.000Z"}]}'
         assert response == {"id": 1}
 
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_create_many(self, request_builder):
+        # Prepare
+        async def send(request):
+            await request.aread()
+            body = json.loads(request.content)
+            return httpx.Response(request=Mock(), status_code=200, content=json.dumps(body).encode())
+
+        request_builder._httpx_client.send = AsyncMock(side_effect=send)
+
+        # Run
+        result = await request_builder.foo.bar.create_many(({"id": i} for i in range(5)), chunk_size=2)
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 3
+        request = request_builder._httpx_client.send.call_args_list[0][1]["request"]
+        assert request.method == "POST"
+        assert request.url == "https://foo/bar"
+        assert request.content == b'{"bar": [{"id": 0}, {"id": 1}]}'
+        assert result == BulkResult(created=[{"id": i} for i in range(5)], errors=[])
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_create_many_async_iterable_with_errors(self, request_builder):
+        # Prepare
+        async def documents():
+            for i in range(4):
+                yield {"id": i}
+
+        async def send(request):
+            await request.aread()
+            body = json.loads(request.content)
+            status_code = 400 if body["bar"][0]["id"] == 2 else 200
+            return httpx.Response(request=Mock(), status_code=status_code, content=json.dumps(body).encode())
+
+        request_builder._httpx_client.send = AsyncMock(side_effect=send)
+
+        # Run
+        result = await request_builder.foo.bar.create_many(documents(), chunk_size=2, concurrency=1)
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 2
+        assert result.created == [{"id": 0}, {"id": 1}]
+        assert len(result.errors) == 1
+        assert result.errors[0].index == 1
+        assert result.errors[0].documents == [{"id": 2}, {"id": 3}]
+        assert isinstance(result.errors[0].error, httpx.exceptions.HTTPError)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_create_many_documents_error(self, request_builder):
+        # Prepare
+        def documents():
+            for i in range(3):
+                yield {"id": i}
+            raise ValueError()
+
+        async def send(request):
+            await asyncio.sleep(0.01)
+            sent.append(request)
+            return httpx.Response(request=Mock(), status_code=200, content=b'{"bar": []}')
+
+        sent = []
+        request_builder._httpx_client.send = AsyncMock(side_effect=send)
+
+        # Run
+        with pytest.raises(ValueError):
+            await request_builder.foo.bar.create_many(documents(), chunk_size=1)
+
+        # Asserts
+        assert len(sent) == 3
+
     @pytest.mark.type_unit
     @pytest.mark.execution_fast
     @pytest.mark.priority_high
@@ -169,6 +321,281 @@ class TestCaseRequestBuilder:
         assert request.url == "https://foo/bar/1"
         assert response == {"id": 1}
 
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_retrieve_decode_plan(self, httpx_client):
+        # Prepare
+        service = Service(name="foo", url="https://foo")
+        service._resources = ResourcesRegistry(
+            {"bar": Resource(name="bar", path="/bar", fields={"title": "string", "createdAt": "date"})}
+        )
+        httpx_client.send = AsyncMock(
+            return_value=httpx.Response(
+                request=Mock(),
+                status_code=200,
+                content=b'{"bar": [{"title": "P1D", "createdAt": "2000-01-01T00:00:00.000Z", "length": "PT1H"}]}',
+            )
+        )
+        request_builder = RequestBuilder(
+            httpx_client=httpx_client, available_services=ServicesRegistry({"foo": service}), max_retries=1
+        )
+
+        # Run
+        response = await request_builder.foo.bar.retrieve(pk="1")
+
+        # Asserts
+        assert response == {
+            "title": "P1D",
+            "createdAt": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc),
+            "length": datetime.timedelta(hours=1),
+        }
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_json_codec(self, httpx_client, services_registry):
+        # Prepare
+        json_codec = Mock(wraps=JSONCodec())
+        request_builder = RequestBuilder(
+            httpx_client=httpx_client, available_services=services_registry, max_retries=1, json_codec=json_codec
+        )
+
+        # Run
+        response = await request_builder.foo.bar.create({"id": 1})
+
+        # Asserts
+        request = httpx_client.send.call_args_list[0][1]["request"]
+        await request.aread()
+        assert request.content == b'{"bar": [{"id": 1}]}'
+        assert response == {"id": 1}
+        json_codec.dumps.assert_called_once_with({"bar": [{"id": 1}]})
+        json_codec.loads.assert_called_once_with(b'{"bar": [{"id": 1}]}')
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "fields,decode_mode,expected_type,expected_value",
+        [
+            pytest.param({}, "lazy", LazyMapping, datetime.timedelta(days=1), id="Lazy"),
+            pytest.param({"title": "string"}, "lazy", LazyMapping, "P1D", id="Lazy with plan"),
+            pytest.param({}, "raw", dict, "P1D", id="Raw"),
+            pytest.param({"title": "string"}, "raw", dict, "P1D", id="Raw with plan"),
+        ],
+    )
+    async def test_retrieve_decode_mode(self, httpx_client, fields, decode_mode, expected_type, expected_value):
+        # Prepare
+        service = Service(name="foo", url="https://foo")
+        service._resources = ResourcesRegistry({"bar": Resource(name="bar", path="/bar", fields=fields)})
+        httpx_client.send = AsyncMock(
+            return_value=httpx.Response(request=Mock(), status_code=200, content=b'{"bar": [{"title": "P1D"}]}')
+        )
+        request_builder = RequestBuilder(
+            httpx_client=httpx_client,
+            available_services=ServicesRegistry({"foo": service}),
+            max_retries=1,
+            decode_mode=decode_mode,
+        )
+
+        # Run
+        response = await request_builder.foo.bar.retrieve(pk="1")
+
+        # Asserts
+        assert type(response) is expected_type
+        assert response == {"title": expected_value}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_retrieve_cached(self, request_builder):
+        # Prepare
+        request_builder._cache = ResponseCache(ttl=60.0)
+
+        # Run
+        first_response = await request_builder.foo.bar.retrieve(pk="1")
+        second_response = await request_builder.foo.bar.retrieve(pk="1")
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 1
+        assert first_response == second_response == {"id": 1}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("ttl", [pytest.param(60.0, id="Fresh"), pytest.param(0.0, id="Revalidated")])
+    async def test_retrieve_cached_copy(self, request_builder, ttl):
+        # Prepare
+        request_builder._cache = ResponseCache(ttl=ttl)
+        request_builder._httpx_client.send = AsyncMock(
+            side_effect=[
+                httpx.Response(
+                    request=Mock(),
+                    status_code=200,
+                    headers={"ETag": '"foo"'},
+                    content=b'{"bar": [{"id": 1, "tags": ["foo"]}]}',
+                ),
+                httpx.Response(request=Mock(), status_code=304, content=b""),
+                httpx.Response(request=Mock(), status_code=304, content=b""),
+            ]
+        )
+
+        # Run
+        first_response = await request_builder.foo.bar.retrieve(pk="1")
+        first_response["id"] = 2
+        first_response["tags"].append("bar")
+        second_response = await request_builder.foo.bar.retrieve(pk="1")
+        second_response["tags"].append("baz")
+        third_response = await request_builder.foo.bar.retrieve(pk="1")
+
+        # Asserts
+        assert second_response == {"id": 1, "tags": ["foo", "baz"]}
+        assert third_response == {"id": 1, "tags": ["foo"]}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_retrieve_cached_revalidate(self, request_builder):
+        # Prepare
+        request_builder._cache = ResponseCache(ttl=0.0)
+        request_builder._httpx_client.send = AsyncMock(
+            side_effect=[
+                httpx.Response(
+                    request=Mock(), status_code=200, headers={"ETag": '"foo"'}, content=b'{"bar": [{"id": 1}]}'
+                ),
+                httpx.Response(request=Mock(), status_code=304, content=b""),
+            ]
+        )
+
+        # Run
+        first_response = await request_builder.foo.bar.retrieve(pk="1")
+        second_response = await request_builder.foo.bar.retrieve(pk="1")
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 2
+        second_request = request_builder._httpx_client.send.call_args_list[1][1]["request"]
+        assert second_request.headers["If-None-Match"] == '"foo"'
+        assert first_response == second_response == {"id": 1}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_retrieve_cached_modified(self, request_builder):
+        # Prepare
+        request_builder._cache = ResponseCache(ttl=0.0)
+        request_builder._httpx_client.send = AsyncMock(
+            side_effect=[
+                httpx.Response(
+                    request=Mock(),
+                    status_code=200,
+                    headers={"Last-Modified": "Sat, 01 Jan 2000 00:00:00 GMT"},
+                    content=b'{"bar": [{"id": 1}]}',
+                ),
+                httpx.Response(request=Mock(), status_code=200, content=b'{"bar": [{"id": 2}]}'),
+            ]
+        )
+
+        # Run
+        first_response = await request_builder.foo.bar.retrieve(pk="1")
+        second_response = await request_builder.foo.bar.retrieve(pk="1")
+
+        # Asserts
+        second_request = request_builder._httpx_client.send.call_args_list[1][1]["request"]
+        assert second_request.headers["If-Modified-Since"] == "Sat, 01 Jan 2000 00:00:00 GMT"
+        assert first_response == {"id": 1}
+        assert second_response == {"id": 2}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_retrieve_cached_invalidated(self, request_builder):
+        # Prepare
+        request_builder._cache = ResponseCache(ttl=60.0)
+
+        # Run
+        await request_builder.foo.bar.retrieve(pk="1")
+        await request_builder.foo.bar.update(pk="1", json={})
+        await request_builder.foo.bar.retrieve(pk="1")
+        await request_builder.foo.bar.delete(pk="1")
+        await request_builder.foo.bar.retrieve(pk="1")
+
+        # Asserts
+        methods = [i[1]["request"].method for i in request_builder._httpx_client.send.call_args_list]
+        assert methods == ["GET", "PUT", "GET", "DELETE", "GET"]
+
+    @pytest.fixture
+    def retrieve_many_responses(self):
+        async def send(request):
+            pks = request.url.path.split("/")[-1].split(",")
+            if "missing" in pks:
+                return httpx.Response(request=Mock(), status_code=404, content=b"")
+            elif "error" in pks:
+                return httpx.Response(request=Mock(), status_code=500, content=b"")
+
+            content = {"bar": [{"ref": f"foo:{pk.split(':')[-1]}", "name": pk.split(":")[-1]} for pk in pks]}
+            return httpx.Response(request=Mock(), status_code=200, content=json.dumps(content).encode())
+
+        return send
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_retrieve_many(self, request_builder, retrieve_many_responses):
+        # Prepare
+        request_builder._httpx_client.send = AsyncMock(side_effect=retrieve_many_responses)
+
+        # Run
+        result = await request_builder.foo.bar.retrieve_many(["foo:1", "2", "foo:3", "foo:1"], max_url_length=24)
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 2
+        urls = sorted(str(i[1]["request"].url) for i in request_builder._httpx_client.send.call_args_list)
+        assert urls == ["https://foo/bar/foo:1,2", "https://foo/bar/foo:3"]
+        assert result == RetrieveResult(
+            found={
+                "foo:1": {"ref": "foo:1", "name": "1"},
+                "2": {"ref": "foo:2", "name": "2"},
+                "foo:3": {"ref": "foo:3", "name": "3"},
+            },
+            missing=[],
+        )
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_retrieve_many_missing(self, request_builder, retrieve_many_responses):
+        # Prepare
+        request_builder._httpx_client.send = AsyncMock(side_effect=retrieve_many_responses)
+
+        # Run
+        result = await request_builder.foo.bar.retrieve_many(["1", "missing"])
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 3
+        assert result == RetrieveResult(found={"1": {"ref": "foo:1", "name": "1"}}, missing=["missing"])
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_retrieve_many_error(self, request_builder, retrieve_many_responses):
+        # Prepare
+        request_builder._httpx_client.send = AsyncMock(side_effect=retrieve_many_responses)
+
+        # Run
+        with pytest.raises(httpx.exceptions.HTTPError):
+            await request_builder.foo.bar.retrieve_many(["1", "error"])
+
     @pytest.mark.type_unit
     @pytest.mark.execution_fast
     @pytest.mark.priority_high
@@ -233,6 +660,307 @@ class TestCaseRequestBuilder:
         assert second_request.url == "https://foo/bar?continue=true&page=2"
         assert items == [{"id": 1}, {"id": 2}]
 
+    @pytest.fixture
+    def stream_response(self):
+        def _stream_response(content: bytes, status_code: int = 200, chunk_size: int = 7, events: list = None):
+            events = events if events is not None else []
+
+            async def chunks():
+                for i in range(0, len(content), chunk_size):
+                    yield content[i : i + chunk_size]
+                events.append("body")
+
+            async def close():
+                events.append("close")
+
+            return httpx.Response(
+                request=Mock(),
+                status_code=status_code,
+                stream=httpx.content_streams.AsyncIteratorStream(chunks(), close_func=close),
+            )
+
+        return _stream_response
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_list_stream(self, request_builder, stream_response):
+        # Prepare
+        events = []
+        responses = [
+            stream_response(
+                b'{"meta": {"continue": "/bar?page=2"}, "bar": [{"id": 1, "at": "2000-01-01T00:00:00.000Z"}, '
+                b'{"id": 2}], "linked": {}}',
+                events=events,
+            ),
+            stream_response(b'{"bar": [{"id": 3}], "meta": {}}', events=events),
+        ]
+        request_builder._httpx_client.send = AsyncMock(side_effect=responses)
+
+        # Run
+        items = []
+        async for item in request_builder.foo.bar.list(stream=True):
+            items.append(item)
+            events.append(item["id"])
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 2
+        assert all(c[1]["stream"] is True for c in request_builder._httpx_client.send.call_args_list)
+        second_request = request_builder._httpx_client.send.call_args_list[1][1]["request"]
+        assert second_request.url == "https://foo/bar?continue=true&page=2"
+        assert items == [
+            {"id": 1, "at": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)},
+            {"id": 2},
+            {"id": 3},
+        ]
+        assert events == [1, 2, "body", "close", 3, "body", "close"]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_list_stream_error(self, request_builder, stream_response):
+        # Prepare
+        events = []
+        request_builder._httpx_client.send = AsyncMock(
+            return_value=stream_response(b'{"message": "error"}', status_code=400, events=events)
+        )
+
+        # Run
+        with pytest.raises(httpx.exceptions.HTTPError) as excinfo:
+            [i async for i in request_builder.foo.bar.list(stream=True)]
+
+        # Asserts
+        assert excinfo.value.response.content == b'{"message": "error"}'
+        assert events == ["body", "close"]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_list_stream_wrong_response(self, request_builder, stream_response):
+        # Prepare
+        events = []
+        response = stream_response(b'{"bar": [{"id": 1},', events=events)
+        request_builder._httpx_client.send = AsyncMock(return_value=response)
+
+        # Run
+        items = []
+        with pytest.raises(JSONDecodeError):
+            async for item in request_builder.foo.bar.list(stream=True):
+                items.append(item)
+
+        # Asserts
+        assert items == [{"id": 1}]
+        assert events == ["body", "close"]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_list_stream_prefetch(self, request_builder):
+        with pytest.raises(ValueError):
+            [i async for i in request_builder.foo.bar.list(stream=True, prefetch=1)]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_list_pages(self, request_builder):
+        # Prepare
+        responses = [
+            httpx.Response(
+                request=Mock(),
+                status_code=200,
+                content=b'{"meta": {"continue": "/bar?page=2"}, "bar": [{"id": 1}, {"id": 2}], "linked": {"baz": []}}',
+            ),
+            httpx.Response(request=Mock(), status_code=200, content=b'{"meta": {}, "bar": [{"id": 3}]}'),
+        ]
+        request_builder._httpx_client.send = AsyncMock(side_effect=responses)
+
+        # Run
+        pages = [i async for i in request_builder.foo.bar.list_pages()]
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 2
+        assert pages == [
+            Page(items=[{"id": 1}, {"id": 2}], meta={"continue": "/bar?page=2"}, linked={"baz": []}),
+            Page(items=[{"id": 3}], meta={}, linked={}),
+        ]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_list_prefetch(self, request_builder):
+        # Prepare
+        responses = [
+            httpx.Response(
+                request=Mock(), status_code=200, content=b'{"meta": {"continue": "/bar?page=2"}, "bar": [{"id": 1}]}'
+            ),
+            httpx.Response(
+                request=Mock(), status_code=200, content=b'{"meta": {"continue": "/bar?page=3"}, "bar": [{"id": 2}]}'
+            ),
+            httpx.Response(request=Mock(), status_code=200, content=b'{"meta": {}, "bar": [{"id": 3}]}'),
+        ]
+        request_builder._httpx_client.send = AsyncMock(side_effect=responses)
+
+        # Run
+        items = request_builder.foo.bar.list(prefetch=1)
+        first_item = await items.__anext__()
+        await asyncio.sleep(0.01)
+        requests_while_consuming_first_page = request_builder._httpx_client.send.call_count
+        items = [first_item] + [i async for i in items]
+
+        # Asserts
+        assert requests_while_consuming_first_page == 2
+        assert request_builder._httpx_client.send.call_count == 3
+        third_request = request_builder._httpx_client.send.call_args_list[2][1]["request"]
+        assert third_request.url == "https://foo/bar?continue=true&page=3"
+        assert items == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_list_prefetch_error(self, request_builder):
+        # Prepare
+        responses = [
+            httpx.Response(
+                request=Mock(), status_code=200, content=b'{"meta": {"continue": "/bar?page=2"}, "bar": [{"id": 1}]}'
+            ),
+            httpx.Response(request=Mock(), status_code=400, content=b""),
+        ]
+        request_builder._httpx_client.send = AsyncMock(side_effect=responses)
+
+        # Run
+        items = []
+        with pytest.raises(httpx.exceptions.HTTPError):
+            async for i in request_builder.foo.bar.list(prefetch=2):
+                items.append(i)
+
+        # Asserts
+        assert items == [{"id": 1}]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_list_prefetch_stop_early(self, request_builder):
+        # Prepare
+        responses = [
+            httpx.Response(
+                request=Mock(), status_code=200, content=b'{"meta": {"continue": "/bar?page=2"}, "bar": [{"id": 1}]}'
+            ),
+            httpx.Response(request=Mock(), status_code=200, content=b'{"meta": {}, "bar": [{"id": 2}]}'),
+        ]
+        request_builder._httpx_client.send = AsyncMock(side_effect=responses)
+
+        # Run
+        items = request_builder.foo.bar.list(prefetch=1)
+        item = await items.__anext__()
+        await items.aclose()
+
+        # Asserts
+        assert item == {"id": 1}
+
+    @pytest.fixture
+    def partitioned_responses(self):
+        pages = {
+            "https://foo/bar?part=1&continue=true": b'{"meta": {"continue": "/bar?part=1&page=2"}, "bar": [{"id": 1}]}',
+            "https://foo/bar?part=1&continue=true&page=2": b'{"meta": {}, "bar": [{"id": 2}]}',
+            "https://foo/bar?part=2&continue=true": b'{"meta": {}, "bar": [{"id": 3}]}',
+            "https://foo/bar?part=3&continue=true": b'{"meta": {"continue": "/bar?part=3&page=2"}, "bar": [{"id": 4}]}',
+            "https://foo/bar?part=3&continue=true&page=2": b'{"meta": {}, "bar": [{"id": 5}]}',
+        }
+
+        async def send(request):
+            await asyncio.sleep(0)
+            return httpx.Response(request=Mock(), status_code=200, content=pages[str(request.url)])
+
+        return send
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_list_partitioned_ordered(self, request_builder, partitioned_responses):
+        # Prepare
+        request_builder._httpx_client.send = AsyncMock(side_effect=partitioned_responses)
+
+        # Run
+        items = [
+            i
+            async for i in request_builder.foo.bar.list_partitioned(
+                [{"part": "1"}, {"part": "2"}, {"part": "3"}], concurrency=2, ordered=True
+            )
+        ]
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 5
+        assert items == [{"id": 1}, {"id": 2}, {"id": 3}, {"id": 4}, {"id": 5}]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_list_partitioned_unordered(self, request_builder, partitioned_responses):
+        # Prepare
+        request_builder._httpx_client.send = AsyncMock(side_effect=partitioned_responses)
+
+        # Run
+        items = [
+            i
+            async for i in request_builder.foo.bar.list_partitioned(
+                [{"part": "1"}, {"part": "2"}, {"part": "3"}], concurrency=2, prefetch=1
+            )
+        ]
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 5
+        assert sorted(items, key=lambda x: x["id"]) == [{"id": 1}, {"id": 2}, {"id": 3}, {"id": 4}, {"id": 5}]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_list_partitioned_service_limit(self, request_builder, partitioned_responses):
+        # Prepare
+        async def list_partitions(self, *args, **kwargs):
+            workers.append(self)
+            await original_list_partitions(self, *args, **kwargs)
+
+        workers = []
+        original_list_partitions = RequestBuilder._list_partitions
+        request_builder._rate_limiters = RateLimiters(initial_limit=1, max_limit=1)
+        request_builder._httpx_client.send = AsyncMock(side_effect=partitioned_responses)
+
+        # Run
+        with patch.object(RequestBuilder, "_list_partitions", list_partitions):
+            items = [
+                i
+                async for i in request_builder.foo.bar.list_partitioned(
+                    [{"part": "1"}, {"part": "2"}, {"part": "3"}], concurrency=2
+                )
+            ]
+
+        # Asserts
+        assert len(workers) == 1
+        assert sorted(items, key=lambda x: x["id"]) == [{"id": 1}, {"id": 2}, {"id": 3}, {"id": 4}, {"id": 5}]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_list_partitioned_error(self, request_builder, partitioned_responses):
+        # Prepare
+        request_builder._httpx_client.send = AsyncMock(side_effect=partitioned_responses)
+
+        # Run
+        with pytest.raises(KeyError):
+            [i async for i in request_builder.foo.bar.list_partitioned([{"part": "1"}, {"part": "4"}], ordered=True)]
+
     @pytest.mark.type_unit
     @pytest.mark.execution_fast
     @pytest.mark.priority_high
@@ -255,6 +983,33 @@ class TestCaseRequestBuilder:
         assert request.url == "https://foo/bar?foo=bar"
         assert response.json() == {"foo": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)}
 
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_request_single_flight(self, request_builder):
+        # Prepare
+        async def send(request):
+            await asyncio.sleep(0.01)
+            return httpx.Response(request=Mock(), status_code=200, content=b'{"bar": [{"id": 1}]}')
+
+        request_builder._httpx_client.send = AsyncMock(side_effect=send)
+        request_builder._single_flight = SingleFlight()
+
+        # Run
+        responses = await asyncio.gather(
+            request_builder.foo.bar.retrieve(pk="1"),
+            request_builder.foo.bar.retrieve(pk="1"),
+            request_builder.foo.bar.retrieve(pk="2"),
+            request_builder.foo.bar.retrieve(pk="1", headers={"foo": "bar"}),
+            request_builder.foo.bar.update(pk="1", json={}),
+            request_builder.foo.bar.update(pk="1", json={}),
+        )
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 5
+        assert responses == [{"id": 1}] * 6
+
     @pytest.mark.type_unit
     @pytest.mark.execution_fast
     @pytest.mark.priority_high
@@ -327,6 +1082,72 @@ class TestCaseRequestBuilder:
         assert "Authorization" in request.headers and request.headers["Authorization"] == "Bearer token"
         assert response.json() == {"foo": datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)}
 
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_request_token_manager(self, request_builder):
+        # Prepare
+        request_builder._token_manager = TokenManager(AsyncMock(return_value=("foo", None)))
+        await request_builder._token_manager.refresh()
+
+        # Run
+        await request_builder._request(method="GET", url="https://foo/bar")
+
+        # Asserts
+        request = request_builder._httpx_client.send.call_args_list[0][1]["request"]
+        assert request.headers["Authorization"] == "Bearer foo"
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_request_reauthenticate(self, request_builder):
+        # Prepare
+        fetch_mock = AsyncMock(side_effect=[("foo", None), ("bar", None)])
+        request_builder._token_manager = TokenManager(fetch_mock)
+        await request_builder._token_manager.refresh()
+        request_builder._httpx_client.send = AsyncMock(
+            side_effect=[
+                httpx.Response(request=Mock(), status_code=401, content=b""),
+                httpx.Response(request=Mock(), status_code=401, content=b""),
+                httpx.Response(request=Mock(), status_code=200, content=b'{"foo": 1}'),
+                httpx.Response(request=Mock(), status_code=200, content=b'{"foo": 2}'),
+            ]
+        )
+
+        # Run
+        responses = await asyncio.gather(
+            request_builder._request(method="GET", url="https://foo/bar"),
+            request_builder._request(method="GET", url="https://foo/baz"),
+        )
+
+        # Asserts
+        assert [r.json() for r in responses] == [{"foo": 1}, {"foo": 2}]
+        assert fetch_mock.call_count == 2
+        requests = [c[1]["request"] for c in request_builder._httpx_client.send.call_args_list]
+        assert [r.headers["Authorization"] for r in requests[2:]] == ["Bearer bar", "Bearer bar"]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_request_reauthenticate_error(self, request_builder):
+        # Prepare
+        fetch_mock = AsyncMock(side_effect=[("foo", None), UpdateTokenError()])
+        request_builder._token_manager = TokenManager(fetch_mock)
+        await request_builder._token_manager.refresh()
+        request_builder._httpx_client.send = AsyncMock(
+            return_value=httpx.Response(request=Mock(), status_code=401, content=b"")
+        )
+
+        # Run
+        with pytest.raises(httpx.exceptions.HTTPError):
+            await request_builder._request(method="GET", url="https://foo/bar")
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 1
+
     @pytest.mark.type_unit
     @pytest.mark.execution_fast
     @pytest.mark.priority_high
@@ -432,3 +1253,79 @@ class TestCaseRequestBuilder:
         # Run
         with pytest.raises(httpx.exceptions.HTTPError):
             await request_builder.foo.bar.retrieve(pk=1)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_request_timeout_error(self, request_builder):
+        # Set up mocks
+        request_builder._httpx_client.send = AsyncMock(side_effect=httpx.exceptions.ReadTimeout())
+
+        # Run
+        with pytest.raises(httpx.exceptions.ReadTimeout):
+            await request_builder.foo.bar.retrieve(pk=1)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_request_retry_policy(self, httpx_client, services_registry):
+        # Prepare
+        retry_policy = RetryPolicy(max_tries=2, base_delay=0.0)
+        request_builder = RequestBuilder(
+            httpx_client=httpx_client, available_services=services_registry, max_retries=1, retry_policy=retry_policy
+        )
+        request_builder._httpx_client.send = AsyncMock(
+            side_effect=[
+                httpx.Response(request=Mock(), status_code=503, content=b""),
+                httpx.Response(request=Mock(), status_code=200, content=b'{"bar": [{"id": 1}]}'),
+            ]
+        )
+
+        # Run
+        response = await request_builder.foo.bar.retrieve(pk="1")
+
+        # Asserts
+        assert request_builder.foo.bar._retry_policy is retry_policy
+        assert request_builder._httpx_client.send.call_count == 2
+        assert response == {"id": 1}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_request_circuit_open(self, request_builder):
+        # Prepare
+        request_builder._circuit_breakers = CircuitBreakers(min_calls=1)
+        request_builder._httpx_client.send = AsyncMock(
+            return_value=httpx.Response(request=Mock(), status_code=500, content=b"")
+        )
+
+        # Run
+        with pytest.raises(httpx.exceptions.HTTPError):
+            await request_builder.foo.bar.retrieve(pk="1")
+        with pytest.raises(CircuitOpenError):
+            await request_builder.foo.bar.retrieve(pk="1")
+
+        # Asserts
+        assert request_builder._httpx_client.send.call_count == 1
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_request_rate_limited(self, request_builder):
+        # Prepare
+        request_builder._rate_limiters = RateLimiters(initial_limit=4)
+        request_builder._httpx_client.send = AsyncMock(
+            return_value=httpx.Response(request=Mock(), status_code=429, content=b"")
+        )
+
+        # Run
+        with pytest.raises(httpx.exceptions.HTTPError):
+            await request_builder.foo.bar.retrieve(pk="1")
+
+        # Asserts
+        attempts = request_builder._httpx_client.send.call_count
+        assert request_builder._rate_limiters.limiter("foo").limit == 4 // 2 ** attempts
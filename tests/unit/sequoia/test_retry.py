@@ -0,0 +1,201 @@
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from sequoia.retry import RetryBudget, RetryPolicy, retry_after_delay
+
+
+class TestCaseRetryBudget:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_withdraw(self):
+        with patch("time.monotonic", return_value=0.0):
+            budget = RetryBudget(ratio=0.5, min_per_second=0.0, max_tokens=2.0)
+
+            assert budget.withdraw()
+            assert budget.withdraw()
+            assert not budget.withdraw()
+
+            budget.deposit()
+            assert not budget.withdraw()
+            budget.deposit()
+            assert budget.withdraw()
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_refill_over_time(self):
+        with patch("time.monotonic", return_value=0.0):
+            budget = RetryBudget(ratio=0.0, min_per_second=1.0, max_tokens=5.0)
+            while budget.withdraw():
+                pass
+
+        with patch("time.monotonic", return_value=2.0):
+            assert budget.tokens == 2.0
+
+        with patch("time.monotonic", return_value=100.0):
+            assert budget.tokens == 5.0
+
+
+class TestCaseRetryPolicy:
+    @pytest.fixture
+    def policy(self):
+        return RetryPolicy(max_tries=3, base_delay=0.1, max_delay=1.0)
+
+    @pytest.fixture(autouse=True)
+    def sleep(self):
+        with patch("asyncio.sleep", new_callable=AsyncMock) as sleep_mock:
+            yield sleep_mock
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "method,error,expected_result",
+        [
+            ("GET", httpx.exceptions.ReadTimeout(), True),
+            ("PUT", httpx.exceptions.NetworkError(), True),
+            ("DELETE", OSError(), True),
+            ("GET", httpx.exceptions.TooManyRedirects(), False),
+            ("GET", ValueError(), False),
+            ("POST", httpx.exceptions.ConnectTimeout(), True),
+            ("POST", httpx.exceptions.PoolTimeout(), True),
+            ("POST", httpx.exceptions.ReadTimeout(), False),
+            ("POST", OSError(), False),
+        ],
+    )
+    def test_retryable_error(self, policy, method, error, expected_result):
+        assert policy.retryable_error(method, error) is expected_result
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "method,status_code,expected_result",
+        [
+            ("GET", 200, False),
+            ("GET", 400, False),
+            ("GET", 500, False),
+            ("GET", 503, True),
+            ("get", 429, True),
+            ("POST", 503, False),
+            ("POST", 429, True),
+        ],
+    )
+    def test_retryable_response(self, policy, method, status_code, expected_result, response):
+        assert policy.retryable_response(method, response(status_code)) is expected_result
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_delay(self, policy):
+        with patch("random.uniform", side_effect=lambda a, b: b):
+            assert [policy.delay(i) for i in range(1, 6)] == [0.1, 0.2, 0.4, 0.8, 1.0]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_delay_retry_after(self, policy, response):
+        assert policy.delay(1, response(503, headers={"Retry-After": "0.5"})) == 0.5
+        assert policy.delay(1, response(503, headers={"Retry-After": "120"})) == 1.0
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_send_retry_status(self, policy, sleep, response):
+        # Prepare
+        send = AsyncMock(side_effect=[response(503, headers={"Retry-After": "0.5"}), response(200)])
+
+        # Run
+        result = await policy.send("GET", send)
+
+        # Asserts
+        assert result.status_code == 200
+        assert send.call_count == 2
+        sleep.assert_called_once_with(0.5)
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_send_give_up_status(self, policy, response):
+        # Prepare
+        send = AsyncMock(return_value=response(503))
+
+        # Run
+        result = await policy.send("GET", send)
+
+        # Asserts
+        assert result.status_code == 503
+        assert send.call_count == 3
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_send_retry_error(self, policy, response):
+        # Prepare
+        send = AsyncMock(side_effect=[httpx.exceptions.ReadTimeout(), response(200)])
+
+        # Run
+        result = await policy.send("GET", send)
+
+        # Asserts
+        assert result.status_code == 200
+        assert send.call_count == 2
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_send_non_idempotent_error(self, policy):
+        # Prepare
+        send = AsyncMock(side_effect=httpx.exceptions.ReadTimeout())
+
+        # Run
+        with pytest.raises(httpx.exceptions.ReadTimeout):
+            await policy.send("POST", send)
+
+        # Asserts
+        assert send.call_count == 1
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_send_budget_exhausted(self, response):
+        # Prepare
+        policy = RetryPolicy(max_tries=5, budget=RetryBudget(ratio=0.0, min_per_second=0.0, max_tokens=1.0))
+        send = AsyncMock(return_value=response(503))
+
+        # Run
+        result = await policy.send("GET", send)
+
+        # Asserts
+        assert result.status_code == 503
+        assert send.call_count == 2
+
+
+class TestCaseRetryAfterDelay:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_seconds(self, response):
+        assert retry_after_delay(response(429, headers={"Retry-After": "3"})) == 3.0
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_date(self, response):
+        with patch("time.time", return_value=946684800.0):
+            assert retry_after_delay(response(429, headers={"Retry-After": "Sat, 01 Jan 2000 00:00:10 GMT"})) == 10.0
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_missing_or_wrong(self, response):
+        assert retry_after_delay(response(429)) is None
+        assert retry_after_delay(response(429, headers={"Retry-After": "foo"})) is None
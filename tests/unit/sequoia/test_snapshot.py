@@ -0,0 +1,138 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from sequoia.snapshot import DiscoverySnapshot
+from sequoia.types import DiscoveryOptions, Resource, ResourcesRegistry, Service, ServicesRegistry
+
+
+@pytest.fixture
+def services():
+    foo = Service(name="foo", url="https://foo", title="Foo", description="Foo service")
+    foo._resources = ResourcesRegistry({"bars": Resource(name="bars", path="/data/bars")})
+    return ServicesRegistry({"foo": foo, "baz": Service(name="baz", url="https://baz")})
+
+
+class TestCaseDiscoverySnapshot:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_save_load(self, tmp_path, services):
+        # Prepare
+        snapshot = DiscoverySnapshot(str(tmp_path / "snapshot.json"))
+        options = DiscoveryOptions()
+
+        # Run
+        snapshot.save(services, "https://registry", "root")
+        result = snapshot.load("https://registry", "root", options)
+
+        # Asserts
+        assert result == services
+        assert result["foo"].title == "Foo"
+        assert result["foo"]._resources == {"bars": Resource(name="bars", path="/data/bars")}
+        assert result["foo"].options is options
+        assert not hasattr(result["baz"], "_resources")
+        assert list(tmp_path.iterdir()) == [tmp_path / "snapshot.json"]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "registry_url,owner",
+        [pytest.param("https://other", "root", id="Registry"), pytest.param("https://registry", "foo", id="Owner")],
+    )
+    def test_load_mismatch(self, tmp_path, services, registry_url, owner):
+        # Prepare
+        snapshot = DiscoverySnapshot(str(tmp_path / "snapshot.json"))
+        snapshot.save(services, "https://registry", "root")
+
+        # Run
+        result = snapshot.load(registry_url, owner)
+
+        # Asserts
+        assert result is None
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_load_expired(self, tmp_path, services):
+        # Prepare
+        snapshot = DiscoverySnapshot(str(tmp_path / "snapshot.json"), ttl=60)
+        with patch("sequoia.snapshot.time.time", return_value=1000):
+            snapshot.save(services, "https://registry")
+
+        # Run
+        with patch("sequoia.snapshot.time.time", return_value=1061):
+            result = snapshot.load("https://registry")
+
+        # Asserts
+        assert result is None
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "fresh,expected_created_at",
+        [pytest.param(True, 1050, id="Fresh"), pytest.param(False, 1000, id="Not fresh")],
+    )
+    def test_save_created_at(self, tmp_path, services, fresh, expected_created_at):
+        # Prepare
+        snapshot = DiscoverySnapshot(str(tmp_path / "snapshot.json"), ttl=60)
+        with patch("sequoia.snapshot.time.time", return_value=1000):
+            snapshot.save(services, "https://registry")
+        snapshot = DiscoverySnapshot(str(tmp_path / "snapshot.json"), ttl=60)
+        with patch("sequoia.snapshot.time.time", return_value=1030):
+            snapshot.load("https://registry")
+
+        # Run
+        with patch("sequoia.snapshot.time.time", return_value=1050):
+            snapshot.save(services, "https://registry", fresh=fresh)
+        with patch("sequoia.snapshot.time.time", return_value=1061):
+            result = snapshot.load("https://registry")
+
+        # Asserts
+        assert snapshot.created_at == expected_created_at
+        assert (result is not None) is fresh
+        with open(tmp_path / "snapshot.json") as f:
+            assert json.load(f)["created_at"] == expected_created_at
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_load_missing(self, tmp_path):
+        assert DiscoverySnapshot(str(tmp_path / "snapshot.json")).load("https://registry") is None
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param("{", id="Invalid JSON"),
+            pytest.param(json.dumps({"registry_url": "https://registry"}), id="Missing fields"),
+        ],
+    )
+    def test_load_invalid(self, tmp_path, content):
+        # Prepare
+        path = tmp_path / "snapshot.json"
+        path.write_text(content)
+
+        # Run
+        result = DiscoverySnapshot(str(path)).load("https://registry")
+
+        # Asserts
+        assert result is None
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_save_error(self, tmp_path, services):
+        # Prepare
+        snapshot = DiscoverySnapshot(str(tmp_path / "foo" / "snapshot.json"))
+
+        # Run
+        snapshot.save(services, "https://registry")
+
+        # Asserts
+        assert snapshot.load("https://registry") is None
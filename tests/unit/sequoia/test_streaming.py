@@ -0,0 +1,175 @@
+import json
+import random
+
+import pytest
+
+from sequoia.streaming import ListStreamParser
+
+
+class TestCaseListStreamParser:
+    @pytest.fixture
+    def page(self):
+        return {
+            "meta": {"continue": "/data/offers?continue=foo", "perPage": 100},
+            "offers": [
+                {"ref": f"demo:{i}", "title": "Ñandú", "price": 12345.5e3, "tags": [1, {"x": None}]} for i in range(20)
+            ]
+            + [1234567, "foo", None, True, [], {}],
+            "linked": {},
+        }
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "chunk_size", [pytest.param(1, id="1"), pytest.param(13, id="13"), pytest.param(4096, id="4096")]
+    )
+    def test_feed(self, page, chunk_size):
+        # Prepare
+        content = json.dumps(page, ensure_ascii=False, indent=2).encode("utf-8")
+        parser = ListStreamParser("offers")
+
+        # Run
+        items = []
+        for i in range(0, len(content), chunk_size):
+            items.extend(parser.feed(content[i : i + chunk_size]))
+        parser.close()
+
+        # Asserts
+        assert items == page["offers"]
+        assert parser.members == {"meta": page["meta"], "linked": {}}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize("chunk_size", [pytest.param(1, id="1"), pytest.param(2, id="2"), pytest.param(3, id="3")])
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param(b'{"a": 1.5, "offers": []}', id="Float member"),
+            pytest.param(b'{"offers": [-2.5, 1], "total": -1.25e-3}', id="Float items"),
+            pytest.param(b'{"offers":[12.5e+10,0.5,-0.0],"count":123456}', id="Compact"),
+            pytest.param(b'{"offers": [true, false, null, 1E2 ]}', id="Literals"),
+        ],
+    )
+    def test_feed_split_numbers(self, content, chunk_size):
+        # Prepare
+        page = json.loads(content)
+        parser = ListStreamParser("offers")
+
+        # Run
+        items = []
+        for i in range(0, len(content), chunk_size):
+            items.extend(parser.feed(content[i : i + chunk_size]))
+        parser.close()
+
+        # Asserts
+        assert items == page.pop("offers")
+        assert parser.members == page
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_feed_random_chunks(self, page):
+        # Prepare
+        content = json.dumps(page).encode("utf-8")
+        rand = random.Random(0)
+
+        for _ in range(50):
+            parser = ListStreamParser("offers")
+
+            # Run
+            items, position = [], 0
+            while position < len(content):
+                size = rand.randint(1, 50)
+                items.extend(parser.feed(content[position : position + size]))
+                position += size
+            parser.close()
+
+            # Asserts
+            assert items == page["offers"]
+            assert parser.members["meta"] == page["meta"]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_feed_item_completed(self):
+        # Prepare
+        parser = ListStreamParser("offers")
+
+        # Run
+        first_items = parser.feed(b'{"offers": [{"ref": "foo"}, {"ref": "b')
+        second_items = parser.feed(b'ar"}, 12')
+        third_items = parser.feed(b"3]}")
+        parser.close()
+
+        # Asserts
+        assert first_items == [{"ref": "foo"}]
+        assert second_items == [{"ref": "bar"}]
+        assert third_items == [123]
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    def test_feed_split_member(self):
+        # Prepare
+        parser = ListStreamParser("offers")
+
+        # Run
+        first_items = parser.feed(b'{"meta" ')
+        second_items = parser.feed(b': {}, "offers" ')
+        third_items = parser.feed(b": [1, 2]}")
+        parser.close()
+
+        # Asserts
+        assert first_items == second_items == []
+        assert third_items == [1, 2]
+        assert parser.members == {"meta": {}}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "content,members",
+        [
+            pytest.param(b"{}", {}, id="Empty object"),
+            pytest.param(b'{"offers": [], "meta": {}}', {"meta": {}}, id="Empty items"),
+            pytest.param(b'{"offers": null}', {"offers": None}, id="Null items"),
+        ],
+    )
+    def test_feed_no_items(self, content, members):
+        # Prepare
+        parser = ListStreamParser("offers")
+
+        # Run
+        items = [i for c in (b"", content[:1], content[1:]) for i in parser.feed(c)]
+        parser.close()
+
+        # Asserts
+        assert items == []
+        assert parser.members == members
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param(b'{"offers": [1,', id="Incomplete"),
+            pytest.param(b'{"offers": [1,]}', id="Trailing comma"),
+            pytest.param(b"[1]", id="Not an object"),
+            pytest.param(b'{"offers" 1}', id="Missing colon"),
+            pytest.param(b'{"offers": [1] 2}', id="Missing comma"),
+            pytest.param(b'{"offers": [1 2]}', id="Missing item comma"),
+            pytest.param(b"{1: 2}", id="Wrong key"),
+            pytest.param(b"{} {}", id="Extra data"),
+        ],
+    )
+    def test_feed_wrong_content(self, content):
+        # Prepare
+        parser = ListStreamParser("offers")
+
+        # Run & Asserts
+        with pytest.raises(json.JSONDecodeError):
+            parser.feed(content)
+            parser.close()
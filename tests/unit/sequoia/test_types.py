@@ -0,0 +1,215 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+
+from sequoia.exceptions import DiscoveryResourcesError
+from sequoia.retry import RetryPolicy
+from sequoia.types import DiscoveryOptions, RegistryDiff, Resource, ResourcesRegistry, Service, ServicesRegistry
+
+
+def response(status_code: int) -> httpx.Response:
+    return httpx.Response(request=Mock(), status_code=status_code, content=b'{"foo": "bar"}')
+
+
+class TestCaseDiscoveryOptions:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_get_shared_client(self):
+        # Prepare
+        httpx_client = AsyncMock(spec=httpx.AsyncClient)
+        httpx_client.get = AsyncMock(side_effect=[response(503), response(200)])
+        options = DiscoveryOptions(httpx_client=httpx_client, timeout=5.0, retry_policy=RetryPolicy(base_delay=0))
+
+        # Run
+        result = await options.get("https://foo")
+
+        # Asserts
+        assert result.json() == {"foo": "bar"}
+        assert httpx_client.get.call_count == 2
+        assert httpx_client.get.call_args_list[0][0] == ("https://foo",)
+        assert httpx_client.get.call_args_list[0][1] == {"timeout": 5.0}
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_get_error(self):
+        # Prepare
+        httpx_client = AsyncMock(spec=httpx.AsyncClient)
+        httpx_client.get = AsyncMock(return_value=response(404))
+        options = DiscoveryOptions(httpx_client=httpx_client)
+
+        # Run
+        with pytest.raises(httpx.exceptions.HTTPError):
+            await options.get("https://foo")
+
+        # Asserts
+        assert httpx_client.get.call_count == 1
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_get_own_client(self):
+        # Prepare
+        options = DiscoveryOptions(timeout=5.0)
+
+        # Run
+        with patch.object(httpx.AsyncClient, "get", new_callable=AsyncMock, return_value=response(200)) as get_mock:
+            result = await options.get("https://foo")
+
+        # Asserts
+        assert result.json() == {"foo": "bar"}
+        assert get_mock.call_args_list[0][1] == {"timeout": 5.0}
+        assert options.httpx_client is None
+
+
+class TestCaseResource:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.parametrize(
+        "fields,expected_result",
+        [
+            pytest.param(
+                {"title": {"type": "string"}, "createdAt": {"type": "string", "sequoiaType": "dateTime"}, "x": None},
+                {"title": "string", "createdAt": "dateTime"},
+                id="Mapping",
+            ),
+            pytest.param(
+                [{"name": "length", "type": "duration"}, {"name": "tags"}, {"type": "string"}],
+                {"length": "duration"},
+                id="List",
+            ),
+            pytest.param(None, {}, id="Missing"),
+        ],
+    )
+    def test_field_types(self, fields, expected_result):
+        assert Resource.field_types(fields) == expected_result
+
+
+class TestCaseService:
+    @pytest.fixture
+    def descriptor(self):
+        return httpx.Response(
+            request=Mock(),
+            status_code=200,
+            content=b'{"title": "Foo", "description": "Foo service", "resourcefuls": '
+            b'{"bar": {"pluralName": "bars", "hyphenatedPluralName": "bars", "path": "/data"}}}',
+        )
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_resources_single_flight(self, descriptor):
+        # Prepare
+        async def get(url, **kwargs):
+            await asyncio.sleep(0.01)
+            return descriptor
+
+        httpx_client = AsyncMock(spec=httpx.AsyncClient)
+        httpx_client.get = AsyncMock(side_effect=get)
+        service = Service(name="foo", url="https://foo", options=DiscoveryOptions(httpx_client=httpx_client))
+
+        # Run
+        results = await asyncio.gather(*[service.resources for _ in range(200)])
+
+        # Asserts
+        assert all(r == {"bars": Resource(name="bars", path="/data/bars")} for r in results)
+        assert httpx_client.get.call_count == 1
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_resources_error_not_cached(self, descriptor):
+        # Prepare
+        httpx_client = AsyncMock(spec=httpx.AsyncClient)
+        httpx_client.get = AsyncMock(side_effect=[OSError(), descriptor])
+        options = DiscoveryOptions(httpx_client=httpx_client, retry_policy=RetryPolicy(max_tries=1))
+        service = Service(name="foo", url="https://foo", options=options)
+
+        # Run
+        results = await asyncio.gather(service.resources, service.resources, return_exceptions=True)
+        resources = await service.resources
+
+        # Asserts
+        assert all(isinstance(r, DiscoveryResourcesError) for r in results)
+        assert resources == {"bars": Resource(name="bars", path="/data/bars")}
+        assert httpx_client.get.call_count == 2
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_resources_field_types(self):
+        # Prepare
+        descriptor = httpx.Response(
+            request=Mock(),
+            status_code=200,
+            content=b'{"title": "Foo", "description": "Foo service", "resourcefuls": {"bar": {"pluralName": "bars", '
+            b'"hyphenatedPluralName": "bars", "path": "/data", "fields": {"createdAt": {"type": "date"}}}}}',
+        )
+        httpx_client = AsyncMock(spec=httpx.AsyncClient)
+        httpx_client.get = AsyncMock(return_value=descriptor)
+        service = Service(name="foo", url="https://foo", options=DiscoveryOptions(httpx_client=httpx_client))
+
+        # Run
+        resources = await service.resources
+
+        # Asserts
+        assert resources["bars"].fields == {"createdAt": "date"}
+
+
+class TestCaseServicesRegistry:
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_discover_diff(self):
+        # Prepare
+        foo = Service(name="foo", url="https://foo")
+        foo._resources = ResourcesRegistry({"bars": Resource(name="bars", path="/data/bars")})
+        bar = Service(name="bar", url="https://bar")
+        bar._resources = ResourcesRegistry()
+        registry = ServicesRegistry({"bar": bar, "baz": Service(name="baz", url="https://baz"), "foo": foo})
+        content = (
+            b'{"services": [{"name": "foo", "location": "https://foo"}, {"name": "bar", "location": "https://new-bar"},'
+            b' {"name": "qux", "location": "https://qux"}]}'
+        )
+        httpx_client = AsyncMock(spec=httpx.AsyncClient)
+        httpx_client.get = AsyncMock(return_value=httpx.Response(request=Mock(), status_code=200, content=content))
+        options = DiscoveryOptions(httpx_client=httpx_client)
+
+        # Run
+        diff = await registry.discover("https://registry", options=options)
+
+        # Asserts
+        assert diff == RegistryDiff(added=["qux"], removed=["baz"], relocated=["bar"])
+        assert list(registry) == ["bar", "foo", "qux"]
+        assert registry["foo"] is foo
+        assert registry["foo"].options is options
+        assert registry["bar"].url == "https://new-bar"
+        assert not hasattr(registry["bar"], "_resources")
+
+    @pytest.mark.type_unit
+    @pytest.mark.execution_fast
+    @pytest.mark.priority_high
+    @pytest.mark.asyncio
+    async def test_discover_unchanged(self):
+        # Prepare
+        registry = ServicesRegistry({"foo": Service(name="foo", url="https://foo")})
+        content = b'{"services": [{"name": "foo", "location": "https://foo"}]}'
+        httpx_client = AsyncMock(spec=httpx.AsyncClient)
+        httpx_client.get = AsyncMock(return_value=httpx.Response(request=Mock(), status_code=200, content=content))
+
+        # Run
+        diff = await registry.discover("https://registry", options=DiscoveryOptions(httpx_client=httpx_client))
+
+        # Asserts
+        assert not diff